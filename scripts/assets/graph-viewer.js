@@ -0,0 +1,538 @@
+// Canvas/WebGL レンダラー: ノードとエッジを色ごとにまとめて一括描画し、
+// ヒットテストは quadtree、ラベルはズーム率と表示範囲で間引く（renderer が svg の場合は SVG 要素で描画）
+function createGraphRenderer(container, nodes, links, opts) {
+    if (opts.renderer === "svg") return createSvgRenderer(container, nodes, links, opts);
+    const width = opts.width, height = opts.height;
+    const ratio = window.devicePixelRatio || 1;
+    const LABEL_MIN_SCALE = 0.6, MAX_LABELS = 400;
+    const linkWidth = opts.linkWidth || (() => 1.2);
+    let maxRadius = d3.max(nodes, opts.radius) || 10;
+
+    function addCanvas() {
+        return d3.select(container).append("canvas")
+            .attr("width", width * ratio).attr("height", height * ratio)
+            .style("position", "absolute").style("left", 0).style("top", 0)
+            .style("width", width + "px").style("height", height + "px").node();
+    }
+    if (getComputedStyle(container).position === "static") container.style.position = "relative";
+    const glCanvas = opts.renderer === "webgl" ? addCanvas() : null;
+    const gl = glCanvas && glCanvas.getContext("webgl", {premultipliedAlpha: true});
+    if (glCanvas && !gl) console.warn("WebGL is not available; falling back to canvas rendering");
+    const canvas = addCanvas();  // WebGL 時はラベル・ホバー表示用のオーバーレイ
+    const ctx = canvas.getContext("2d");
+
+    let transform = d3.zoomIdentity;
+    let highlighted = null;  // 検索でマッチしたノードIDの Set（null は全件を通常表示）
+    let isVisible = () => true;
+    let hovered = null, tree = null, groups = null, frame = null;
+    let positionsDirty = true, stylesDirty = true, dataDirty = true;
+
+    const nodeAlpha = d => !isVisible(d) ? 0 : (!highlighted || highlighted.has(d.id) ? 1 : 0.1);
+    const linkAlpha = l => !isVisible(l.source) || !isVisible(l.target) ? 0
+        : !highlighted ? 0.4 : (highlighted.has(l.source.id) || highlighted.has(l.target.id) ? 0.6 : 0.05);
+
+    // 色と透明度が同じ要素を1つのパスで描画するためのグループ
+    function groupBy(items, color, alpha, size) {
+        const result = new Map();
+        for (const item of items) {
+            const a = alpha(item);
+            if (!a) continue;
+            const key = color(item) + "|" + a + "|" + size(item);
+            if (!result.has(key)) result.set(key, {color: color(item), alpha: a, size: size(item), items: []});
+            result.get(key).items.push(item);
+        }
+        return [...result.values()].sort((p, q) => p.alpha - q.alpha);
+    }
+
+    function index() {
+        if (!tree) tree = d3.quadtree(nodes.filter(d => isVisible(d)), d => d.x, d => d.y);
+        return tree;
+    }
+
+    function find(px, py) {
+        const [x, y] = transform.invert([px, py]);
+        const slack = 4 / transform.k;
+        const d = index().find(x, y, maxRadius + slack);
+        return d && Math.hypot(d.x - x, d.y - y) <= opts.radius(d) + slack ? d : undefined;
+    }
+
+    function drawCanvas() {
+        if (stylesDirty) {
+            groups = {
+                links: groupBy(links, opts.linkColor, linkAlpha, linkWidth),
+                nodes: groupBy(nodes, opts.color, nodeAlpha, () => 0)
+            };
+            stylesDirty = false;
+        }
+        const [x0, y0] = transform.invert([0, 0]), [x1, y1] = transform.invert([width, height]);
+        ctx.translate(transform.x, transform.y);
+        ctx.scale(transform.k, transform.k);
+        for (const group of groups.links) {
+            ctx.beginPath();
+            for (const l of group.items) {
+                ctx.moveTo(l.source.x, l.source.y);
+                ctx.lineTo(l.target.x, l.target.y);
+            }
+            ctx.globalAlpha = group.alpha;
+            ctx.lineWidth = group.size / transform.k;
+            ctx.strokeStyle = group.color;
+            ctx.stroke();
+        }
+        for (const group of groups.nodes) {
+            ctx.beginPath();
+            for (const d of group.items) {
+                const r = opts.radius(d);
+                if (d.x + r < x0 || d.x - r > x1 || d.y + r < y0 || d.y - r > y1) continue;
+                ctx.moveTo(d.x + r, d.y);
+                ctx.arc(d.x, d.y, r, 0, 2 * Math.PI);
+            }
+            ctx.globalAlpha = group.alpha;
+            ctx.fillStyle = group.color;
+            ctx.fill();
+        }
+        ctx.globalAlpha = 1;
+    }
+
+    // WebGL: エッジは LINES、ノードは円形にくり抜いた POINTS で1回ずつ描画
+    let program = null, buffers = null, nodePositions, linkPositions;
+    const colorCache = new Map();
+    function rgb(color) {
+        if (!colorCache.has(color)) {
+            const c = d3.rgb(color);
+            colorCache.set(color, [c.r / 255, c.g / 255, c.b / 255]);
+        }
+        return colorCache.get(color);
+    }
+
+    function initWebGL() {
+        const compile = (type, source) => {
+            const shader = gl.createShader(type);
+            gl.shaderSource(shader, source);
+            gl.compileShader(shader);
+            return shader;
+        };
+        program = gl.createProgram();
+        gl.attachShader(program, compile(gl.VERTEX_SHADER, `
+            attribute vec2 a_position; attribute vec4 a_color; attribute float a_size;
+            uniform vec3 u_transform; uniform vec2 u_viewport; uniform float u_ratio;
+            varying vec4 v_color;
+            void main() {
+                vec2 p = (a_position * u_transform.z + u_transform.xy) / u_viewport * 2.0 - 1.0;
+                gl_Position = vec4(p.x, -p.y, 0.0, 1.0);
+                gl_PointSize = max(a_size * 2.0 * u_transform.z * u_ratio, 1.0);
+                v_color = a_color;
+            }`));
+        gl.attachShader(program, compile(gl.FRAGMENT_SHADER, `
+            precision mediump float;
+            uniform bool u_points; varying vec4 v_color;
+            void main() {
+                if (u_points && length(gl_PointCoord - 0.5) > 0.5) discard;
+                gl_FragColor = vec4(v_color.rgb * v_color.a, v_color.a);
+            }`));
+        gl.linkProgram(program);
+        gl.useProgram(program);
+        gl.enable(gl.BLEND);
+        gl.blendFunc(gl.ONE, gl.ONE_MINUS_SRC_ALPHA);
+        buffers = {
+            nodePosition: gl.createBuffer(), nodeColor: gl.createBuffer(), nodeSize: gl.createBuffer(),
+            linkPosition: gl.createBuffer(), linkColor: gl.createBuffer()
+        };
+    }
+
+    function upload(buffer, data) {
+        gl.bindBuffer(gl.ARRAY_BUFFER, buffer);
+        gl.bufferData(gl.ARRAY_BUFFER, data, gl.DYNAMIC_DRAW);
+    }
+
+    function attribute(name, buffer, size) {
+        const location = gl.getAttribLocation(program, name);
+        if (location < 0) return;
+        if (!buffer) {
+            gl.disableVertexAttribArray(location);
+            gl.vertexAttrib1f(location, 0);
+            return;
+        }
+        gl.bindBuffer(gl.ARRAY_BUFFER, buffer);
+        gl.enableVertexAttribArray(location);
+        gl.vertexAttribPointer(location, size, gl.FLOAT, false, 0, 0);
+    }
+
+    function drawWebGL() {
+        if (!program) initWebGL();
+        if (dataDirty) {
+            nodePositions = new Float32Array(nodes.length * 2);
+            linkPositions = new Float32Array(links.length * 4);
+            upload(buffers.nodeSize, new Float32Array(nodes.map(opts.radius)));
+        }
+        if (positionsDirty) {
+            nodes.forEach((d, i) => { nodePositions[2 * i] = d.x; nodePositions[2 * i + 1] = d.y; });
+            links.forEach((l, i) => {
+                linkPositions.set([l.source.x, l.source.y, l.target.x, l.target.y], 4 * i);
+            });
+            upload(buffers.nodePosition, nodePositions);
+            upload(buffers.linkPosition, linkPositions);
+        }
+        if (stylesDirty) {
+            const nodeColors = new Float32Array(nodes.length * 4);
+            nodes.forEach((d, i) => nodeColors.set([...rgb(opts.color(d)), nodeAlpha(d)], 4 * i));
+            const linkColors = new Float32Array(links.length * 8);
+            links.forEach((l, i) => {
+                const c = [...rgb(opts.linkColor(l)), linkAlpha(l)];
+                linkColors.set(c, 8 * i);
+                linkColors.set(c, 8 * i + 4);
+            });
+            upload(buffers.nodeColor, nodeColors);
+            upload(buffers.linkColor, linkColors);
+            stylesDirty = false;
+        }
+        gl.viewport(0, 0, glCanvas.width, glCanvas.height);
+        gl.clearColor(0, 0, 0, 0);
+        gl.clear(gl.COLOR_BUFFER_BIT);
+        gl.uniform3f(gl.getUniformLocation(program, "u_transform"), transform.x, transform.y, transform.k);
+        gl.uniform2f(gl.getUniformLocation(program, "u_viewport"), width, height);
+        gl.uniform1f(gl.getUniformLocation(program, "u_ratio"), ratio);
+
+        gl.uniform1i(gl.getUniformLocation(program, "u_points"), 0);
+        attribute("a_position", buffers.linkPosition, 2);
+        attribute("a_color", buffers.linkColor, 4);
+        attribute("a_size", null);
+        gl.drawArrays(gl.LINES, 0, links.length * 2);
+
+        gl.uniform1i(gl.getUniformLocation(program, "u_points"), 1);
+        attribute("a_position", buffers.nodePosition, 2);
+        attribute("a_color", buffers.nodeColor, 4);
+        attribute("a_size", buffers.nodeSize, 1);
+        gl.drawArrays(gl.POINTS, 0, nodes.length);
+    }
+
+    // ラベルは一定以上ズームしたときに、表示範囲内のノードだけ（上限付き）描画する
+    function drawLabels() {
+        ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+        ctx.font = "11px sans-serif";
+        ctx.fillStyle = opts.labelColor || "#e0e0e0";
+        const label = d => {
+            const [x, y] = transform.apply([d.x, d.y]);
+            ctx.fillText(opts.label(d), x + opts.radius(d) * transform.k + 4, y + 4);
+        };
+        if (transform.k >= LABEL_MIN_SCALE) {
+            const [x0, y0] = transform.invert([0, 0]), [x1, y1] = transform.invert([width, height]);
+            let count = 0;
+            index().visit((quad, qx0, qy0, qx1, qy1) => {
+                if (count >= MAX_LABELS) return true;
+                if (!quad.length) {
+                    for (let q = quad; q; q = q.next) {
+                        const d = q.data;
+                        if (d.x >= x0 && d.x <= x1 && d.y >= y0 && d.y <= y1 && nodeAlpha(d) === 1) {
+                            label(d);
+                            count++;
+                        }
+                    }
+                }
+                return qx0 > x1 || qx1 < x0 || qy0 > y1 || qy1 < y0;
+            });
+        }
+        if (hovered) {
+            const [x, y] = transform.apply([hovered.x, hovered.y]);
+            ctx.beginPath();
+            ctx.arc(x, y, opts.radius(hovered) * transform.k + 2, 0, 2 * Math.PI);
+            ctx.strokeStyle = "#ffffff";
+            ctx.lineWidth = 2;
+            ctx.stroke();
+            if (transform.k < LABEL_MIN_SCALE) label(hovered);
+        }
+    }
+
+    function draw() {
+        frame = null;
+        ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+        ctx.clearRect(0, 0, width, height);
+        if (gl) drawWebGL(); else drawCanvas();
+        positionsDirty = dataDirty = false;
+        drawLabels();
+    }
+
+    function render() {
+        if (!frame) frame = requestAnimationFrame(draw);
+    }
+
+    const zoom = d3.zoom().scaleExtent([0.01, 8]).on("zoom", e => { transform = e.transform; render(); });
+    const simulation = opts.simulation;
+    d3.select(canvas)
+        .call(d3.drag().container(canvas)
+            .subject(e => { const d = find(e.x, e.y); return d && {node: d, x: e.x, y: e.y}; })
+            .on("start", e => {
+                if (!e.active && simulation) simulation.alphaTarget(0.3).restart();
+                e.subject.node.fx = e.subject.node.x;
+                e.subject.node.fy = e.subject.node.y;
+            })
+            .on("drag", e => {
+                [e.subject.node.fx, e.subject.node.fy] = transform.invert([e.x, e.y]);
+                if (!simulation) { e.subject.node.x = e.subject.node.fx; e.subject.node.y = e.subject.node.fy; api.update(); }
+            })
+            .on("end", e => {
+                if (!e.active && simulation) simulation.alphaTarget(0);
+                e.subject.node.fx = null;
+                e.subject.node.fy = null;
+            }))
+        .call(zoom)
+        .on("mousemove", e => {
+            const d = find(...d3.pointer(e));
+            canvas.style.cursor = d ? "pointer" : null;
+            if (d !== hovered) { hovered = d; render(); }
+            if (opts.onHover) opts.onHover(e, d);
+        })
+        .on("click", e => {
+            if (opts.onClick) opts.onClick(e, find(...d3.pointer(e)));
+        })
+        .on("mouseleave", e => {
+            if (hovered) { hovered = null; render(); }
+            if (opts.onHover) opts.onHover(e, undefined);
+        });
+
+    const api = {
+        // ノード座標が変わったとき（シミュレーションの tick など）に呼ぶ
+        update() { positionsDirty = true; tree = null; render(); },
+        highlight(matched) { highlighted = matched; stylesDirty = true; render(); },
+        filter(predicate) { isVisible = predicate; stylesDirty = true; tree = null; render(); },
+        // 表示するノード・エッジを入れ替える（LOD ビューアの展開・折りたたみ）
+        setData(newNodes, newLinks) {
+            nodes = newNodes;
+            links = newLinks;
+            maxRadius = d3.max(nodes, opts.radius) || 10;
+            if (hovered && !nodes.includes(hovered)) hovered = null;
+            dataDirty = positionsDirty = stylesDirty = true;
+            tree = null;
+            render();
+        },
+        fit() {
+            const [fx0, fx1] = d3.extent(nodes, d => d.x), [fy0, fy1] = d3.extent(nodes, d => d.y);
+            const scale = Math.min(1, 0.9 / Math.max((fx1 - fx0 + 1) / width, (fy1 - fy0 + 1) / height));
+            d3.select(canvas).call(zoom.transform, d3.zoomIdentity.translate(width / 2, height / 2)
+                .scale(scale).translate(-(fx0 + fx1) / 2, -(fy0 + fy1) / 2));
+        }
+    };
+    return api;
+}
+
+// SVG レンダラー: ノード・エッジごとに要素を作る（小規模グラフ向け。API は createGraphRenderer と同じ）
+function createSvgRenderer(container, nodes, links, opts) {
+    const width = opts.width, height = opts.height, simulation = opts.simulation;
+    const svg = d3.select(container).append("svg").attr("width", width).attr("height", height);
+    const g = svg.append("g");
+    const linkLayer = g.append("g"), nodeLayer = g.append("g");
+    const zoom = d3.zoom().scaleExtent([0.01, 5]).on("zoom", e => g.attr("transform", e.transform));
+    svg.call(zoom);
+    let link = linkLayer.selectAll("line"), node = nodeLayer.selectAll("g");
+    let highlighted = null, isVisible = () => true;
+
+    const drag = d3.drag()
+        .on("start", e => { if (!e.active && simulation) simulation.alphaTarget(0.3).restart(); e.subject.fx = e.subject.x; e.subject.fy = e.subject.y; })
+        .on("drag", e => { e.subject.fx = e.x; e.subject.fy = e.y; })
+        .on("end", e => { if (!e.active && simulation) simulation.alphaTarget(0); e.subject.fx = null; e.subject.fy = null; });
+
+    function applyStyles() {
+        node.style("display", d => isVisible(d) ? null : "none")
+            .style("opacity", d => !highlighted || highlighted.has(d.id) ? 1 : 0.1);
+        link.style("display", l => isVisible(l.source) && isVisible(l.target) ? null : "none")
+            .style("opacity", l => !highlighted ? 0.4 : (highlighted.has(l.source.id) || highlighted.has(l.target.id) ? 0.6 : 0.05));
+    }
+
+    const api = {
+        update() {
+            link.attr("x1", d => d.source.x).attr("y1", d => d.source.y)
+                .attr("x2", d => d.target.x).attr("y2", d => d.target.y);
+            node.attr("transform", d => `translate(${d.x},${d.y})`);
+        },
+        highlight(matched) { highlighted = matched; applyStyles(); },
+        filter(predicate) { isVisible = predicate; applyStyles(); },
+        setData(newNodes, newLinks) {
+            nodes = newNodes;
+            link = linkLayer.selectAll("line").data(newLinks).join("line")
+                .attr("class", "link")
+                .attr("stroke", opts.linkColor)
+                .attr("stroke-width", opts.linkWidth || 1.2);
+            node = nodeLayer.selectAll("g").data(newNodes, d => d.id).join(enter => {
+                const group = enter.append("g").attr("class", "node").call(drag);
+                group.append("circle").attr("stroke", "rgba(255,255,255,0.2)").attr("stroke-width", 1.5);
+                group.append("text").attr("dy", 4).attr("font-size", "11px").attr("fill", opts.labelColor || "#e0e0e0");
+                return group;
+            });
+            node.select("circle").attr("r", opts.radius).attr("fill", opts.color);
+            node.select("text").attr("dx", d => opts.radius(d) + 4).text(opts.label);
+            node.on("mouseover", (e, d) => { if (opts.onHover) opts.onHover(e, d); })
+                .on("mouseout", e => { if (opts.onHover) opts.onHover(e, undefined); })
+                .on("click", (e, d) => { if (opts.onClick) opts.onClick(e, d); });
+            applyStyles();
+            api.update();
+        },
+        fit() {
+            const [fx0, fx1] = d3.extent(nodes, d => d.x), [fy0, fy1] = d3.extent(nodes, d => d.y);
+            const scale = Math.min(1, 0.9 / Math.max((fx1 - fx0 + 1) / width, (fy1 - fy0 + 1) / height));
+            svg.call(zoom.transform, d3.zoomIdentity.translate(width / 2, height / 2)
+                .scale(scale).translate(-(fx0 + fx1) / 2, -(fy0 + fy1) / 2));
+        }
+    };
+    api.setData(nodes, links);
+    return api;
+}
+
+// グラフデータセット（manifest.json + ドメイン別シャード）の読み込み元。
+// ページに <script type="application/json" id="graph-data:ファイル名"> が埋め込まれていればそれを使い、
+// なければ base からHTTPで取得する
+function datasetSource(base) {
+    return name => {
+        const embedded = document.getElementById("graph-data:" + name);
+        if (embedded) return Promise.resolve(JSON.parse(embedded.textContent));
+        return fetch(`${base}/${name}`).then(response => {
+            if (!response.ok) throw new Error(`${name}: ${response.status} ${response.statusText}`);
+            return response.json();
+        });
+    };
+}
+
+// 列指向のテーブル {列名: [値...]} を行オブジェクトの配列に戻す
+function decodeColumns(table, decoders = {}) {
+    const columns = Object.keys(table || {});
+    const length = columns.length ? table[columns[0]].length : 0;
+    const rows = new Array(length);
+    for (let i = 0; i < length; i++) {
+        const row = {};
+        for (const column of columns) {
+            const value = table[column][i];
+            row[column] = decoders[column] ? decoders[column](value) : value;
+        }
+        rows[i] = row;
+    }
+    return rows;
+}
+
+// データセットをドメイン単位で表示するエクスプローラー。初期表示はドメインのスーパーノードと
+// 集約エッジのみで、expand/toggle したドメインのシャードを読み込んでノードを展開する。
+// 未展開のドメインへのエッジはそのスーパーノードへ集約する
+function createGraphExplorer(container, source, opts) {
+    const width = opts.width, height = opts.height;
+    let manifest = null, superNodes = [], aggregated = [], shownNodes = [];
+    const shards = new Map();    // スーパーノードID -> {nodes, links}（読み込み済み）
+    const expanded = new Set();
+
+    const simulation = d3.forceSimulation()
+        .force("link", d3.forceLink().id(d => d.id).distance(l => l.weight ? 200 : 80))
+        .force("charge", d3.forceManyBody().strength(-200))
+        .force("center", d3.forceCenter(width / 2, height / 2))
+        .force("collision", d3.forceCollide().radius(d => opts.radius(d) + 5))
+        .stop();
+    const view = createGraphRenderer(container, [], [], Object.assign({}, opts, {
+        simulation,
+        onClick: (e, d) => { if (d && d.shard) explorer.toggle(d.id); }
+    }));
+    simulation.on("tick", view.update);
+
+    // データセットの座標は原点中心なので画面中央へずらす
+    const position = node => {
+        if (node.x !== undefined && node.x !== null) { node.x += width / 2; node.y += height / 2; }
+        else { delete node.x; delete node.y; }
+        return node;
+    };
+
+    function decodeShard(shard) {
+        const groupId = i => superNodes[i].id;
+        const nodeType = i => manifest.nodeTypes[i];
+        const nodes = decodeColumns(shard.nodes, {type: nodeType}).map(n => position(Object.assign(n, {id: `${n.type}:${n.name}`})));
+        const links = decodeColumns(shard.links, {
+            type: i => manifest.linkTypes[i], sourceGroup: groupId, targetGroup: groupId
+        });
+        return {nodes, links};
+    }
+
+    async function loadShard(id) {
+        if (!shards.has(id)) {
+            const group = superNodes.find(n => n.id === id);
+            shards.set(id, decodeShard(await source(group.shard)));
+        }
+        return shards.get(id);
+    }
+
+    // 展開済みドメインのノードと、未展開ドメインへ集約したエッジで表示データを組み立てる
+    function rebuild() {
+        // 展開した未分類グループはノードの実体がないのでスーパーノードを隠す
+        const nodes = superNodes.filter(n => n.type !== "Group" || !expanded.has(n.id));
+        expanded.forEach(id => nodes.push(...shards.get(id).nodes));
+        const visible = new Set(nodes.map(n => n.id));
+        const merged = new Map();
+        const addLink = (source, target, type, weight) => {
+            if (source === target) return;
+            const key = JSON.stringify(weight ? [source, target].sort() : [source, target, type]);
+            const link = merged.get(key);
+            if (!link) merged.set(key, {source, target, type, weight});
+            else if (weight) link.weight += weight;
+        };
+        aggregated.forEach(l => {
+            if (!expanded.has(l.source) && !expanded.has(l.target)) addLink(l.source, l.target, "AGGREGATE", l.weight);
+        });
+        expanded.forEach(id => shards.get(id).links.forEach(l => {
+            const source = visible.has(l.source) ? l.source : l.sourceGroup;
+            const target = visible.has(l.target) ? l.target : l.targetGroup;
+            if (source === l.source && target === l.target) addLink(source, target, l.type, 0);
+            else addLink(source, target, "AGGREGATE", 1);
+        }));
+
+        const links = [...merged.values()];
+        const unplaced = nodes.some(n => n.x === undefined);
+        shownNodes = nodes;
+        simulation.nodes(nodes);
+        simulation.force("link").links(links);
+        // 事前計算した座標がなければシミュレーションで配置する
+        if (unplaced) simulation.alpha(0.6).restart();
+        view.setData(nodes, links);
+        if (opts.onChange) opts.onChange(nodes, links, expanded.size, superNodes.length);
+    }
+
+    async function expand(ids) {
+        try {
+            await Promise.all(ids.map(loadShard));
+        } catch (err) {
+            if (opts.onError) opts.onError(err);
+            return;
+        }
+        ids.forEach(id => {
+            const group = superNodes.find(n => n.id === id);
+            // 座標のないノードはスーパーノードの周囲から配置を始める
+            shards.get(id).nodes.forEach(n => {
+                if (n.x === undefined) {
+                    n.x = group.x + (Math.random() - 0.5) * 200;
+                    n.y = group.y + (Math.random() - 0.5) * 200;
+                }
+            });
+            expanded.add(id);
+        });
+        rebuild();
+    }
+
+    const ready = source("manifest.json").then(data => {
+        manifest = data;
+        superNodes = decodeColumns(manifest.groups, {type: i => manifest.nodeTypes[i]}).map(position);
+        const groupId = i => superNodes[i].id;
+        aggregated = decodeColumns(manifest.links, {source: groupId, target: groupId});
+        rebuild();
+        return manifest;
+    });
+    ready.catch(err => { if (opts.onError) opts.onError(err); });
+
+    const explorer = {
+        ready,
+        view,
+        nodes: () => shownNodes,
+        isExpanded: id => expanded.has(id),
+        highlight: matched => view.highlight(matched),
+        filter: predicate => view.filter(predicate),
+        fit: () => { if (shownNodes.length) view.fit(); },
+        expand: ids => expand(ids.filter(id => !expanded.has(id) && superNodes.some(n => n.id === id && n.shard))),
+        expandAll: () => explorer.expand(superNodes.map(n => n.id)),
+        toggle(id) {
+            if (!expanded.has(id)) return explorer.expand([id]);
+            expanded.delete(id);
+            rebuild();
+        }
+    };
+    return explorer;
+}
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+可視化ベンチマークスクリプト
+
+合成グラフ（既定: 1万・10万・100万エッジ）のCSVを生成し、visualize_graph.py の
+データ読み込みと各ジェネレーターの所要時間を計測します。
+--baseline に別バージョンの visualize_graph.py を指定すると、同じデータで計測して速度比を表示します。
+
+使用方法:
+    python benchmark_visualize.py
+    python benchmark_visualize.py --sizes 10000,100000 --baseline /tmp/visualize_graph_old.py
+
+前提条件:
+    pip install pandas
+"""
+
+import argparse
+import contextlib
+import csv
+import importlib.util
+import inspect
+import io
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+# 計測対象: (名前, 呼び出し, 必要な引数) - 呼び出しは (モジュール, データ, 出力ディレクトリ) を受け取る。
+# 必要な引数 (関数名, キーワード引数名) を持たない古い visualize_graph.py（--baseline）では計測せず n/a とする
+BENCHMARKS = [
+    ('mermaid_full', lambda vg, data, out: vg.generate_mermaid_full(data, out / "graph.mmd"), None),
+    ('mermaid_domain', lambda vg, data, out: vg.generate_mermaid_domain(data, out), None),
+    ('call_graph', lambda vg, data, out: vg.generate_call_graph(data, out / "call-graph.mmd"), None),
+    ('call_graph_condensed', lambda vg, data, out: vg.generate_call_graph(data, out / "call-graph.mmd", condense=True),
+     ('generate_call_graph', 'condense')),
+    ('dot', lambda vg, data, out: vg.generate_dot(data, out / "graph.dot"), None),
+    ('dot_positions', lambda vg, data, out: vg.generate_dot(data, out / "graph.dot", positions=True),
+     ('generate_dot', 'positions')),
+    ('html', lambda vg, data, out: vg.generate_html(data, out / "graph.html"), None),
+    ('process_flows', lambda vg, data, out: vg.generate_process_flows(data, out), None),
+    ('system_processes', lambda vg, data, out: vg.generate_system_process_diagrams(data, out), None),
+    ('actor_maps', lambda vg, data, out: vg.generate_actor_maps(data, out), None),
+]
+
+
+def load_module(path: Path, name: str):
+    """ファイルパスから visualize_graph モジュールを読み込む"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def supports(module, requires) -> bool:
+    """モジュールが計測対象の呼び出しに必要な引数を受け付けるか"""
+    if requires is None:
+        return True
+    func_name, keyword = requires
+    func = getattr(module, func_name, None)
+    return func is not None and keyword in inspect.signature(func).parameters
+
+
+def write_csv(path: Path, header: list, rows) -> None:
+    """CSVを書き出す"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def generate_dataset(data_dir: Path, edges: int, seed: int = 42) -> None:
+    """合計約 edges 本のリレーションを持つ合成グラフのCSVを生成
+
+    エンティティ・メソッドはエッジ数の1/10ずつ、参照・呼び出しが大半を占める構成。
+    """
+    rng = random.Random(seed)
+    n = max(10, edges // 10)
+    domains = max(3, n // 2000)
+    terms = max(10, n // 10)
+    procs = max(5, edges // 1000)
+    actors = 20
+    types = ['AggregateRoot', 'Entity', 'ValueObject', 'DomainService', 'Controller']
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    write_csv(data_dir / 'domains.csv', ['name', 'type', 'description'],
+              ([f'Domain{i}', 'Core', f'Domain {i}'] for i in range(domains)))
+    write_csv(data_dir / 'entities.csv', ['name', 'file_path', 'type', 'line_number'],
+              ([f'Entity{i}', f'src/Entity{i}.java', rng.choice(types), 1] for i in range(n)))
+    write_csv(data_dir / 'methods.csv', ['name', 'signature', 'file_path', 'line_number'],
+              ([f'Entity{i % n}.method{i}', '()', f'src/Entity{i % n}.java', 1] for i in range(n)))
+    write_csv(data_dir / 'terms.csv', ['name', 'name_ja', 'definition', 'domain'],
+              ([f'Term{i}', f'用語{i}', '', f'Domain{i % domains}'] for i in range(terms)))
+    write_csv(data_dir / 'belongs_to.csv', ['entity', 'domain'],
+              ([f'Entity{i}', f'Domain{i % domains}'] for i in range(n)))
+    write_csv(data_dir / 'has_term.csv', ['entity', 'term'],
+              ([f'Entity{rng.randrange(n)}', f'Term{rng.randrange(terms)}'] for _ in range(n // 2)))
+    write_csv(data_dir / 'implements.csv', ['child', 'parent'],
+              ([f'Entity{rng.randrange(n)}', f'Entity{rng.randrange(n)}'] for _ in range(n // 2)))
+    remaining = max(0, edges - 2 * n)
+    write_csv(data_dir / 'references.csv', ['source', 'target'],
+              ([f'Entity{rng.randrange(n)}', f'Entity{rng.randrange(n)}'] for _ in range(remaining // 2)))
+    write_csv(data_dir / 'calls.csv', ['caller', 'callee'],
+              ([f'Entity{(i := rng.randrange(n)) % n}.method{i}', f'Entity{(j := rng.randrange(n)) % n}.method{j}']
+               for _ in range(remaining // 2)))
+
+    # プロセス系
+    write_csv(data_dir / 'actors.csv', ['name', 'type', 'description'],
+              ([f'Actor{i}', 'Human', ''] for i in range(actors)))
+    write_csv(data_dir / 'roles.csv', ['name', 'permissions'],
+              ([f'Role{i}', 'read'] for i in range(actors)))
+    write_csv(data_dir / 'has_role.csv', ['actor', 'role'],
+              ([f'Actor{i}', f'Role{i}'] for i in range(actors)))
+    write_csv(data_dir / 'business_processes.csv', ['name', 'name_ja', 'domain', 'description'],
+              ([f'Process{i}', f'プロセス{i}', f'Domain{i % domains}', ''] for i in range(procs)))
+    write_csv(data_dir / 'activities.csv', ['name', 'name_ja', 'is_decision'],
+              ([f'Activity{i}', f'アクティビティ{i}', str(i % 5 == 4).lower()] for i in range(procs * 5)))
+    write_csv(data_dir / 'system_processes.csv', ['name', 'type', 'description'],
+              ([f'System{i}', 'async', ''] for i in range(procs)))
+    write_csv(data_dir / 'has_activity.csv', ['process', 'activity', 'order'],
+              ([f'Process{i // 5}', f'Activity{i}', i % 5] for i in range(procs * 5)))
+    write_csv(data_dir / 'next_activity.csv', ['from_activity', 'to_activity', 'condition'],
+              ([f'Activity{i}', f'Activity{i + 1}', 'OK' if i % 5 == 3 else ''] for i in range(procs * 5) if i % 5 != 4))
+    write_csv(data_dir / 'performs.csv', ['actor', 'activity'],
+              ([f'Actor{i % actors}', f'Activity{i}'] for i in range(procs * 5)))
+    write_csv(data_dir / 'triggers.csv', ['activity', 'system_process', 'event_name'],
+              ([f'Activity{i * 5}', f'System{i}', 'Started'] for i in range(procs)))
+    write_csv(data_dir / 'invokes.csv', ['source', 'method'],
+              ([f'System{i}', f'Entity{i % n}.method{i}'] for i in range(procs)))
+    write_csv(data_dir / 'participates_in.csv', ['entity', 'process'],
+              ([f'Entity{rng.randrange(n)}', f'Process{i % procs}'] for i in range(procs * 4)))
+
+
+def run_benchmark(module, data_dir: Path, output_dir: Path) -> dict:
+    """データ読み込みと各ジェネレーターの所要時間（秒）を計測（モジュールが対応していないものは None）"""
+    timings = {}
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        data = module.load_csv_data(str(data_dir))
+        timings['load'] = time.perf_counter() - start
+        for name, run, requires in BENCHMARKS:
+            if not supports(module, requires):
+                timings[name] = None
+                continue
+            start = time.perf_counter()
+            run(module, data, output_dir)
+            timings[name] = time.perf_counter() - start
+    return timings
+
+
+def check_domain_filter(module, data_dir: Path, output_dir: Path, domain: str) -> list:
+    """--domain の絞り込み読み込みが、絞り込まない場合の出力をドメインに制限したものと一致するか確かめる
+
+    読み込んだビジネスプロセスのフロー図は絞り込まない場合と同一、アクターマップの行は
+    絞り込まない場合の行に含まれること。
+
+    Returns:
+        一致しなかった成果物の説明のリスト（空なら一致）
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        full = module.load_csv_data(str(data_dir))
+        filtered = module.load_csv_data(str(data_dir), domain=domain)
+        for data, name in ((full, 'full'), (filtered, 'filtered')):
+            module.generate_process_flows(data, output_dir / name)
+            module.generate_actor_maps(data, output_dir / name)
+
+    problems = []
+    flows = sorted((output_dir / 'filtered' / 'processes').glob('*-flow.mmd'))
+    if not flows:
+        problems.append(f"no process flows for domain {domain}")
+    for path in flows:
+        expected = output_dir / 'full' / 'processes' / path.name
+        if not expected.exists() or expected.read_text(encoding='utf-8') != path.read_text(encoding='utf-8'):
+            problems.append(f"processes/{path.name} differs from the unfiltered output")
+    # アクターを読み込まなければアクターマップは書き出されない
+    actor_map = Path('actors') / 'actor-activity-map.mmd'
+
+    def map_lines(name):
+        path = output_dir / name / actor_map
+        return path.read_text(encoding='utf-8').splitlines() if path.exists() else []
+
+    full_lines = set(map_lines('full'))
+    extra = [line for line in map_lines('filtered') if line not in full_lines]
+    if extra:
+        problems.append(f"{actor_map} has {len(extra)} lines not in the unfiltered output")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark visualize_graph.py on synthetic graphs')
+    parser.add_argument('--sizes', default='10000,100000,1000000',
+                        help='Comma-separated numbers of relationships to generate')
+    parser.add_argument('--baseline', help='Path to another visualize_graph.py to compare against')
+    parser.add_argument('--work-dir', help='Directory for generated data and outputs (default: temporary)')
+    parser.add_argument('--check-domain', metavar='DOMAIN',
+                        help='Also check that loading with --domain DOMAIN matches the unfiltered output '
+                             'restricted to that domain (e.g. Domain1); exits 1 on mismatch')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    current = load_module(Path(__file__).parent / 'visualize_graph.py', 'visualize_graph')
+    baseline = load_module(Path(args.baseline), 'visualize_graph_baseline') if args.baseline else None
+
+    with tempfile.TemporaryDirectory(prefix='visualize-bench-') as temp_dir:
+        work_dir = Path(args.work_dir) if args.work_dir else Path(temp_dir)
+
+        for size in sizes:
+            data_dir = work_dir / f'edges-{size}' / 'data'
+            generate_dataset(data_dir, size)
+
+            results = run_benchmark(current, data_dir, work_dir / f'edges-{size}' / 'current')
+            base_results = run_benchmark(baseline, data_dir, work_dir / f'edges-{size}' / 'baseline') \
+                if baseline else None
+
+            print(f"## {size:,} edges")
+            print()
+            if base_results:
+                print("| 処理 | baseline (s) | current (s) | 速度比 |")
+                print("|------|-------------|------------|-------|")
+            else:
+                print("| 処理 | current (s) |")
+                print("|------|------------|")
+            # total は両方で計測できた処理だけの合計（速度比を同じ処理どうしで比べるため）
+            measured = [name for name, seconds in results.items()
+                        if seconds is not None and (not base_results or base_results[name] is not None)]
+            rows = list(results.items()) + [('total', sum(results[name] for name in measured))]
+            for name, seconds in rows:
+                if seconds is None:
+                    print(f"| {name} | n/a |" if not base_results else f"| {name} | n/a | n/a | n/a |")
+                elif base_results:
+                    base = base_results[name] if name != 'total' else sum(base_results[name] for name in measured)
+                    if base is None:
+                        print(f"| {name} | n/a | {seconds:.2f} | n/a |")
+                        continue
+                    ratio = base / seconds if seconds > 0 else float('inf')
+                    print(f"| {name} | {base:.2f} | {seconds:.2f} | {ratio:.1f}x |")
+                else:
+                    print(f"| {name} | {seconds:.2f} |")
+            print()
+
+            if args.check_domain:
+                problems = check_domain_filter(current, data_dir, work_dir / f'edges-{size}' / 'check',
+                                               args.check_domain)
+                for problem in problems:
+                    print(f"Check failed: {problem}")
+                if problems:
+                    sys.exit(1)
+                print(f"Domain filter check passed (--domain {args.check_domain})")
+                print()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,21 @@ GraphDB構築スクリプト
 
 使用方法:
     python build_graph.py --data-dir ./data --db-path ./knowledge.ryugraph
+    python build_graph.py --data-dir ./data --db-path ./knowledge.ryugraph --incremental
 
 前提条件:
     pip install ryugraph pandas
 """
 
 import argparse
+import hashlib
+import json
 import os
 import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 
@@ -24,6 +31,7 @@ except ImportError:
     sys.exit(1)
 
 try:
+    import numpy as np
     import pandas as pd
 except ImportError:
     print("Error: pandas is not installed. Run: pip install pandas")
@@ -77,6 +85,26 @@ CREATE NODE TABLE IF NOT EXISTS Role(
     permissions STRING
 );
 
+CREATE NODE TABLE IF NOT EXISTS BusinessProcess(
+    name STRING PRIMARY KEY,
+    name_ja STRING,
+    domain STRING,
+    description STRING
+);
+
+CREATE NODE TABLE IF NOT EXISTS Activity(
+    name STRING PRIMARY KEY,
+    name_ja STRING,
+    description STRING,
+    is_decision BOOLEAN
+);
+
+CREATE NODE TABLE IF NOT EXISTS SystemProcess(
+    name STRING PRIMARY KEY,
+    type STRING,
+    description STRING
+);
+
 -- リレーションテーブル
 CREATE REL TABLE IF NOT EXISTS BELONGS_TO(FROM Entity TO Domain);
 CREATE REL TABLE IF NOT EXISTS DEFINED_IN(FROM Entity TO File);
@@ -87,217 +115,637 @@ CREATE REL TABLE IF NOT EXISTS IMPLEMENTS(FROM Entity TO Entity);
 CREATE REL TABLE IF NOT EXISTS HAS_TERM(FROM Entity TO UbiquitousTerm);
 CREATE REL TABLE IF NOT EXISTS METHOD_HAS_TERM(FROM Method TO UbiquitousTerm);
 CREATE REL TABLE IF NOT EXISTS HAS_ROLE(FROM Actor TO Role);
+CREATE REL TABLE IF NOT EXISTS HAS_ACTIVITY(FROM BusinessProcess TO Activity);
+CREATE REL TABLE IF NOT EXISTS NEXT_ACTIVITY(FROM Activity TO Activity, condition STRING);
+CREATE REL TABLE IF NOT EXISTS PERFORMS(FROM Actor TO Activity);
+CREATE REL TABLE IF NOT EXISTS TRIGGERS(FROM Activity TO SystemProcess, event_name STRING);
+CREATE REL TABLE IF NOT EXISTS INVOKES(FROM SystemProcess TO Method);
+CREATE REL TABLE IF NOT EXISTS PARTICIPATES_IN(FROM Entity TO BusinessProcess);
+CREATE REL TABLE IF NOT EXISTS COMPENSATES(FROM SystemProcess TO SystemProcess);
 """
 
-
-def create_database(db_path: str) -> tuple:
+# ノードテーブル定義: (CSVファイル, ラベル, [(カラム, 型)])  先頭カラムが主キー
+NODE_TABLES = [
+    ('terms.csv', 'UbiquitousTerm',
+     [('name', 'STRING'), ('name_ja', 'STRING'), ('definition', 'STRING'), ('domain', 'STRING')]),
+    ('domains.csv', 'Domain',
+     [('name', 'STRING'), ('type', 'STRING'), ('description', 'STRING')]),
+    ('entities.csv', 'Entity',
+     [('name', 'STRING'), ('file_path', 'STRING'), ('type', 'STRING'), ('line_number', 'INT64')]),
+    ('methods.csv', 'Method',
+     [('name', 'STRING'), ('signature', 'STRING'), ('file_path', 'STRING'), ('line_number', 'INT64')]),
+    ('files.csv', 'File',
+     [('path', 'STRING'), ('language', 'STRING'), ('module', 'STRING')]),
+    ('actors.csv', 'Actor',
+     [('name', 'STRING'), ('type', 'STRING'), ('description', 'STRING')]),
+    ('roles.csv', 'Role',
+     [('name', 'STRING'), ('permissions', 'STRING')]),
+    ('business_processes.csv', 'BusinessProcess',
+     [('name', 'STRING'), ('name_ja', 'STRING'), ('domain', 'STRING'), ('description', 'STRING')]),
+    ('activities.csv', 'Activity',
+     [('name', 'STRING'), ('name_ja', 'STRING'), ('description', 'STRING'), ('is_decision', 'BOOLEAN')]),
+    ('system_processes.csv', 'SystemProcess',
+     [('name', 'STRING'), ('type', 'STRING'), ('description', 'STRING')]),
+]
+
+# ラベル → 主キーカラム
+NODE_KEYS = {label: columns[0][0] for _, label, columns in NODE_TABLES}
+
+# リレーション定義:
+#   (CSVファイル, リレーション, FROMラベル, TOラベル, FROMカラム, TOカラム, [(プロパティ, 型)])
+REL_TABLES = [
+    ('belongs_to.csv', 'BELONGS_TO', 'Entity', 'Domain', 'entity', 'domain', []),
+    ('defined_in.csv', 'DEFINED_IN', 'Entity', 'File', 'entity', 'file', []),
+    ('method_defined_in.csv', 'METHOD_DEFINED_IN', 'Method', 'File', 'method', 'file', []),
+    ('references.csv', 'REFERENCES', 'Entity', 'Entity', 'source', 'target', []),
+    ('calls.csv', 'CALLS', 'Method', 'Method', 'caller', 'callee', []),
+    ('implements.csv', 'IMPLEMENTS', 'Entity', 'Entity', 'child', 'parent', []),
+    ('has_term.csv', 'HAS_TERM', 'Entity', 'UbiquitousTerm', 'entity', 'term', []),
+    ('method_has_term.csv', 'METHOD_HAS_TERM', 'Method', 'UbiquitousTerm', 'method', 'term', []),
+    ('has_role.csv', 'HAS_ROLE', 'Actor', 'Role', 'actor', 'role', []),
+    ('has_activity.csv', 'HAS_ACTIVITY', 'BusinessProcess', 'Activity', 'process', 'activity', []),
+    ('next_activity.csv', 'NEXT_ACTIVITY', 'Activity', 'Activity', 'from_activity', 'to_activity',
+     [('condition', 'STRING')]),
+    ('performs.csv', 'PERFORMS', 'Actor', 'Activity', 'actor', 'activity', []),
+    ('triggers.csv', 'TRIGGERS', 'Activity', 'SystemProcess', 'activity', 'system_process',
+     [('event_name', 'STRING')]),
+    ('invokes.csv', 'INVOKES', 'SystemProcess', 'Method', 'source', 'method', []),
+    ('participates_in.csv', 'PARTICIPATES_IN', 'Entity', 'BusinessProcess', 'entity', 'process', []),
+    ('compensates.csv', 'COMPENSATES', 'SystemProcess', 'SystemProcess', 'source', 'target', []),
+]
+
+# 真偽値カラムとして受け付ける表記
+BOOLEAN_VALUES = {'true': True, 'false': False, 'yes': True, 'no': False, '1': True, '0': False}
+
+# フォールバック挿入のバッチサイズ
+BATCH_SIZE = 1000
+
+# 未解決エッジレポートのカラム
+DANGLING_COLUMNS = ['relation', 'from_label', 'from', 'to_label', 'to', 'missing']
+
+# COPY FROM の NULL_STRINGS に渡す値。データ中に現れない値を指定することで、
+# 文字列カラムの空文字列は空文字列のまま登録し、数値・真偽値カラムの空欄のみ NULL にする
+NULL_MARKER = '\\u0000'
+
+
+def create_database(db_path: str, rebuild: bool = True) -> tuple:
     """データベースを作成または開く"""
-    # 既存のDBがあれば削除（再構築）
-    db_dir = Path(db_path)
-    if db_dir.exists():
-        import shutil
-        shutil.rmtree(db_dir)
+    # 全件再構築の場合は既存のDBを削除
+    db_file = Path(db_path)
+    if rebuild:
+        for path in (db_file, Path(f"{db_path}.wal")):
+            if path.is_dir():
+                import shutil
+                shutil.rmtree(path)
+            elif path.exists():
+                path.unlink()
 
     db = ryugraph.Database(db_path)
     conn = ryugraph.Connection(db)
     return db, conn
 
 
+def manifest_path(db_path: str) -> Path:
+    """差分ビルド用マニフェストのパス（DBと同じ場所に置く）"""
+    return Path(f"{db_path}.manifest.json")
+
+
+def schema_fingerprint() -> str:
+    """スキーマ定義とハッシュ方式の指紋（変わった場合は全件再構築）"""
+    source = json.dumps([SCHEMA, NODE_TABLES, REL_TABLES, pd.__version__])
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def load_manifest(db_path: str) -> dict:
+    """前回ビルドのマニフェストを読み込む。差分適用できない場合は None"""
+    path = manifest_path(db_path)
+    if not path.exists() or not Path(db_path).exists():
+        return None
+    try:
+        manifest = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read manifest {path}: {e}")
+        return None
+    if manifest.get('schema') != schema_fingerprint():
+        print("Schema changed since the previous build, rebuilding from scratch")
+        return None
+    return manifest
+
+
+def save_manifest(db_path: str, manifest: dict) -> None:
+    """マニフェストを書き出す"""
+    manifest_path(db_path).write_text(json.dumps(manifest, ensure_ascii=False), encoding='utf-8')
+
+
+def build_id_path(db_path: str) -> Path:
+    """ビルドIDファイルのパス（DBと同じ場所に置く。query_graph.py が結果キャッシュの無効化に使う）"""
+    return Path(f"{db_path}.build.json")
+
+
+def save_build_id(db_path: str, incremental: bool) -> str:
+    """ビルドごとに一意なIDを発行して書き出す"""
+    build_id = uuid.uuid4().hex
+    build_id_path(db_path).write_text(json.dumps({
+        'build_id': build_id,
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'incremental': incremental,
+    }), encoding='utf-8')
+    return build_id
+
+
+def file_sha256(path: Path) -> str:
+    """ファイル内容のSHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def create_schema(conn) -> None:
     """グラフスキーマを作成"""
     for statement in SCHEMA.strip().split(';'):
-        statement = statement.strip()
-        if statement and not statement.startswith('--'):
+        # コメント行を除去（コメントの直後に続く文を取りこぼさないため）
+        statement = '\n'.join(
+            line for line in statement.splitlines() if not line.strip().startswith('--')
+        ).strip()
+        if statement:
             try:
                 conn.execute(statement)
             except Exception as e:
                 print(f"Warning: Schema creation issue: {e}")
 
 
-def load_csv_if_exists(data_dir: Path, filename: str) -> pd.DataFrame:
-    """CSVファイルが存在すれば読み込む"""
+def read_typed_csv(data_dir: Path, filename: str, columns: list) -> pd.DataFrame:
+    """スキーマで宣言したカラムのみを型宣言付きで読み込む
+
+    usecols で対象カラムに限定し、全カラムを str として読む（型推論・NA推論なし）。
+    数値・真偽値への変換は normalize_columns で検証しながら明示的に行う。
+    """
     filepath = data_dir / filename
-    if filepath.exists():
-        return pd.read_csv(filepath)
-    return pd.DataFrame()
+    names = [col for col, _ in columns]
+    if not filepath.exists():
+        return pd.DataFrame({col: pd.Series(dtype=object) for col in names})
+    return pd.read_csv(
+        filepath,
+        usecols=lambda col: col in names,
+        dtype={col: str for col in names},
+        na_filter=False,
+        encoding='utf-8',
+    )
+
+
+def normalize_columns(df: pd.DataFrame, columns: list) -> tuple:
+    """カラムをスキーマの型に変換し、COPYでは登録できない行のマスクを返す
+
+    Returns:
+        (変換後のDataFrame, フォールバックが必要な行のマスク)
+    """
+    out = pd.DataFrame(index=df.index)
+    invalid = pd.Series(False, index=df.index)
+
+    for col, col_type in columns:
+        raw = df[col].str.strip() if col in df.columns else pd.Series('', index=df.index, dtype=object)
+        if col_type == 'INT64':
+            values = pd.to_numeric(raw.where(raw != ''), errors='coerce')
+            values = values.where(values == values.round()).astype('Int64')
+            # 整数に変換できない値はフォールバックで NULL として登録
+            invalid |= (raw != '') & values.isna()
+            out[col] = values
+        elif col_type == 'BOOLEAN':
+            values = raw.str.lower().map(BOOLEAN_VALUES).astype('boolean')
+            invalid |= (raw != '') & values.isna()
+            out[col] = values
+        else:
+            values = df[col] if col in df.columns else raw
+            # 改行を含む値はCSVステージングで壊れるためフォールバックへ
+            invalid |= values.str.contains(r'[\r\n]', regex=True)
+            out[col] = values
+
+    return out, invalid
+
+
+def normalize_node_frame(df: pd.DataFrame, columns: list) -> tuple:
+    """ノードCSVをスキーマの型に正規化し、COPY可能な行と不正な行に分割
+
+    Returns:
+        (COPY用DataFrame, フォールバック用DataFrame, 除外件数)
+    """
+    out, invalid = normalize_columns(df, columns)
+
+    # 主キーが空・重複の行は登録できないため除外
+    pk = columns[0][0]
+    dropped = (out[pk] == '') | out[pk].duplicated(keep='first')
+    valid = ~dropped & ~invalid
+
+    rejected = out[~dropped & invalid]
+    return out[valid], rejected, int(dropped.sum())
+
+
+def stage_csv(df: pd.DataFrame, staging_dir: Path, name: str) -> Path:
+    """COPY FROM 用のステージングCSVを書き出す"""
+    path = staging_dir / f"{name}.csv"
+    df.to_csv(path, index=False, encoding='utf-8', na_rep='')
+    return path
+
+
+def copy_from(conn, table: str, path: Path) -> None:
+    """ステージングCSVを1回のCOPY文でテーブルへ一括ロード"""
+    conn.execute(f"COPY {table} FROM '{path.resolve().as_posix()}' (HEADER=true, NULL_STRINGS=['{NULL_MARKER}'])")
+
+
+def frame_to_params(df: pd.DataFrame) -> list:
+    """DataFrameをパラメータ用のdictリストに変換（NA は None）"""
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict('records')
+
+
+def param_expr(col: str, col_type: str) -> str:
+    """UNWIND行のカラム参照式（全行NULLのバッチでも型が決まるよう明示的にCAST）"""
+    if col_type == 'STRING':
+        return f"row.{col}"
+    return f"CAST(row.{col} AS {col_type})"
+
+
+def execute_batched(conn, query: str, rows: list, label: str) -> int:
+    """UNWIND $rows によるバッチ実行。バッチ失敗時は1行ずつ再試行"""
+    affected = 0
+    for i in range(0, len(rows), BATCH_SIZE):
+        batch = rows[i:i + BATCH_SIZE]
+        try:
+            result = conn.execute(query, {"rows": batch})
+            affected += result.get_next()[0]
+        except Exception:
+            for row in batch:
+                try:
+                    result = conn.execute(query, {"rows": [row]})
+                    affected += result.get_next()[0]
+                except Exception as e:
+                    print(f"Warning: Failed to write {label} {next(iter(row.values()))}: {e}")
+    return affected
 
 
-def import_nodes(conn, data_dir: Path) -> dict:
-    """ノードデータをインポート"""
-    stats = {}
+def row_hashes(df: pd.DataFrame, key: str) -> dict:
+    """主キー → 行内容ハッシュ"""
+    if df.empty:
+        return {}
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return dict(zip(df[key].tolist(), hashes.tolist()))
 
-    # UbiquitousTerm
-    terms_df = load_csv_if_exists(data_dir, 'terms.csv')
-    if not terms_df.empty:
-        for _, row in terms_df.iterrows():
-            try:
-                conn.execute(
-                    "CREATE (t:UbiquitousTerm {name: $name, name_ja: $name_ja, definition: $definition, domain: $domain})",
-                    {
-                        "name": str(row.get('name', '')),
-                        "name_ja": str(row.get('name_ja', '')),
-                        "definition": str(row.get('definition', '')),
-                        "domain": str(row.get('domain', ''))
-                    }
-                )
-            except Exception as e:
-                print(f"Warning: Failed to insert term {row.get('name')}: {e}")
-        stats['UbiquitousTerm'] = len(terms_df)
 
-    # Domain
-    domains_df = load_csv_if_exists(data_dir, 'domains.csv')
-    if not domains_df.empty:
-        for _, row in domains_df.iterrows():
-            try:
-                conn.execute(
-                    "CREATE (d:Domain {name: $name, type: $type, description: $description})",
-                    {
-                        "name": str(row.get('name', '')),
-                        "type": str(row.get('type', '')),
-                        "description": str(row.get('description', ''))
-                    }
-                )
-            except Exception as e:
-                print(f"Warning: Failed to insert domain {row.get('name')}: {e}")
-        stats['Domain'] = len(domains_df)
+def build_node_index(conn, label: str) -> pd.Series:
+    """ノードテーブルの 主キー → 内部オフセット のハッシュ索引を構築"""
+    key = NODE_KEYS[label]
+    df = conn.execute(f"MATCH (n:{label}) RETURN n.{key} AS key, offset(id(n)) AS node_offset").get_as_df()
+    return pd.Series(df['node_offset'].to_numpy(), index=pd.Index(df['key'], dtype=object), dtype='int64')
 
-    # Entity
-    entities_df = load_csv_if_exists(data_dir, 'entities.csv')
-    if not entities_df.empty:
-        for _, row in entities_df.iterrows():
-            try:
-                conn.execute(
-                    "CREATE (e:Entity {name: $name, file_path: $file_path, type: $type, line_number: $line_number})",
-                    {
-                        "name": str(row.get('name', '')),
-                        "file_path": str(row.get('file_path', '')),
-                        "type": str(row.get('type', '')),
-                        "line_number": int(row.get('line_number', 0))
-                    }
-                )
-            except Exception as e:
-                print(f"Warning: Failed to insert entity {row.get('name')}: {e}")
-        stats['Entity'] = len(entities_df)
 
-    # Method
-    methods_df = load_csv_if_exists(data_dir, 'methods.csv')
-    if not methods_df.empty:
-        for _, row in methods_df.iterrows():
-            try:
-                conn.execute(
-                    "CREATE (m:Method {name: $name, signature: $signature, file_path: $file_path, line_number: $line_number})",
-                    {
-                        "name": str(row.get('name', '')),
-                        "signature": str(row.get('signature', '')),
-                        "file_path": str(row.get('file_path', '')),
-                        "line_number": int(row.get('line_number', 0))
-                    }
-                )
-            except Exception as e:
-                print(f"Warning: Failed to insert method {row.get('name')}: {e}")
-        stats['Method'] = len(methods_df)
+def get_node_index(conn, node_index: dict, label: str) -> pd.Series:
+    """索引を取得（今回ロードしていないテーブルはDBから遅延構築）"""
+    if label not in node_index:
+        node_index[label] = build_node_index(conn, label)
+    return node_index[label]
 
-    # File
-    files_df = load_csv_if_exists(data_dir, 'files.csv')
-    if not files_df.empty:
-        for _, row in files_df.iterrows():
-            try:
-                conn.execute(
-                    "CREATE (f:File {path: $path, language: $language, module: $module})",
-                    {
-                        "path": str(row.get('path', '')),
-                        "language": str(row.get('language', '')),
-                        "module": str(row.get('module', ''))
-                    }
-                )
-            except Exception as e:
-                print(f"Warning: Failed to insert file {row.get('path')}: {e}")
-        stats['File'] = len(files_df)
 
-    # Actor
-    actors_df = load_csv_if_exists(data_dir, 'actors.csv')
-    if not actors_df.empty:
-        for _, row in actors_df.iterrows():
+def resolve_endpoints(edges: pd.DataFrame, from_index: pd.Series, to_index: pd.Series) -> tuple:
+    """エッジ両端を索引で一括解決し、解決済みエッジと未解決エッジに分割"""
+    from_offset = edges['from'].map(from_index)
+    to_offset = edges['to'].map(to_index)
+    resolved = from_offset.notna() & to_offset.notna()
+    dangling = edges[~resolved].assign(
+        missing=np.select(
+            [from_offset[~resolved].isna() & to_offset[~resolved].isna(), from_offset[~resolved].isna()],
+            ['both', 'from'], default='to'))
+    return edges[resolved], dangling
+
+
+def edge_key(edges: pd.DataFrame, props: list) -> pd.Series:
+    """エッジの (from, to, プロパティ...) を1つの文字列キーにまとめる"""
+    key = edges['from'] + '\t' + edges['to']
+    for col, _ in props:
+        key = key + '\t' + edges[col].astype(str)
+    return key
+
+
+def edge_pair(key: str) -> tuple:
+    """エッジキーから (from, to) を取り出す"""
+    return tuple(key.split('\t', 2)[:2])
+
+
+def read_node_table(data_dir: Path, filename: str, columns: list, prev_sha: str) -> dict:
+    """ノードCSVを読み込み・検証する（プロセスプールのワーカーで実行）
+
+    CSVが前回ビルドから変わっていない場合は読み込みを省略する。
+    """
+    start = time.perf_counter()
+    filepath = data_dir / filename
+    sha = file_sha256(filepath) if filepath.exists() else None
+    prepared = {'sha256': sha, 'unchanged': sha == prev_sha}
+
+    if not prepared['unchanged']:
+        df = read_typed_csv(data_dir, filename, columns)
+        valid, rejected, dropped = normalize_node_frame(df, columns)
+        prepared.update({
+            'valid': valid,
+            'rejected': rejected,
+            'dropped': dropped,
+            'rows': row_hashes(pd.concat([valid, rejected]), columns[0][0]),
+        })
+
+    prepared['read_seconds'] = time.perf_counter() - start
+    return prepared
+
+
+def read_rel_table(data_dir: Path, filename: str, from_col: str, to_col: str, props: list,
+                   prev_sha: str) -> dict:
+    """リレーションCSVを読み込み・正規化する（プロセスプールのワーカーで実行）"""
+    start = time.perf_counter()
+    filepath = data_dir / filename
+    sha = file_sha256(filepath) if filepath.exists() else None
+    prepared = {'sha256': sha, 'unchanged': sha == prev_sha}
+
+    if not prepared['unchanged']:
+        prepared['edges'] = normalize_edge_frame(data_dir, filename, from_col, to_col, props)
+
+    prepared['read_seconds'] = time.perf_counter() - start
+    return prepared
+
+
+def normalize_edge_frame(data_dir: Path, filename: str, from_col: str, to_col: str,
+                         props: list) -> pd.DataFrame:
+    """リレーションCSVを (from, to, プロパティ...) のDataFrameに正規化
+
+    COPYで登録できないプロパティ値を持つ行は _fallback 列が True になる。
+    """
+    df = read_typed_csv(data_dir, filename, [(from_col, 'STRING'), (to_col, 'STRING')] + props)
+    values, invalid = normalize_columns(df, props)
+    edges = pd.concat([
+        pd.DataFrame({
+            'from': df[from_col] if from_col in df.columns else pd.Series('', index=df.index, dtype=object),
+            'to': df[to_col] if to_col in df.columns else pd.Series('', index=df.index, dtype=object),
+        }),
+        values,
+    ], axis=1)
+    edges['_fallback'] = invalid
+    return edges[(edges['from'] != '') & (edges['to'] != '')]
+
+
+def load_node_table(conn, label: str, columns: list, prepared: dict, prev: dict,
+                    staging_dir: Path) -> tuple:
+    """検証済みのノードテーブルをDBに反映
+
+    前回ビルドのマニフェストと行ハッシュを比較し、追加・更新・削除された行のみ反映する
+    （前回マニフェストが空なら全件が追加扱い）。追加行はステージングCSVからCOPY FROMで
+    一括ロードし、検証に失敗した行のみバッチ化したパラメータ付きCREATEで登録する。
+
+    Returns:
+        (マニフェストのエントリ, 主キー集合が変化した場合は削除された主キー集合、それ以外は None)
+    """
+    pk = columns[0][0]
+    valid, rejected = prepared['valid'], prepared['rejected']
+    if prepared['dropped']:
+        print(f"Warning: Skipped {prepared['dropped']} {label} rows with empty or duplicated key")
+
+    prev_rows = prev['rows']
+    rows = prepared['rows']
+    inserted = [k for k in rows if k not in prev_rows]
+    deleted = [k for k in prev_rows if k not in rows]
+    updated = [k for k, h in rows.items() if k in prev_rows and prev_rows[k] != h]
+
+    if deleted:
+        query = f"UNWIND $rows AS row MATCH (n:{label} {{{pk}: row.key}}) DETACH DELETE n RETURN count(*)"
+        execute_batched(conn, query, [{'key': k} for k in deleted], label)
+
+    if updated:
+        sets = ', '.join(f"n.{col} = {param_expr(col, col_type)}" for col, col_type in columns[1:])
+        query = f"UNWIND $rows AS row MATCH (n:{label} {{{pk}: row.{pk}}}) SET {sets} RETURN count(*)"
+        changed = pd.concat([valid, rejected])
+        execute_batched(conn, query, frame_to_params(changed[changed[pk].isin(updated)]), label)
+
+    if inserted:
+        new_valid = valid[valid[pk].isin(inserted)] if prev_rows else valid
+        new_rejected = rejected[rejected[pk].isin(inserted)] if prev_rows else rejected
+        if not new_valid.empty:
             try:
-                conn.execute(
-                    "CREATE (a:Actor {name: $name, type: $type, description: $description})",
-                    {
-                        "name": str(row.get('name', '')),
-                        "type": str(row.get('type', '')),
-                        "description": str(row.get('description', ''))
-                    }
-                )
+                copy_from(conn, label, stage_csv(new_valid, staging_dir, label))
             except Exception as e:
-                print(f"Warning: Failed to insert actor {row.get('name')}: {e}")
-        stats['Actor'] = len(actors_df)
-
-    # Role
-    roles_df = load_csv_if_exists(data_dir, 'roles.csv')
-    if not roles_df.empty:
-        for _, row in roles_df.iterrows():
+                # COPY自体が失敗した場合は追加行全体をフォールバックで登録
+                print(f"Warning: Bulk load of {label} failed, falling back to batched inserts: {e}")
+                new_rejected = pd.concat([new_valid, new_rejected])
+        if not new_rejected.empty:
+            props = ', '.join(f"{col}: {param_expr(col, col_type)}" for col, col_type in columns)
+            query = f"UNWIND $rows AS row CREATE (n:{label} {{{props}}}) RETURN count(*)"
+            execute_batched(conn, query, frame_to_params(new_rejected), label)
+
+    if prev_rows:
+        print(f"  {label}: +{len(inserted)} ~{len(updated)} -{len(deleted)}")
+
+    entry = {'sha256': prepared['sha256'], 'rows': rows}
+    return entry, set(deleted) if inserted or deleted else None
+
+
+def load_rel_table(conn, rel_type: str, from_label: str, to_label: str, props: list,
+                   edges: pd.DataFrame, prev: dict, changed_keys: dict, node_index: dict,
+                   staging_dir: Path) -> tuple:
+    """正規化済みのリレーションテーブルをDBに反映
+
+    エッジ両端をノード索引で一括解決し、解決できたエッジを前回ビルドと多重集合として比較して、
+    内容が変わった (from, to) の組だけを削除・再作成する。追加分はCOPY FROMで一括ロードし、
+    COPYで登録できないプロパティ値を持つ行のみバッチ化したパラメータ付きCREATEで登録する。
+
+    Returns:
+        (エッジ本数のdict, 未解決エッジのDataFrame)
+    """
+    edges, dangling = resolve_endpoints(
+        edges,
+        get_node_index(conn, node_index, from_label),
+        get_node_index(conn, node_index, to_label))
+    keys = edge_key(edges, props)
+    counts = keys.value_counts()
+    counts = dict(zip(counts.index.tolist(), counts.tolist()))
+
+    # 削除済みノードに接続していたエッジは DETACH DELETE で既に消えている
+    prev_counts = prev['edges']
+    deleted_from = changed_keys.get(from_label)
+    deleted_to = changed_keys.get(to_label)
+    if deleted_from or deleted_to:
+        prev_counts = {
+            k: c for k, c in prev_counts.items()
+            if edge_pair(k)[0] not in (deleted_from or ())
+            and edge_pair(k)[1] not in (deleted_to or ())
+        }
+
+    changed = {k for k in counts.keys() | prev_counts.keys() if counts.get(k) != prev_counts.get(k)}
+    affected = {edge_pair(k) for k in changed}
+    removed = {edge_pair(k) for k in prev_counts} & affected
+
+    from_key = NODE_KEYS[from_label]
+    to_key = NODE_KEYS[to_label]
+    if removed:
+        # 内容が変わった組は一旦すべて削除し、現在のエッジで作り直す
+        query = f"""
+            UNWIND $rows AS row
+            MATCH (a:{from_label} {{{from_key}: row.from}})-[r:{rel_type}]->(b:{to_label} {{{to_key}: row.to}})
+            DELETE r
+            RETURN count(*)
+        """
+        rows = [{'from': f, 'to': t} for f, t in removed]
+        execute_batched(conn, query, rows, rel_type)
+
+    if affected:
+        if prev_counts:
+            pairs = pd.MultiIndex.from_frame(edges[['from', 'to']])
+            edges = edges[pairs.isin(list(affected))]
+        fallback = edges[edges['_fallback']].drop(columns='_fallback')
+        new_edges = edges[~edges['_fallback']].drop(columns='_fallback')
+        if not new_edges.empty:
             try:
-                conn.execute(
-                    "CREATE (r:Role {name: $name, permissions: $permissions})",
-                    {
-                        "name": str(row.get('name', '')),
-                        "permissions": str(row.get('permissions', ''))
-                    }
-                )
+                copy_from(conn, rel_type, stage_csv(new_edges, staging_dir, rel_type))
             except Exception as e:
-                print(f"Warning: Failed to insert role {row.get('name')}: {e}")
-        stats['Role'] = len(roles_df)
-
-    return stats
-
-
-def import_relationships(conn, data_dir: Path) -> dict:
-    """リレーションデータをインポート"""
-    stats = {}
-
-    rel_mappings = [
-        ('belongs_to.csv', 'BELONGS_TO', 'Entity', 'Domain', 'entity', 'domain'),
-        ('defined_in.csv', 'DEFINED_IN', 'Entity', 'File', 'entity', 'file'),
-        ('method_defined_in.csv', 'METHOD_DEFINED_IN', 'Method', 'File', 'method', 'file'),
-        ('references.csv', 'REFERENCES', 'Entity', 'Entity', 'source', 'target'),
-        ('calls.csv', 'CALLS', 'Method', 'Method', 'caller', 'callee'),
-        ('implements.csv', 'IMPLEMENTS', 'Entity', 'Entity', 'child', 'parent'),
-        ('has_term.csv', 'HAS_TERM', 'Entity', 'UbiquitousTerm', 'entity', 'term'),
-        ('method_has_term.csv', 'METHOD_HAS_TERM', 'Method', 'UbiquitousTerm', 'method', 'term'),
-        ('has_role.csv', 'HAS_ROLE', 'Actor', 'Role', 'actor', 'role'),
+                print(f"Warning: Bulk load of {rel_type} failed, falling back to batched inserts: {e}")
+                fallback = pd.concat([new_edges, fallback])
+        if not fallback.empty:
+            rel_props = ', '.join(f"{col}: {param_expr(col, col_type)}" for col, col_type in props)
+            query = f"""
+                UNWIND $rows AS row
+                MATCH (a:{from_label} {{{from_key}: row.from}})
+                MATCH (b:{to_label} {{{to_key}: row.to}})
+                CREATE (a)-[:{rel_type} {{{rel_props}}}]->(b)
+                RETURN count(*)
+            """
+            execute_batched(conn, query, frame_to_params(fallback), rel_type)
+
+    if prev['edges']:
+        print(f"  {rel_type}: {len(affected)} pairs changed, {len(removed)} pairs replaced or removed")
+
+    return counts, dangling
+
+
+def import_graph(conn, data_dir: Path, staging_dir: Path, previous: dict, manifest: dict,
+                 workers: int = None) -> tuple:
+    """ノード・リレーションをテーブル単位のパイプラインでインポート
+
+    全テーブルのCSV読み込み・検証をプロセスプールで並列に行い、読み込みが終わった
+    ノードテーブルから順にDBへ反映する。各リレーションテーブルは両端のノードテーブルの
+    反映が完了した時点で反映を開始する（RyuGraphの書き込みトランザクションは同時に1つのため、
+    DBへの反映自体は1コネクション上で直列に行い、COPY FROM内部の並列化に任せる）。
+
+    Returns:
+        (ノード件数, リレーション件数, 未解決エッジのDataFrame, テーブル別所要時間)
+    """
+    started = time.perf_counter()
+    node_stats, rel_stats, timings = {}, {}, {}
+    changed_keys, node_index = {}, {}
+    dangling_frames = {}
+    prev_nodes = previous.get('nodes', {})
+    prev_rels = previous.get('rels', {})
+    manifest['nodes'], manifest['rels'] = {}, {}
+
+    node_specs = {label: (filename, columns) for filename, label, columns in NODE_TABLES}
+    rel_specs = {spec[1]: spec for spec in REL_TABLES}
+    done_labels = set()
+    read_rels = {}
+
+    def record(name, prepared, load_start):
+        timings[name] = {
+            'read': prepared['read_seconds'],
+            'load': time.perf_counter() - load_start,
+            'finished': time.perf_counter() - started,
+        }
+
+    def apply_node(label, prepared):
+        filename, columns = node_specs[label]
+        prev = prev_nodes.get(label, {'sha256': None, 'rows': {}})
+        load_start = time.perf_counter()
+        if prepared['unchanged']:
+            entry = prev
+        else:
+            entry, deleted = load_node_table(conn, label, columns, prepared, prev, staging_dir)
+            if deleted is not None:
+                changed_keys[label] = deleted
+                node_index[label] = build_node_index(conn, label)
+        manifest['nodes'][label] = entry
+        if entry['rows']:
+            node_stats[label] = len(entry['rows'])
+        done_labels.add(label)
+        record(label, prepared, load_start)
+
+    def apply_rel(rel_type, prepared):
+        filename, _, from_label, to_label, from_col, to_col, props = rel_specs[rel_type]
+        prev = prev_rels.get(rel_type, {'sha256': None, 'edges': {}})
+        load_start = time.perf_counter()
+        # CSVも両端のノード集合も変わっていなければ省略
+        if prepared['unchanged'] and from_label not in changed_keys and to_label not in changed_keys:
+            entry = prev
+            dangling = pd.DataFrame(prev.get('dangling', []), columns=['from', 'to', 'missing'])
+        else:
+            edges = prepared.get('edges')
+            if edges is None:
+                edges = normalize_edge_frame(data_dir, filename, from_col, to_col, props)
+            counts, dangling = load_rel_table(
+                conn, rel_type, from_label, to_label, props, edges, prev, changed_keys, node_index, staging_dir)
+            entry = {
+                'sha256': prepared['sha256'],
+                'edges': counts,
+                'dangling': dangling[['from', 'to', 'missing']].values.tolist(),
+            }
+        manifest['rels'][rel_type] = entry
+        if entry['edges']:
+            rel_stats[rel_type] = sum(entry['edges'].values())
+        dangling_frames[rel_type] = dangling.assign(relation=rel_type, from_label=from_label, to_label=to_label)
+        record(rel_type, prepared, load_start)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for label, (filename, columns) in node_specs.items():
+            prev_sha = prev_nodes.get(label, {}).get('sha256')
+            futures[pool.submit(read_node_table, data_dir, filename, columns, prev_sha)] = ('node', label)
+        for rel_type, (filename, _, _, _, from_col, to_col, props) in rel_specs.items():
+            prev_sha = prev_rels.get(rel_type, {}).get('sha256')
+            future = pool.submit(read_rel_table, data_dir, filename, from_col, to_col, props, prev_sha)
+            futures[future] = ('rel', rel_type)
+
+        for future in as_completed(futures):
+            kind, name = futures[future]
+            if kind == 'node':
+                apply_node(name, future.result())
+            else:
+                read_rels[name] = future.result()
+
+            # 両端のノードテーブルが揃ったリレーションから反映
+            for rel_type in [r for r in rel_specs if r in read_rels]:
+                from_label, to_label = rel_specs[rel_type][2:4]
+                if from_label in done_labels and to_label in done_labels:
+                    apply_rel(rel_type, read_rels.pop(rel_type))
+                    del rel_specs[rel_type]
+
+    # 完了順ではなく定義順に並べ直す
+    node_stats = {label: node_stats[label] for _, label, _ in NODE_TABLES if label in node_stats}
+    rel_stats = {spec[1]: rel_stats[spec[1]] for spec in REL_TABLES if spec[1] in rel_stats}
+    dangling = pd.concat([dangling_frames[spec[1]] for spec in REL_TABLES], ignore_index=True)
+    return node_stats, rel_stats, dangling[DANGLING_COLUMNS], timings
+
+
+def format_timings(timings: dict) -> str:
+    """テーブル別所要時間をMarkdownテーブルに整形（完了時刻順）"""
+    lines = [
+        "| テーブル | 読み込み (s) | DB反映 (s) | 完了時刻 (s) |",
+        "|---------|-------------|-----------|-------------|",
     ]
+    for name, t in sorted(timings.items(), key=lambda item: item[1]['finished']):
+        lines.append(f"| {name} | {t['read']:.2f} | {t['load']:.2f} | {t['finished']:.2f} |")
+    return '\n'.join(lines)
 
-    for filename, rel_type, from_label, to_label, from_col, to_col in rel_mappings:
-        df = load_csv_if_exists(data_dir, filename)
-        if not df.empty:
-            count = 0
-            for _, row in df.iterrows():
-                try:
-                    query = f"""
-                        MATCH (a:{from_label} {{name: $from_name}})
-                        MATCH (b:{to_label} {{name: $to_name}})
-                        CREATE (a)-[:{rel_type}]->(b)
-                    """
-                    # File ノードは path で検索
-                    if to_label == 'File':
-                        query = f"""
-                            MATCH (a:{from_label} {{name: $from_name}})
-                            MATCH (b:{to_label} {{path: $to_name}})
-                            CREATE (a)-[:{rel_type}]->(b)
-                        """
-
-                    conn.execute(query, {
-                        "from_name": str(row.get(from_col, '')),
-                        "to_name": str(row.get(to_col, ''))
-                    })
-                    count += 1
-                except Exception as e:
-                    print(f"Warning: Failed to create {rel_type}: {e}")
-            stats[rel_type] = count
 
-    return stats
+def write_dangling_report(dangling: pd.DataFrame, output_path: Path) -> None:
+    """未解決エッジレポートをCSVで出力"""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    dangling.to_csv(output_path, index=False, encoding='utf-8')
+    print(f"Dangling edge report written to: {output_path} ({len(dangling)} rows)")
 
 
-def generate_statistics(data_dir: Path, node_stats: dict, rel_stats: dict) -> str:
+def generate_statistics(data_dir: Path, node_stats: dict, rel_stats: dict,
+                        dangling_stats: dict = None, timings: dict = None) -> str:
     """統計情報のMarkdownを生成"""
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -323,6 +771,25 @@ def generate_statistics(data_dir: Path, node_stats: dict, rel_stats: dict) -> st
     for rel_type, count in rel_stats.items():
         md += f"| {rel_type} | {count} |\n"
 
+    if dangling_stats:
+        md += """
+## 未解決エッジ
+
+端点のノードが見つからず登録されなかったリレーションです。
+
+| リレーションタイプ | 件数 |
+|------------------|------|
+"""
+        for rel_type, count in dangling_stats.items():
+            md += f"| {rel_type} | {count} |\n"
+
+    if timings:
+        md += f"""
+## インポート所要時間
+
+{format_timings(timings)}
+"""
+
     total_nodes = sum(node_stats.values())
     total_rels = sum(rel_stats.values())
 
@@ -342,6 +809,13 @@ def main():
     parser.add_argument('--data-dir', required=True, help='Directory containing CSV files')
     parser.add_argument('--db-path', required=True, help='Path for the RyuGraph database')
     parser.add_argument('--stats-output', help='Path to output statistics markdown file')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Apply only the rows changed since the previous build '
+                             '(falls back to a full rebuild when no manifest exists)')
+    parser.add_argument('--dangling-report',
+                        help='Path to output a CSV of relationships whose endpoints could not be resolved')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes for reading CSV files (default: CPU count)')
     args = parser.parse_args()
 
     data_dir = Path(args.data_dir)
@@ -351,22 +825,46 @@ def main():
         print(f"Error: Data directory does not exist: {data_dir}")
         sys.exit(1)
 
-    print(f"Creating database at: {db_path}")
-    db, conn = create_database(db_path)
+    previous = load_manifest(db_path) if args.incremental else None
+    if previous is None:
+        print(f"Creating database at: {db_path}")
+        previous = {}
+    else:
+        print(f"Updating database incrementally at: {db_path}")
+    db, conn = create_database(db_path, rebuild=not previous)
+
+    # 適用途中で中断された場合に次回が全件再構築になるよう、先にマニフェストを無効化
+    manifest_path(db_path).unlink(missing_ok=True)
+    # ビルド中・中断後のDBに対するクエリ結果をキャッシュしないよう、ビルドIDも無効化
+    build_id_path(db_path).unlink(missing_ok=True)
+    manifest = {'schema': schema_fingerprint()}
 
     print("Creating schema...")
     create_schema(conn)
 
-    print("Importing nodes...")
-    node_stats = import_nodes(conn, data_dir)
-    print(f"  Imported: {node_stats}")
+    # COPY FROM 用のステージングファイルは一時ディレクトリに置く
+    with tempfile.TemporaryDirectory(prefix='ryugraph-staging-') as staging:
+        staging_dir = Path(staging)
+
+        print("Importing nodes and relationships...")
+        node_stats, rel_stats, dangling, timings = import_graph(
+            conn, data_dir, staging_dir, previous, manifest, args.workers)
+        print(f"  Imported nodes: {node_stats}")
+        print(f"  Imported relationships: {rel_stats}")
+        print(format_timings(timings))
+
+    dangling_stats = dangling.groupby('relation', sort=False).size().to_dict()
+    if dangling_stats:
+        print(f"  Dangling edges (not imported): {dangling_stats}")
+    if args.dangling_report:
+        write_dangling_report(dangling, Path(args.dangling_report))
 
-    print("Importing relationships...")
-    rel_stats = import_relationships(conn, data_dir)
-    print(f"  Imported: {rel_stats}")
+    save_manifest(db_path, manifest)
+    build_id = save_build_id(db_path, incremental=bool(previous))
+    print(f"  Build ID: {build_id}")
 
     # 統計情報の出力
-    stats_md = generate_statistics(data_dir, node_stats, rel_stats)
+    stats_md = generate_statistics(data_dir, node_stats, rel_stats, dangling_stats, timings)
 
     if args.stats_output:
         stats_path = Path(args.stats_output)
@@ -139,112 +139,99 @@ def sanitize_html_content(html_content: str) -> str:
     return result
 
 
-def extract_graph_data(graph_html_path: Path) -> dict:
-    """graph.htmlからD3.jsデータを抽出"""
-    if not graph_html_path.exists():
+# グラフデータセット（visualize_graph.py が graph.html と同じ場所に書き出す manifest + ドメイン別シャード）
+GRAPH_DATASET_DIR = "graph-data"
+GRAPH_DATASET_FORMAT = "knowledge-graph-shards"
+
+
+def load_graph_dataset(dataset_dir: Path) -> dict:
+    """visualize_graph.py のグラフデータセットを読み込む
+
+    Returns:
+        ファイル名 -> JSONテキスト（manifest.json と、そこから参照されるシャード）。
+        データセットがない場合は None
+    """
+    manifest_path = dataset_dir / "manifest.json"
+    if not manifest_path.exists():
         return None
 
-    with open(graph_html_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest_text = f.read()
+    manifest = json.loads(manifest_text)
+    if manifest.get("format") != GRAPH_DATASET_FORMAT:
+        print(f"    Warning: {manifest_path} is not a graph dataset, skipped")
+        return None
+
+    files = {"manifest.json": manifest_text}
+    for name in manifest.get("groups", {}).get("shard", []):
+        shard_path = dataset_dir / name if name else None
+        if shard_path and shard_path.exists():
+            with open(shard_path, 'r', encoding='utf-8') as f:
+                files[name] = f.read()
+    return files
+
+
+def graph_data_scripts(files: dict) -> str:
+    """データセットのファイルを <script type="application/json"> として埋め込む
+
+    ブラウザは実行せずに保持するだけなので、JSONの解析は展開したシャードの分しか発生しない。
+    """
+    tags = []
+    for name, text in files.items():
+        text = text.strip().replace('</', '<\\/')
+        tags.append(f'<script type="application/json" id="graph-data:{name}">{text}</script>')
+    return '\n'.join(tags)
+
 
-    # JavaScriptのdataオブジェクトを抽出
-    import re
-    match = re.search(r'const data = ({.*?});', content, re.DOTALL)
-    if match:
-        return match.group(1)
-    return None
+# インタラクティブグラフビューアの描画方式（svg: 要素ごとのSVG、canvas/webgl: 一括描画）
+GRAPH_RENDERERS = ["svg", "canvas", "webgl"]
 
+# グラフデータセットのビューア（visualize_graph.py と共有する assets/graph-viewer.js）
+GRAPH_VIEWER_JS = (Path(__file__).parent / "assets" / "graph-viewer.js").read_text(encoding="utf-8")
 
-def generate_graph_section(graph_data: str) -> str:
-    """インタラクティブグラフセクションを生成"""
-    if not graph_data:
+
+def generate_graph_section(dataset_files: dict, renderer: str = "svg") -> str:
+    """インタラクティブグラフセクションを生成
+
+    データセットはページに埋め込み（単一ファイルのまま file:// で開けるように）、ビューアは
+    セクションが表示されたときに初期化する。初期表示はドメインのスーパーノードのみで、
+    クリックしたドメインのシャードだけを解析して展開する。
+    renderer が canvas/webgl の場合はSVG要素を作らずキャンバスに一括描画する（大規模グラフ向け）。
+    """
+    if not dataset_files:
         return ""
 
     return f'''
 <article id="graph-interactive">
 <h2>インタラクティブグラフビューア</h2>
-<p>ノードをドラッグして移動、マウスホイールでズーム、ノードにホバーで詳細表示できます。</p>
+<p>ドメインをクリックすると所属ノードを展開・折りたたみできます。ノードをドラッグして移動、マウスホイールでズーム、ノードにホバーで詳細表示できます。</p>
 <div id="graph-container" style="width: 100%; height: 600px; border: 1px solid var(--border-color); border-radius: 8px; overflow: hidden; background: #1a1a2e;">
     <div id="graph-controls" style="position: absolute; padding: 10px; background: rgba(255,255,255,0.9); border-radius: 5px; margin: 10px; z-index: 100;">
         <input type="text" id="graph-search" placeholder="ノードを検索..." style="width: 180px; padding: 5px;">
         <div id="graph-stats" style="font-size: 12px; color: #666; margin-top: 5px;"></div>
     </div>
-    <svg id="graph-svg"></svg>
 </div>
 <div id="graph-legend" style="margin-top: 15px; display: flex; gap: 20px; flex-wrap: wrap;">
     <span><span style="display: inline-block; width: 12px; height: 12px; background: #e74c3c; border-radius: 50%; margin-right: 5px;"></span>Domain</span>
     <span><span style="display: inline-block; width: 12px; height: 12px; background: #3498db; border-radius: 50%; margin-right: 5px;"></span>Entity</span>
     <span><span style="display: inline-block; width: 12px; height: 12px; background: #2ecc71; border-radius: 50%; margin-right: 5px;"></span>Term</span>
+    <span><span style="display: inline-block; width: 12px; height: 12px; background: #95a5a6; border-radius: 50%; margin-right: 5px;"></span>Other</span>
 </div>
 </article>
+{graph_data_scripts(dataset_files)}
 <script>
+{GRAPH_VIEWER_JS}
 (function() {{
-    const data = {graph_data};
-
     const container = document.getElementById('graph-container');
     const width = container.clientWidth;
     const height = 600;
 
-    const svg = d3.select("#graph-svg")
-        .attr("width", width)
-        .attr("height", height);
-
-    const g = svg.append("g");
-
-    // Zoom
-    const zoom = d3.zoom()
-        .scaleExtent([0.1, 4])
-        .on("zoom", (event) => g.attr("transform", event.transform));
-    svg.call(zoom);
-
     // Colors
     const color = d3.scaleOrdinal()
         .domain(["Domain", "Entity", "Term"])
-        .range(["#e74c3c", "#3498db", "#2ecc71"]);
-
-    // Simulation
-    const simulation = d3.forceSimulation(data.nodes)
-        .force("link", d3.forceLink(data.links).id(d => d.id).distance(80))
-        .force("charge", d3.forceManyBody().strength(-200))
-        .force("center", d3.forceCenter(width / 2, height / 2))
-        .force("collision", d3.forceCollide().radius(25));
-
-    // Links
-    const link = g.append("g")
-        .selectAll("line")
-        .data(data.links)
-        .join("line")
-        .attr("stroke", "#666")
-        .attr("stroke-opacity", 0.6)
-        .attr("stroke-width", 1);
-
-    // Nodes
-    const node = g.append("g")
-        .selectAll("g")
-        .data(data.nodes)
-        .join("g")
-        .attr("cursor", "pointer")
-        .call(d3.drag()
-            .on("start", (event, d) => {{
-                if (!event.active) simulation.alphaTarget(0.3).restart();
-                d.fx = d.x; d.fy = d.y;
-            }})
-            .on("drag", (event, d) => {{ d.fx = event.x; d.fy = event.y; }})
-            .on("end", (event, d) => {{
-                if (!event.active) simulation.alphaTarget(0);
-                d.fx = null; d.fy = null;
-            }}));
-
-    node.append("circle")
-        .attr("r", d => d.type === "Domain" ? 15 : 8)
-        .attr("fill", d => color(d.type));
-
-    node.append("text")
-        .text(d => d.name.length > 15 ? d.name.substring(0, 15) + "..." : d.name)
-        .attr("x", 12)
-        .attr("y", 4)
-        .attr("font-size", "10px")
-        .attr("fill", "white");
+        .range(["#e74c3c", "#3498db", "#2ecc71"])
+        .unknown("#95a5a6");
+    const radius = d => (d.type === "Domain" || d.type === "Group" ? 15 : 8) + (d.count !== undefined ? Math.min(Math.sqrt(d.count), 20) : 0);
 
     // Tooltip
     const tooltip = d3.select("body").append("div")
@@ -257,29 +244,55 @@ def generate_graph_section(graph_data: str) -> str:
         .style("pointer-events", "none")
         .style("opacity", 0);
 
-    node.on("mouseover", (event, d) => {{
-        tooltip.style("opacity", 1)
-            .html(`<strong>${{d.name}}</strong><br/>Type: ${{d.type}}<br/>Group: ${{d.group || 'N/A'}}`)
-            .style("left", (event.pageX + 10) + "px")
-            .style("top", (event.pageY - 10) + "px");
-    }}).on("mouseout", () => {{ tooltip.style("opacity", 0); }});
-
-    simulation.on("tick", () => {{
-        link.attr("x1", d => d.source.x).attr("y1", d => d.source.y)
-            .attr("x2", d => d.target.x).attr("y2", d => d.target.y);
-        node.attr("transform", d => `translate(${{d.x}},${{d.y}})`);
-    }});
-
-    // Stats
-    document.getElementById("graph-stats").innerHTML =
-        `Nodes: ${{data.nodes.length}} | Links: ${{data.links.length}}`;
-
-    // Search
-    document.getElementById("graph-search").addEventListener("input", (e) => {{
-        const query = e.target.value.toLowerCase();
-        node.style("opacity", d =>
-            query === "" || d.name.toLowerCase().includes(query) ? 1 : 0.2);
+    function init() {{
+        const explorer = createGraphExplorer(container, datasetSource("{GRAPH_DATASET_DIR}"), {{
+            renderer: "{renderer}", width, height,
+            radius,
+            color: d => color(d.type),
+            linkColor: l => l.weight ? "#999" : "#666",
+            linkWidth: l => l.weight ? Math.min(1 + Math.log2(l.weight), 6) : 1,
+            label: d => {{
+                const name = d.name.length > 15 ? d.name.substring(0, 15) + "..." : d.name;
+                return d.count !== undefined && !explorer.isExpanded(d.id) ? `${{name}} (${{d.count}})` : name;
+            }},
+            labelColor: "white",
+            onHover: (event, d) => {{
+                if (!d) {{ tooltip.style("opacity", 0); return; }}
+                let html = `<strong>${{d.name}}</strong><br/>Type: ${{d.type}}<br/>Group: ${{d.group || 'N/A'}}`;
+                if (d.shard) html += `<br/>Nodes: ${{d.count}}（クリックで${{explorer.isExpanded(d.id) ? "折りたたみ" : "展開"}}）`;
+                tooltip.style("opacity", 1)
+                    .html(html)
+                    .style("left", (event.pageX + 10) + "px")
+                    .style("top", (event.pageY - 10) + "px");
+            }},
+            // Stats
+            onChange: (nodes, links, expandedCount, total) => {{
+                document.getElementById("graph-stats").innerHTML =
+                    `Nodes: ${{nodes.length}} | Links: ${{links.length}} | Expanded: ${{expandedCount}}/${{total}}`;
+            }},
+            onError: err => {{
+                document.getElementById("graph-stats").textContent = `Failed to load graph data: ${{err.message}}`;
+            }}
+        }});
+        explorer.ready.then(() => explorer.fit());
+
+        // Search
+        document.getElementById("graph-search").addEventListener("input", (e) => {{
+            const query = e.target.value.toLowerCase();
+            explorer.highlight(query === "" ? null
+                : new Set(explorer.nodes().filter(d => d.name.toLowerCase().includes(query)).map(d => d.id)));
+        }});
+    }}
+
+    // セクションが画面に入るまでビューアを作らない
+    if (!("IntersectionObserver" in window)) {{ init(); return; }}
+    const observer = new IntersectionObserver(entries => {{
+        if (entries.some(entry => entry.isIntersecting)) {{
+            observer.disconnect();
+            init();
+        }}
     }});
+    observer.observe(container);
 }})();
 </script>
 '''
@@ -426,7 +439,9 @@ SECTIONS = [
         "priority_files": ["schema.md", "statistics.md"],
         "auto_discover": True,
         "include_subdirs": ["visualizations", "data"],
-        "include_extensions": [".yaml", ".yml", ".json"]
+        "include_extensions": [".yaml", ".yml", ".json"],
+        # visualize_graph.py のレイアウトキャッシュと差分生成の状態ファイル（レポートには含めない）
+        "exclude_files": ["visualizations/graph-layout.json", "visualizations/.visualize-state.json"]
     }
 ]
 
@@ -1141,7 +1156,7 @@ def generate_toc_entry(section_id: str, section_title: str, files: list) -> str:
     return '\n'.join(entries)
 
 
-def compile_report(input_dir: str, output: str, title: str, theme: str = "light"):
+def compile_report(input_dir: str, output: str, title: str, theme: str = "light", renderer: str = "svg"):
     """レポートをコンパイル"""
 
     input_path = Path(input_dir)
@@ -1196,6 +1211,7 @@ def compile_report(input_dir: str, output: str, title: str, theme: str = "light"
             include_subdirs,
             include_extensions
         )
+        discovered_files = [f for f in discovered_files if f not in section.get("exclude_files", [])]
 
         if not discovered_files:
             print(f"    No markdown files found")
@@ -1235,13 +1251,12 @@ def compile_report(input_dir: str, output: str, title: str, theme: str = "light"
 
         # グラフセクションの場合、インタラクティブビューアを追加
         if section_id == "graph":
-            graph_html_path = section_dir / "visualizations" / "graph.html"
-            graph_data = extract_graph_data(graph_html_path)
-            if graph_data:
+            dataset_files = load_graph_dataset(section_dir / "visualizations" / GRAPH_DATASET_DIR)
+            if dataset_files:
                 print(f"    Adding: Interactive graph viewer")
                 # 目次にインタラクティブグラフを追加
                 toc_html.append('<li><a href="#graph-interactive">Interactive Viewer</a></li>')
-                content_html.append(generate_graph_section(graph_data))
+                content_html.append(generate_graph_section(dataset_files, renderer))
 
         content_html.append('</section>')
 
@@ -1326,8 +1341,8 @@ def verify_html_report(html_path: Path) -> dict:
     # GraphDBビューアの検証
     if 'id="graph-interactive"' in content:
         stats["has_graph_viewer"] = True
-        # D3.jsデータの存在確認
-        if 'const data = {' not in content:
+        # グラフデータセット（manifest）の存在確認
+        if 'id="graph-data:manifest.json"' not in content:
             errors.append("Graph viewer found but data is missing")
 
     # ナビゲーションリンクの検証
@@ -1410,12 +1425,13 @@ def fix_html_issues(html_path: Path, result: dict) -> bool:
 
     # GraphDBデータ欠損の修正
     if "Graph viewer found but data is missing" in result["errors"]:
-        # 空のデータで初期化
-        empty_data = '{"nodes": [], "links": []}'
-        content = re.sub(
-            r'const data = \{\};',
-            f'const data = {empty_data};',
-            content
+        # 空のデータセットで初期化
+        empty_manifest = json.dumps({"format": GRAPH_DATASET_FORMAT, "nodeTypes": [], "linkTypes": [],
+                                     "typeCounts": {}, "groups": {}, "links": {}})
+        content = content.replace(
+            '<article id="graph-interactive">',
+            f'{graph_data_scripts({"manifest.json": empty_manifest})}\n<article id="graph-interactive">',
+            1
         )
         modified = True
         print("  Fixed: Added empty graph data")
@@ -1511,6 +1527,8 @@ def main():
                         help="Report title")
     parser.add_argument("--theme", choices=["light", "dark"], default="light",
                         help="Color theme (for --format html)")
+    parser.add_argument("--renderer", choices=GRAPH_RENDERERS, default="svg",
+                        help="Drawing backend for the interactive graph viewer (for --format html)")
     parser.add_argument("--format", choices=["html", "nextra"], default="html",
                         help="Output format: html (single file) or nextra (static site)")
     parser.add_argument("--nextra-output", default=None,
@@ -1524,7 +1542,7 @@ def main():
         compile_nextra(args.input_dir, args.nextra_output)
     else:
         # HTML形式でビルド（既存の機能）
-        compile_report(args.input_dir, args.output, args.title, args.theme)
+        compile_report(args.input_dir, args.output, args.title, args.theme, args.renderer)
 
         # HTML検証
         if not args.no_verify:
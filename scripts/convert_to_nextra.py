@@ -89,10 +89,15 @@ SECTION_DEFINITIONS = {
     "graph": {
         "title": "Knowledge Graph",
         "priority": ["statistics.md"],
-        "subdirs": ["visualizations"]
+        "subdirs": ["visualizations"],
+        # visualize_graph.py のレイアウトキャッシュと差分生成の状態ファイル（ページにしない）
+        "exclude": ["visualizations/graph-layout.json", "visualizations/.visualize-state.json"]
     }
 }
 
+# visualize_graph.py が書き出すグラフデータセットのディレクトリ名
+GRAPH_DATASET_DIR = "graph-data"
+
 # 設定ファイル拡張子
 CONFIG_EXTENSIONS = [".yaml", ".yml", ".json", ".properties", ".toml", ".xml", ".feature", ".graphql", ".gql", ".proto"]
 
@@ -376,31 +381,69 @@ def generate_meta_json(section_id: str, files: List[str], section_def: Dict) ->
     return meta
 
 
+def legacy_graph_json(dataset_dir: Path) -> Dict:
+    """シャード化したデータセットを従来の graph.json 形式（{nodes, links}）にまとめる
+
+    既存の GraphViewer コンポーネントは {nodes: [{id, name, type, group}], links: [{source, target, type}]}
+    を読むため、その形式も書き出す。グループをまたぐリンクは両側のシャードに入っているので、
+    始点側のシャードのものだけを使う。
+    """
+    manifest = json.loads((dataset_dir / "manifest.json").read_text(encoding='utf-8'))
+    node_types, link_types = manifest["nodeTypes"], manifest["linkTypes"]
+    groups = manifest["groups"]
+
+    nodes, links, node_ids = [], [], {}
+
+    def add_node(key, name, type_code, group, name_ja=""):
+        node_ids[key] = len(nodes)
+        node = {"id": len(nodes), "name": name, "type": node_types[type_code], "group": group}
+        if name_ja:
+            node["name_ja"] = name_ja
+        nodes.append(node)
+
+    # 未分類グループのスーパーノードは従来の形式にないので、ドメインだけを入れる
+    for key, name, type_code, group in zip(groups["id"], groups["name"], groups["type"], groups["group"]):
+        if node_types[type_code] == "Domain":
+            add_node(key, name, type_code, group)
+
+    shards = [json.loads((dataset_dir / shard).read_text(encoding='utf-8'))
+              for shard in groups["shard"] if shard]
+    for shard in shards:
+        table = shard["nodes"]
+        for type_code, name, group, name_ja in zip(table["type"], table["name"], table["group"], table["name_ja"]):
+            add_node(f"{node_types[type_code]}:{name}", name, type_code, group, name_ja)
+    for shard in shards:
+        table = shard["links"]
+        for source, target, type_code, source_group in zip(table["source"], table["target"], table["type"],
+                                                           table["sourceGroup"]):
+            if source_group == shard["group"] and source in node_ids and target in node_ids:
+                links.append({"source": node_ids[source], "target": node_ids[target], "type": link_types[type_code]})
+    return {"nodes": nodes, "links": links}
+
+
 def copy_graph_data(input_dir: Path, nextra_dir: Path):
     """GraphDBデータをコピー"""
     graph_dir = input_dir / "graph"
     if not graph_dir.exists():
         return
 
-    # visualizations/graph.html からデータを抽出してJSONに変換
-    graph_html = graph_dir / "visualizations" / "graph.html"
-    if graph_html.exists():
-        with open(graph_html, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # JavaScriptのdataオブジェクトを抽出
-        match = re.search(r'const data = ({.*?});', content, re.DOTALL)
-        if match:
-            data_json = match.group(1)
-
-            # public/data/graph.json に保存
-            output_path = nextra_dir / "public" / "data" / "graph.json"
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+    # visualizations/graph-data/ のデータセット（manifest.json + ドメイン別シャード）をそのままコピー。
+    # GraphViewer は manifest を読み込み、展開したドメインのシャードだけを取得する
+    dataset_dir = graph_dir / "visualizations" / GRAPH_DATASET_DIR
+    if (dataset_dir / "manifest.json").exists():
+        output_dir = nextra_dir / "public" / "data" / "graph"
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        shutil.copytree(dataset_dir, output_dir)
 
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(data_json)
+        file_count = len(list(output_dir.glob("*.json")))
+        print(f"  ✓ Graph dataset copied to public/data/graph/ ({file_count} files)")
 
-            print(f"  ✓ Graph data extracted to public/data/graph.json")
+        # 従来の GraphViewer 用に、同じデータを {nodes, links} 形式の graph.json にも書き出す
+        legacy_path = nextra_dir / "public" / "data" / "graph.json"
+        with open(legacy_path, 'w', encoding='utf-8') as f:
+            json.dump(legacy_graph_json(dataset_dir), f, ensure_ascii=False)
+        print(f"  ✓ Graph data written to public/data/graph.json")
 
     # statistics.md などのMarkdownファイルをコピー
     stats_md = graph_dir / "statistics.md"
@@ -427,7 +470,7 @@ Explore the system's knowledge graph with an interactive D3.js visualization.
 - Hover over nodes for details
 - Search for specific nodes
 
-<GraphViewer dataPath="/data/graph.json" />
+<GraphViewer dataPath="/data/graph.json" datasetPath="/data/graph" />
 
 ## Legend
 
@@ -474,6 +517,7 @@ def convert_reports_to_nextra(input_dir: str, nextra_dir: str):
             section_def["priority"],
             section_def.get("subdirs", [])
         )
+        files = [f for f in files if f not in section_def.get("exclude", [])]
 
         if not files:
             print(f"    No files found in {section_id}")
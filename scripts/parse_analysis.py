@@ -8,315 +8,346 @@ GraphDB構築用のCSVファイルを生成します。
 使用方法:
     python parse_analysis.py --input-dir ./.refactoring-output/01_analysis --output-dir ./.refactoring-output/graph/data
 
-前提条件:
-    pip install pandas
+Markdownは1行ずつストリーム処理し、抽出した行はそのままCSVへ書き出すため、
+巨大な入力ファイルでもメモリ使用量は一定です。
+入力ファイルはプロセスプールで並列にパースし、結果は内容ハッシュとパーサーバージョンを
+キーにキャッシュします（既定: <output-dir>/.parse-cache）。変更のない入力はパースを省略します。
 """
 
 import argparse
+import csv
+import hashlib
+import json
 import re
+import shutil
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any
-
-try:
-    import pandas as pd
-except ImportError:
-    print("Error: pandas is not installed. Run: pip install pandas")
-    sys.exit(1)
-
-
-def parse_markdown_table(content: str) -> List[Dict[str, str]]:
-    """Markdownテーブルをパースしてリストに変換"""
-    lines = content.strip().split('\n')
-    rows = []
-    headers = []
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+
+# パース結果の形式やルールを変更した場合は上げる（既存のキャッシュが無効になる）
+PARSER_VERSION = 1
+
+# Markdownテーブルのセパレータ行（|---|:---:| 等）
+SEPARATOR_PATTERN = re.compile(r'^\|[\s\-:]+\|$')
+
+# 出力CSV: 出力名 -> カラム（ファイル名は <出力名>.csv）
+# 同義語（synonyms）はパースのみ行い、現状CSVには出力しない
+CSV_OUTPUTS = {
+    'terms': ['name', 'name_ja', 'definition', 'domain'],
+    'entities': ['name', 'file_path', 'type', 'line_number'],
+    'domains': ['name', 'type', 'description'],
+    'belongs_to': ['entity', 'domain'],
+    'has_term': ['entity', 'term'],
+    'actors': ['name', 'type', 'description'],
+    'roles': ['name', 'permissions'],
+    'has_role': ['actor', 'role'],
+}
+
+
+def iter_markdown_tables(file_path: Path) -> Iterator[Tuple[str, Tuple[str, ...], Dict[str, str]]]:
+    """Markdownファイルを1行ずつ読み、テーブル行を (セクション, ヘッダー, 行) として順に返す
+
+    ファイル全体をメモリに載せず1パスで処理する。テーブルは連続する | 始まりの行で、
+    最初の行をヘッダー、ヘッダーとカラム数が一致する行をデータ行として扱う。
+    """
+    section = "default"
+    headers = None
+
+    with open(file_path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+
+            if not line.startswith('|'):
+                # | で始まらない行でテーブルは終了
+                headers = None
+                if line.startswith('#'):
+                    # # や ## 等のレベルを取り除いてセクション名を取得
+                    section = line.lstrip('#').strip()
+                continue
 
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if not line or not line.startswith('|'):
-            continue
+            # セパレータ行をスキップ
+            if '---' in line or SEPARATOR_PATTERN.match(line):
+                continue
 
-        # セパレータ行をスキップ
-        if re.match(r'^\|[\s\-:]+\|$', line):
-            continue
-        if '---' in line:
+            cells = [cell.strip() for cell in line.split('|')[1:-1]]
+            if headers is None:
+                headers = tuple(cells)
+            elif len(cells) == len(headers):
+                yield section, headers, dict(zip(headers, cells))
+
+
+def parse_ubiquitous_language(file_path: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """ubiquitous_language.md をパースし、(出力名, 行) を順に返す"""
+    for section_name, _, row in iter_markdown_tables(file_path):
+        # 用語テーブル - 複数のカラム形式に対応
+        # 形式1: 用語（日本語）、用語（英語）
+        # 形式2: 用語、英語、定義、コード内の表現
+        name = (row.get('英語', '') or
+                row.get('用語（英語）', '') or
+                row.get('コード上の表現', '') or
+                row.get('コード内の表現', ''))
+        name_ja = (row.get('用語', '') or
+                   row.get('用語（日本語）', ''))
+        definition = (row.get('定義', '') or
+                      row.get('説明', ''))
+
+        if name and name_ja:
+            # ** マーカーを除去
+            name_ja = name_ja.replace('**', '').strip()
+            yield 'terms', {
+                'name': name,
+                'name_ja': name_ja,
+                'definition': definition,
+                'domain': section_name
+            }
             continue
 
-        cells = [cell.strip() for cell in line.split('|')[1:-1]]
-
-        if not headers:
-            headers = cells
-        else:
-            if len(cells) == len(headers):
-                row = dict(zip(headers, cells))
-                rows.append(row)
-
-    return rows
-
-
-def extract_tables_from_markdown(content: str) -> Dict[str, List[Dict[str, str]]]:
-    """Markdownファイルから複数のテーブルを抽出"""
-    tables = {}
-    current_section = "default"
-    lines = content.split('\n')
-
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-
-        # セクションヘッダーを検出
-        if line.startswith('#'):
-            # # や ## 等のレベルを取り除いてセクション名を取得
-            current_section = re.sub(r'^#+\s*', '', line).strip()
-            i += 1
+        # 略語テーブル
+        if '略語' in row:
+            term = {
+                'name': row.get('略語', ''),
+                'name_ja': row.get('正式名称', ''),
+                'definition': row.get('説明', ''),
+                'domain': 'Abbreviation'
+            }
+            if term['name']:
+                yield 'terms', term
+
+        # 同義語テーブル
+        elif '用語A' in row:
+            yield 'synonyms', {
+                'term_a': row.get('用語A', ''),
+                'term_b': row.get('用語B', ''),
+                'preferred': row.get('推奨用語', ''),
+                'reason': row.get('理由', '')
+            }
+
+
+def parse_domain_code_mapping(file_path: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """domain_code_mapping.md をパースし、(出力名, 行) を順に返す"""
+    seen_entities = set()
+    seen_domains = set()
+
+    for section_name, _, row in iter_markdown_tables(file_path):
+        # エンティティマッピングテーブル
+        # 形式1: 概念カテゴリ、コード上の実装
+        # 形式2: ドメイン概念、クラス、テーブル
+        # 形式3: ユースケース、Controller、Service
+        entity_name = (row.get('クラス', '') or
+                       row.get('コード上の実装', '') or
+                       row.get('Controller', '') or
+                       row.get('Service', ''))
+        entity_name = entity_name.replace('`', '').strip()
+
+        # 空や "-" をスキップ
+        if not entity_name or entity_name == '-':
             continue
 
-        # テーブルの開始を検出（|で始まる行）
-        if line.startswith('|'):
-            table_lines = []
-            # テーブル行を収集
-            while i < len(lines) and lines[i].strip().startswith('|'):
-                table_lines.append(lines[i])
-                i += 1
-
-            # テーブルをパース
-            if len(table_lines) >= 2:  # ヘッダー + セパレータ以上
-                table_content = '\n'.join(table_lines)
-                parsed = parse_markdown_table(table_content)
-                if parsed:
-                    if current_section not in tables:
-                        tables[current_section] = []
-                    tables[current_section].extend(parsed)
-            continue
+        domain_concept = (row.get('ドメイン概念', '') or
+                          row.get('用語', '') or
+                          row.get('ユースケース', ''))
+        domain_concept = domain_concept.replace('`', '').replace('**', '').strip()
 
-        i += 1
-
-    return tables
-
-
-def parse_ubiquitous_language(file_path: Path) -> tuple:
-    """ubiquitous_language.md をパース"""
-    content = file_path.read_text(encoding='utf-8')
-    tables = extract_tables_from_markdown(content)
-
-    terms = []
-    synonyms = []
-
-    for section_name, rows in tables.items():
-        for row in rows:
-            # 用語テーブル - 複数のカラム形式に対応
-            # 形式1: 用語（日本語）、用語（英語）
-            # 形式2: 用語、英語、定義、コード内の表現
-            name = (row.get('英語', '') or
-                    row.get('用語（英語）', '') or
-                    row.get('コード上の表現', '') or
-                    row.get('コード内の表現', ''))
-            name_ja = (row.get('用語', '') or
-                       row.get('用語（日本語）', ''))
-            definition = (row.get('定義', '') or
-                          row.get('説明', ''))
-
-            if name and name_ja:
-                # ** マーカーを除去
-                name_ja = name_ja.replace('**', '').strip()
-                term = {
-                    'name': name,
-                    'name_ja': name_ja,
-                    'definition': definition,
-                    'domain': section_name
-                }
-                terms.append(term)
-                continue
+        entity_type = (row.get('概念カテゴリ', '') or
+                       row.get('実装パターン', '') or
+                       row.get('関係', '') or
+                       'Entity')
 
-            # 略語テーブル
-            if '略語' in row:
-                term = {
-                    'name': row.get('略語', ''),
-                    'name_ja': row.get('正式名称', ''),
-                    'definition': row.get('説明', ''),
-                    'domain': 'Abbreviation'
-                }
-                if term['name']:
-                    terms.append(term)
-
-            # 同義語テーブル
-            elif '用語A' in row:
-                synonyms.append({
-                    'term_a': row.get('用語A', ''),
-                    'term_b': row.get('用語B', ''),
-                    'preferred': row.get('推奨用語', ''),
-                    'reason': row.get('理由', '')
-                })
-
-    return terms, synonyms
-
-
-def parse_domain_code_mapping(file_path: Path) -> tuple:
-    """domain_code_mapping.md をパース"""
-    content = file_path.read_text(encoding='utf-8')
-    tables = extract_tables_from_markdown(content)
-
-    entities = []
-    domains = set()
-    belongs_to = []
-    has_term = []
-
-    for section_name, rows in tables.items():
-        for row in rows:
-            # エンティティマッピングテーブル
-            # 形式1: 概念カテゴリ、コード上の実装
-            # 形式2: ドメイン概念、クラス、テーブル
-            # 形式3: ユースケース、Controller、Service
-            entity_name = (row.get('クラス', '') or
-                           row.get('コード上の実装', '') or
-                           row.get('Controller', '') or
-                           row.get('Service', ''))
-            entity_name = entity_name.replace('`', '').strip()
-
-            # 空や "-" をスキップ
-            if not entity_name or entity_name == '-':
-                continue
+        # クラス名を抽出（メソッド呼び出しの場合）
+        if '.' in entity_name and '(' in entity_name:
+            entity_name = entity_name.split('.')[0]
 
-            domain_concept = (row.get('ドメイン概念', '') or
-                              row.get('用語', '') or
-                              row.get('ユースケース', ''))
-            domain_concept = domain_concept.replace('`', '').replace('**', '').strip()
-
-            entity_type = (row.get('概念カテゴリ', '') or
-                           row.get('実装パターン', '') or
-                           row.get('関係', '') or
-                           'Entity')
-
-            # クラス名を抽出（メソッド呼び出しの場合）
-            if '.' in entity_name and '(' in entity_name:
-                entity_name = entity_name.split('.')[0]
-
-            entities.append({
+        # 重複したエンティティは最初の1件のみ出力
+        if entity_name not in seen_entities:
+            seen_entities.add(entity_name)
+            yield 'entities', {
                 'name': entity_name,
                 'file_path': entity_name + '.java' if not entity_name.endswith('.java') else entity_name,
                 'type': entity_type,
                 'line_number': 0
-            })
-
-            # ドメインへの所属
-            domain_name = section_name.replace('###', '').strip()
-            if domain_name and domain_name != 'default':
-                domains.add(domain_name)
-                belongs_to.append({
-                    'entity': entity_name,
-                    'domain': domain_name
-                })
-
-            # 用語との関連
-            if domain_concept:
-                has_term.append({
-                    'entity': entity_name,
-                    'term': domain_concept
-                })
-
-    # 重複を除去
-    seen_entities = set()
-    unique_entities = []
-    for e in entities:
-        if e['name'] not in seen_entities:
-            seen_entities.add(e['name'])
-            unique_entities.append(e)
+            }
+
+        # ドメインへの所属
+        domain_name = section_name.replace('###', '').strip()
+        if domain_name and domain_name != 'default':
+            if domain_name not in seen_domains:
+                seen_domains.add(domain_name)
+                yield 'domains', {'name': domain_name, 'type': 'BusinessDomain', 'description': ''}
+            yield 'belongs_to', {
+                'entity': entity_name,
+                'domain': domain_name
+            }
+
+        # 用語との関連
+        if domain_concept:
+            yield 'has_term', {
+                'entity': entity_name,
+                'term': domain_concept
+            }
+
+
+def parse_actors_roles(file_path: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """actors_roles_permissions.md をパースし、(出力名, 行) を順に返す"""
+    seen_actors = set()
+    seen_roles = set()
 
-    # ドメインをリストに変換
-    domain_list = [{'name': d, 'type': 'BusinessDomain', 'description': ''} for d in domains]
+    for section_name, _, row in iter_markdown_tables(file_path):
+        # アクター詳細テーブル（role値を持つ）
+        if 'role値' in row:
+            actor_name = row.get('アクター', '').replace('**', '').strip()
+            if actor_name and actor_name not in seen_actors:
+                yield 'actors', {
+                    'name': actor_name,
+                    'type': 'Human',
+                    'description': row.get('説明', '') + ' - ' + row.get('主な責務', '')
+                }
+                seen_actors.add(actor_name)
+                # アクターはロールでもある
+                yield 'roles', {
+                    'name': actor_name,
+                    'permissions': row.get('主な責務', '')
+                }
+                seen_roles.add(actor_name)
+                yield 'has_role', {
+                    'actor': actor_name,
+                    'role': actor_name
+                }
 
-    return unique_entities, domain_list, belongs_to, has_term
+        # 外部アクターテーブル
+        elif 'インタラクション' in row:
+            actor_name = row.get('アクター', '').replace('**', '').strip()
+            if actor_name and actor_name not in seen_actors:
+                yield 'actors', {
+                    'name': actor_name,
+                    'type': 'System',
+                    'description': row.get('説明', '')
+                }
+                seen_actors.add(actor_name)
+
+        # 一般的なアクターテーブル
+        elif 'アクター' in row and row.get('アクター'):
+            actor_name = row.get('アクター', '').replace('**', '').strip()
+            if actor_name and actor_name not in seen_actors:
+                yield 'actors', {
+                    'name': actor_name,
+                    'type': 'Human' if '外部' not in section_name else 'System',
+                    'description': row.get('説明', row.get('主な操作', ''))
+                }
+                seen_actors.add(actor_name)
+
+        # ロールテーブル
+        if 'ロール' in row and row.get('ロール'):
+            role_name = row.get('ロール', '').replace('**', '').strip()
+            if role_name and role_name not in seen_roles:
+                yield 'roles', {
+                    'name': role_name,
+                    'permissions': row.get('権限セット', row.get('説明', ''))
+                }
+                seen_roles.add(role_name)
 
 
-def parse_actors_roles(file_path: Path) -> tuple:
-    """actors_roles_permissions.md をパース"""
-    content = file_path.read_text(encoding='utf-8')
-    tables = extract_tables_from_markdown(content)
+def write_csv_stream(records: Iterable[Tuple[str, Dict[str, Any]]], output_dir: Path) -> Dict[str, int]:
+    """(出力名, 行) のストリームを対応するCSVへ逐次書き出す
 
-    actors = []
-    roles = []
-    has_role = []
-    seen_actors = set()
-    seen_roles = set()
+    CSVは最初の行が来た時点で開くため、行が1件もない出力のファイルは作成しない。
 
-    for section_name, rows in tables.items():
-        for row in rows:
-            # アクター詳細テーブル（role値を持つ）
-            if 'role値' in row:
-                actor_name = row.get('アクター', '').replace('**', '').strip()
-                if actor_name and actor_name not in seen_actors:
-                    actors.append({
-                        'name': actor_name,
-                        'type': 'Human',
-                        'description': row.get('説明', '') + ' - ' + row.get('主な責務', '')
-                    })
-                    seen_actors.add(actor_name)
-                    # アクターはロールでもある
-                    roles.append({
-                        'name': actor_name,
-                        'permissions': row.get('主な責務', '')
-                    })
-                    seen_roles.add(actor_name)
-                    has_role.append({
-                        'actor': actor_name,
-                        'role': actor_name
-                    })
-
-            # 外部アクターテーブル
-            elif 'インタラクション' in row:
-                actor_name = row.get('アクター', '').replace('**', '').strip()
-                if actor_name and actor_name not in seen_actors:
-                    actors.append({
-                        'name': actor_name,
-                        'type': 'System',
-                        'description': row.get('説明', '')
-                    })
-                    seen_actors.add(actor_name)
-
-            # 一般的なアクターテーブル
-            elif 'アクター' in row and row.get('アクター'):
-                actor_name = row.get('アクター', '').replace('**', '').strip()
-                if actor_name and actor_name not in seen_actors:
-                    actors.append({
-                        'name': actor_name,
-                        'type': 'Human' if '外部' not in section_name else 'System',
-                        'description': row.get('説明', row.get('主な操作', ''))
-                    })
-                    seen_actors.add(actor_name)
-
-            # ロールテーブル
-            if 'ロール' in row and row.get('ロール'):
-                role_name = row.get('ロール', '').replace('**', '').strip()
-                if role_name and role_name not in seen_roles:
-                    roles.append({
-                        'name': role_name,
-                        'permissions': row.get('権限セット', row.get('説明', ''))
-                    })
-                    seen_roles.add(role_name)
-
-    return actors, roles, has_role
-
-
-def save_csv(data: List[Dict], output_path: Path, columns: List[str] = None):
-    """データをCSVとして保存"""
-    if not data:
-        return
-
-    df = pd.DataFrame(data)
-    if columns:
-        # 指定されたカラムのみ、順序通りに出力
-        existing_cols = [c for c in columns if c in df.columns]
-        df = df[existing_cols]
-
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(output_path, index=False, encoding='utf-8')
-    print(f"Saved: {output_path} ({len(df)} rows)")
+    Returns:
+        出力名ごとの書き出し行数
+    """
+    files = {}
+    writers = {}
+    counts = {}
+
+    try:
+        for name, row in records:
+            columns = CSV_OUTPUTS.get(name)
+            if columns is None:
+                continue
+            if name not in writers:
+                output_path = output_dir / f"{name}.csv"
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                files[name] = open(output_path, 'w', encoding='utf-8', newline='')
+                writers[name] = csv.DictWriter(files[name], fieldnames=columns,
+                                               extrasaction='ignore', lineterminator='\n')
+                writers[name].writeheader()
+                counts[name] = 0
+            writers[name].writerow(row)
+            counts[name] += 1
+    finally:
+        for f in files.values():
+            f.close()
+
+    return counts
+
+
+# 入力種別: (ファイル名の候補（kebab-case と snake_case の両方をサポート）, パーサー)
+INPUTS = {
+    'ubiquitous_language': (['ubiquitous-language.md', 'ubiquitous_language.md'], parse_ubiquitous_language),
+    'domain_code_mapping': (['domain-code-mapping.md', 'domain_code_mapping.md'], parse_domain_code_mapping),
+    'actors_roles_permissions': (['actors-roles-permissions.md', 'actors_roles_permissions.md'],
+                                 parse_actors_roles),
+}
+
+
+def file_sha256(path: Path) -> str:
+    """ファイル内容のSHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_to_cache(kind: str, file_path: Path, cache_dir: Path) -> Tuple[Path, Dict[str, int], bool]:
+    """入力ファイルをパースし、出力CSVをキャッシュエントリに書き出す（プロセスプールのワーカーで実行）
+
+    内容ハッシュとパーサーバージョンが一致するエントリが既にあればパースを省略する。
+
+    Returns:
+        (キャッシュエントリのディレクトリ, 出力名ごとの行数, キャッシュを再利用したか)
+    """
+    entry = cache_dir / f"{kind}-v{PARSER_VERSION}-{file_sha256(file_path)}"
+    counts_path = entry / 'counts.json'
+    if counts_path.exists():
+        return entry, json.loads(counts_path.read_text(encoding='utf-8')), True
+
+    # 書き込み途中のエントリを再利用しないよう、一時ディレクトリに書いてからリネーム
+    staging = Path(tempfile.mkdtemp(prefix=f".{entry.name}.", dir=cache_dir))
+    try:
+        counts = write_csv_stream(INPUTS[kind][1](file_path), staging)
+        (staging / 'counts.json').write_text(json.dumps(counts), encoding='utf-8')
+        shutil.rmtree(entry, ignore_errors=True)
+        staging.rename(entry)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return entry, counts, False
+
+
+def publish_outputs(kind: str, entry: Path, counts: Dict[str, int], output_dir: Path) -> None:
+    """キャッシュエントリのCSVを出力ディレクトリへコピーし、同じ入力種別の古いエントリを削除"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, count in counts.items():
+        output_path = output_dir / f"{name}.csv"
+        shutil.copyfile(entry / f"{name}.csv", output_path)
+        print(f"Saved: {output_path} ({count} rows)")
+
+    for stale in entry.parent.glob(f"{kind}-v*"):
+        if stale != entry:
+            shutil.rmtree(stale, ignore_errors=True)
 
 
 def main():
     parser = argparse.ArgumentParser(description='Parse analysis results to CSV')
     parser.add_argument('--input-dir', required=True, help='Directory containing analysis markdown files')
     parser.add_argument('--output-dir', required=True, help='Directory to output CSV files')
+    parser.add_argument('--cache-dir',
+                        help='Directory for cached parse results (default: <output-dir>/.parse-cache)')
+    parser.add_argument('--no-cache', action='store_true', help='Parse all inputs without using the cache')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes for parsing (default: CPU count)')
     args = parser.parse_args()
 
     input_dir = Path(args.input_dir)
@@ -335,37 +366,34 @@ def main():
                 return file_path
         return None
 
-    # ユビキタス言語 (kebab-case と snake_case の両方をサポート)
-    ubiquitous_file = find_file(['ubiquitous-language.md', 'ubiquitous_language.md'])
-    if ubiquitous_file:
-        print(f"Parsing: {ubiquitous_file}")
-        terms, synonyms = parse_ubiquitous_language(ubiquitous_file)
-        save_csv(terms, output_dir / 'terms.csv', ['name', 'name_ja', 'definition', 'domain'])
-    else:
-        print(f"Warning: ubiquitous-language.md or ubiquitous_language.md not found")
-
-    # ドメイン-コード対応
-    mapping_file = find_file(['domain-code-mapping.md', 'domain_code_mapping.md'])
-    if mapping_file:
-        print(f"Parsing: {mapping_file}")
-        entities, domains, belongs_to, has_term = parse_domain_code_mapping(mapping_file)
-        save_csv(entities, output_dir / 'entities.csv', ['name', 'file_path', 'type', 'line_number'])
-        save_csv(domains, output_dir / 'domains.csv', ['name', 'type', 'description'])
-        save_csv(belongs_to, output_dir / 'belongs_to.csv', ['entity', 'domain'])
-        save_csv(has_term, output_dir / 'has_term.csv', ['entity', 'term'])
-    else:
-        print(f"Warning: domain-code-mapping.md or domain_code_mapping.md not found")
-
-    # アクター・ロール
-    actors_file = find_file(['actors-roles-permissions.md', 'actors_roles_permissions.md'])
-    if actors_file:
-        print(f"Parsing: {actors_file}")
-        actors, roles, has_role = parse_actors_roles(actors_file)
-        save_csv(actors, output_dir / 'actors.csv', ['name', 'type', 'description'])
-        save_csv(roles, output_dir / 'roles.csv', ['name', 'permissions'])
-        save_csv(has_role, output_dir / 'has_role.csv', ['actor', 'role'])
-    else:
-        print(f"Warning: actors-roles-permissions.md or actors_roles_permissions.md not found")
+    inputs = {}
+    for kind, (patterns, _) in INPUTS.items():
+        file_path = find_file(patterns)
+        if file_path:
+            inputs[kind] = file_path
+        else:
+            print(f"Warning: {' or '.join(patterns)} not found")
+
+    with tempfile.TemporaryDirectory(prefix='parse-cache-') as temp_cache:
+        if args.no_cache:
+            cache_dir = Path(temp_cache)
+        else:
+            cache_dir = Path(args.cache_dir) if args.cache_dir else output_dir / '.parse-cache'
+            cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # 入力ファイルは互いに独立しているため並列にパース
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {}
+            for kind, file_path in inputs.items():
+                print(f"Parsing: {file_path}")
+                futures[pool.submit(parse_to_cache, kind, file_path, cache_dir)] = kind
+
+            for future in as_completed(futures):
+                kind = futures[future]
+                entry, counts, cached = future.result()
+                if cached:
+                    print(f"Unchanged: {inputs[kind]} (reusing cached results)")
+                publish_outputs(kind, entry, counts, output_dir)
 
     print("\nParsing complete!")
     print(f"Output directory: {output_dir}")
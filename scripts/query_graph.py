@@ -8,34 +8,102 @@ RyuGraphデータベースに対してCypherクエリを実行します。
     python query_graph.py --db-path ./knowledge.ryugraph --query "MATCH (n) RETURN n LIMIT 10"
     python query_graph.py --db-path ./knowledge.ryugraph --interactive
 
+    # DBを開いたままにするクエリサーバーと、それに問い合わせるクライアント
+    python query_graph.py --db-path ./knowledge.ryugraph --serve
+    python query_graph.py --db-path ./knowledge.ryugraph --connect --template most_referenced
+
+    # 複数のテンプレートの結果を Parquet のデータセットとして書き出す（pyarrow が必要）
+    python query_graph.py --db-path ./knowledge.ryugraph --export ./graph-dataset --templates entities,domains
+
 前提条件:
     pip install ryugraph pandas
 """
 
 import argparse
+import csv
+import hashlib
+import http.client
+import http.server
+import os
+import queue
+import re
+import shlex
+import shutil
+import socket
+import socketserver
 import sys
 import json
+import warnings
+import weakref
+from datetime import datetime
 from pathlib import Path
 
-try:
-    import ryugraph
-except ImportError:
-    print("Error: ryugraph is not installed. Run: pip install ryugraph")
-    sys.exit(1)
 
-try:
-    import pandas as pd
-except ImportError:
-    print("Error: pandas is not installed. Run: pip install pandas")
-    sys.exit(1)
+def import_ryugraph():
+    """ryugraph と pandas を読み込む
+
+    --connect のクライアントはDBを開かないので、起動を軽くするためDBを開くときに初めて読み込む。
+    """
+    try:
+        import ryugraph
+    except ImportError:
+        print("Error: ryugraph is not installed. Run: pip install ryugraph")
+        sys.exit(1)
+
+    try:
+        import pandas  # noqa: F401  結果の get_as_df() が使う
+    except ImportError:
+        print("Error: pandas is not installed. Run: pip install pandas")
+        sys.exit(1)
+    return ryugraph
+
+
+def import_pyarrow():
+    """pyarrow を読み込む（--format arrow/parquet のときだけ必要）"""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        print("Error: pyarrow is not installed. Run: pip install pyarrow")
+        sys.exit(1)
+    return pyarrow
+
+
+# 出力形式
+OUTPUT_FORMATS = ['table', 'json', 'ndjson', 'csv', 'raw']
+
+# --stream で結果のカーソルから1回に取り出す行数
+STREAM_BATCH_ROWS = 10_000
+
+# 列指向のファイル形式 -> 拡張子（pyarrow で書き出す。--output か --export が必要）
+ARROW_FORMATS = {'arrow': '.arrow', 'parquet': '.parquet'}
+
+# --export で書き出せる形式 -> 拡張子
+EXPORT_FORMATS = {**ARROW_FORMATS, 'csv': '.csv', 'ndjson': '.ndjson'}
+
+# --serve で用意するコネクションの既定数（同時に実行できるクエリ数）
+SERVER_POOL_SIZE = 4
+
+# クライアントがサーバーの応答を待つ秒数
+CLIENT_TIMEOUT = 600
+
+# クエリ結果キャッシュの既定の上限（MB）。超えたら最近使っていない結果から削除する
+QUERY_CACHE_MAX_MB = 64
+
+# 更新系の句を含むクエリは結果をキャッシュせず、実行後にキャッシュを削除する（ビルドIDが変わらないままDBが変わるため）
+WRITE_CLAUSE_PATTERN = re.compile(r'\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP|ALTER|COPY|INSTALL|LOAD)\b', re.IGNORECASE)
+
+# Cypherの文字列リテラル（正規化で中の空白を変えないよう区別する）
+STRING_LITERAL_PATTERN = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")""")
 
 
 # よく使うクエリテンプレート
 QUERY_TEMPLATES = {
     "all_nodes": "MATCH (n) RETURN labels(n) AS type, count(*) AS count",
     "all_rels": "MATCH ()-[r]->() RETURN type(r) AS type, count(*) AS count",
-    "terms": "MATCH (t:UbiquitousTerm) RETURN t.name, t.name_ja, t.definition LIMIT 20",
-    "entities": "MATCH (e:Entity) RETURN e.name, e.type, e.file_path LIMIT 20",
+    "terms": "MATCH (t:UbiquitousTerm) RETURN t.name, t.name_ja, t.definition LIMIT {limit}",
+    "entities": "MATCH (e:Entity) RETURN e.name, e.type, e.file_path LIMIT {limit}",
     "domains": "MATCH (d:Domain) RETURN d.name, d.type, d.description",
     "actors": "MATCH (a:Actor) RETURN a.name, a.type, a.description",
     "term_entities": """
@@ -49,38 +117,421 @@ QUERY_TEMPLATES = {
     "method_calls": """
         MATCH (m:Method)-[:CALLS]->(target:Method)
         RETURN m.name AS caller, collect(target.name) AS callees
-        LIMIT 20
+        LIMIT {limit}
     """,
     "most_referenced": """
         MATCH (e:Entity)<-[:REFERENCES]-(other)
         RETURN e.name, e.file_path, count(other) AS references
         ORDER BY references DESC
-        LIMIT 10
+        LIMIT {limit}
     """,
     "circular_deps": """
         MATCH (a:Entity)-[:REFERENCES]->(b:Entity)-[:REFERENCES]->(a)
         RETURN a.name AS entity1, b.name AS entity2
     """,
+    "domain_entities": """
+        MATCH (e:Entity)-[:BELONGS_TO]->(d:Domain {name: $domain})
+        RETURN e.name, e.type, e.file_path
+        LIMIT {limit}
+    """,
+    "dependencies_of": """
+        MATCH (e:Entity {name: $entity})-[:REFERENCES*1..{depth}]->(target:Entity)
+        RETURN DISTINCT target.name AS dependency
+        LIMIT {limit}
+    """,
+    "dependents_of": """
+        MATCH (e:Entity {name: $entity})<-[:REFERENCES*1..{depth}]-(source:Entity)
+        RETURN DISTINCT source.name AS dependent
+        LIMIT {limit}
+    """,
+}
+
+# テンプレートのパラメータ: 名前 -> (型, 説明)。$名前 はCypherのパラメータとして渡し、
+# {名前} は検証した整数をクエリに埋め込む（可変長パターンの上限や LIMIT はパラメータにできないため）
+TEMPLATE_PARAMETERS = {
+    'domain': (str, 'domain name'),
+    'entity': (str, 'entity name'),
+    'depth': (int, 'number of REFERENCES hops (1-10)'),
+    'limit': (int, 'maximum number of rows'),
 }
 
+# テンプレートごとのパラメータの既定値（既定値のないパラメータは指定が必須）
+TEMPLATE_DEFAULTS = {
+    "terms": {'limit': 20},
+    "entities": {'limit': 20},
+    "method_calls": {'limit': 20},
+    "most_referenced": {'limit': 10},
+    "domain_entities": {'limit': 100},
+    "dependencies_of": {'depth': 1, 'limit': 100},
+    "dependents_of": {'depth': 1, 'limit': 100},
+}
+
+# {depth} に指定できる最大値
+MAX_TEMPLATE_DEPTH = 10
+
+
+def template_parameters(name: str) -> list:
+    """テンプレートが使うパラメータ名（出現順）"""
+    used = re.findall(r'\$(\w+)|\{(\w+)\}', QUERY_TEMPLATES[name])
+    names = [dollar or brace for dollar, brace in used]
+    return [param for i, param in enumerate(names) if param in TEMPLATE_PARAMETERS and param not in names[:i]]
+
+
+def parse_params(pairs: list) -> dict:
+    """名前=値 形式の文字列のリストを辞書にする（値は文字列のまま。型の変換は render_template で行う）"""
+    params = {}
+    for pair in pairs or []:
+        name, sep, value = pair.partition('=')
+        if not sep or not name.strip():
+            raise ValueError(f"Expected name=value, got: {pair}")
+        params[name.strip()] = value
+    return params
+
+
+def read_params_file(path: str) -> list:
+    """パラメータのCSV（ヘッダーがパラメータ名）を行ごとの辞書のリストとして読む（空欄は指定なし）"""
+    with open(path, encoding='utf-8', newline='') as f:
+        return [{name: value for name, value in row.items() if name and value not in (None, '')}
+                for row in csv.DictReader(f)]
+
+
+def render_template(name: str, params: dict = None) -> tuple:
+    """テンプレートにパラメータを当てはめる
+
+    Returns:
+        (クエリ, Cypherに渡すパラメータの辞書)。未知・不足・不正なパラメータは ValueError。
+    """
+    params = dict(params or {})
+    used = template_parameters(name)
+    unknown = [param for param in params if param not in used]
+    if unknown:
+        raise ValueError(f"Template '{name}' does not take: {', '.join(unknown)}"
+                         f" (parameters: {', '.join(used) or 'none'})")
+
+    values = {}
+    for param in used:
+        value = params.get(param, TEMPLATE_DEFAULTS.get(name, {}).get(param))
+        if value is None:
+            raise ValueError(f"Template '{name}' requires --param {param}=<{TEMPLATE_PARAMETERS[param][1]}>")
+        kind = TEMPLATE_PARAMETERS[param][0]
+        try:
+            value = kind(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Parameter '{param}' must be {kind.__name__}: {value}")
+        if kind is int and not (1 <= value <= (MAX_TEMPLATE_DEPTH if param == 'depth' else sys.maxsize)):
+            raise ValueError(f"Parameter '{param}' out of range: {value}")
+        values[param] = value
+
+    query = re.sub(r'\{(\w+)\}', lambda m: str(values[m.group(1)]) if m.group(1) in values else m.group(0),
+                   QUERY_TEMPLATES[name])
+    return query, {param: value for param, value in values.items() if f"${param}" in query}
+
 
-def open_database(db_path: str):
-    """データベースを開く"""
+def open_database(db_path: str, read_only: bool = False):
+    """データベースを開く
+
+    読み取り専用なら他の読み取り専用のプロセス（--serve のサーバーなど）と同時に開ける。
+    書き込み可能で開くとファイルを排他ロックするため、他のプロセスが開いていると失敗する。
+    """
     db_dir = Path(db_path)
     if not db_dir.exists():
         print(f"Error: Database does not exist: {db_path}")
         print("Run /build-graph first to create the database.")
         sys.exit(1)
 
-    db = ryugraph.Database(db_path)
+    ryugraph = import_ryugraph()
+    try:
+        db = ryugraph.Database(db_path, read_only=read_only)
+    except RuntimeError as e:
+        if 'lock' not in str(e).lower():
+            raise
+        print(f"Error: Database is locked by another process: {db_path}")
+        print("Stop the query server (--serve) or wait for /build-graph to finish first,"
+              " or send the query to the server with --connect.")
+        sys.exit(1)
     conn = ryugraph.Connection(db)
     return db, conn
 
 
-def execute_query(conn, query: str, output_format: str = 'table') -> str:
-    """クエリを実行して結果を返す"""
+def read_build_id(db_path: str) -> str:
+    """build_graph.py がDBの隣に書き出したビルドIDを読む（DB・IDがないか読めなければ None）"""
+    if not Path(db_path).exists():
+        return None
+    try:
+        return json.loads(Path(f"{db_path}.build.json").read_text(encoding='utf-8')).get('build_id')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def normalize_query(query: str) -> str:
+    """キャッシュキー用にクエリを正規化（文字列リテラルの外の空白をまとめ、末尾の ; を除く）"""
+    parts = STRING_LITERAL_PATTERN.split(query.strip().rstrip(';').strip())
+    return ''.join(part if i % 2 else re.sub(r'\s+', ' ', part) for i, part in enumerate(parts))
+
+
+def query_cache_key(query: str, params: dict, output_format: str, build_id: str) -> str:
+    """(正規化したクエリ, パラメータ, 出力形式, ビルドID) のハッシュ"""
+    source = json.dumps([normalize_query(query), params or {}, output_format, build_id],
+                        ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def cache_get(cache_dir: Path, key: str) -> str:
+    """キャッシュした結果を返す（なければ None）。使った結果は更新日時を新しくしてLRUの末尾に回す"""
+    path = cache_dir / f"{key}.txt"
+    try:
+        text = path.read_text(encoding='utf-8')
+        os.utime(path)
+    except OSError:
+        return None
+    return text
+
+
+def cache_put(cache_dir: Path, key: str, text: str, max_bytes: int) -> None:
+    """結果をキャッシュに書き、上限を超えた分を更新日時の古い順に削除する
+
+    cache_dir はビルドIDごとのディレクトリ。別のビルドIDのディレクトリは無効なので削除する。
+    """
+    data = text.encode('utf-8')
+    if len(data) > max_bytes:
+        return
+    if cache_dir.parent.exists():
+        for other in cache_dir.parent.iterdir():
+            if other.is_dir() and other != cache_dir:
+                shutil.rmtree(other, ignore_errors=True)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # 同時に書く他のプロセスと混ざらないよう、一時ファイルに書いてから置き換える
+    temp = cache_dir / f".{key}.{os.getpid()}.tmp"
+    temp.write_bytes(data)
+    os.replace(temp, cache_dir / f"{key}.txt")
+
+    entries = []
+    for path in cache_dir.glob('*.txt'):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def is_write_query(query: str) -> bool:
+    """更新系の句を含むクエリか（文字列リテラルの中は見ない）"""
+    return bool(WRITE_CLAUSE_PATTERN.search(STRING_LITERAL_PATTERN.sub("''", query)))
+
+
+def cached_runner(run_query, db_path: str, cache_root: Path, max_bytes: int):
+    """run_query(クエリ, 出力形式, パラメータ) に結果キャッシュをかぶせた関数を返す
+
+    ビルドIDがない（ビルド前・ビルド中の）DB、更新系のクエリ、エラーになった結果はキャッシュしない。
+    更新系のクエリを実行したら、同じビルドIDのままDBが変わるので、そのビルドIDのキャッシュを削除する。
+    """
+    def run(query, output_format, params=None):
+        build_id = read_build_id(db_path)
+        if build_id is None:
+            return run_query(query, output_format, params)
+        if is_write_query(query):
+            try:
+                return run_query(query, output_format, params)
+            finally:
+                shutil.rmtree(cache_root / build_id, ignore_errors=True)
+        cache_dir = cache_root / build_id
+        key = query_cache_key(query, params, output_format, build_id)
+        output = cache_get(cache_dir, key)
+        if output is None:
+            output = run_query(query, output_format, params)
+            if not output.startswith("Query error:"):
+                cache_put(cache_dir, key, output, max_bytes)
+        return output
+    return run
+
+
+# コネクションごとのプリペアドステートメント: コネクション -> {クエリ: ステートメント}
+# （弱参照なので、コネクションが破棄されるとそのステートメントも消える）
+_PREPARED = weakref.WeakKeyDictionary()
+
+
+def prepared_statement(conn, query: str):
+    """クエリをコネクション上で一度だけ準備し、以後は同じステートメントを返す"""
+    statements = _PREPARED.setdefault(conn, {})
+    statement = statements.get(query)
+    if statement is None:
+        # ryugraph は prepare と execute を分ける使い方を非推奨として DeprecationWarning を出すが、
+        # execute(クエリ, パラメータ) は呼ぶたびに解析・計画をやり直すため、同じテンプレートを
+        # 繰り返し実行する --params-file やサーバーでは準備済みのステートメントを使い回す
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            statement = conn.prepare(query)
+        if not statement.is_success():
+            raise RuntimeError(statement.get_error_message())
+        statements[query] = statement
+    return statement
+
+
+def run_statement(conn, query: str, params: dict = None):
+    """クエリを実行して結果のカーソルを返す
+
+    params があればプリペアドステートメントで実行する。prepare がない ryugraph では
+    execute(クエリ, パラメータ) に任せる（呼ぶたびに準備し直すが、結果は同じ）。
+    """
+    if not params:
+        return conn.execute(query)
+    if not hasattr(conn, 'prepare'):
+        return conn.execute(query, params)
+    return conn.execute(prepared_statement(conn, query), params)
+
+
+def markdown_cell(value) -> str:
+    """Markdownの表のセルに書ける文字列にする"""
+    text = '' if value is None else str(value)
+    return text.replace('|', '\\|').replace('\r', ' ').replace('\n', ' ')
+
+
+def stream_query(conn, query: str, output_format: str, out, params: dict = None,
+                 batch_size: int = STREAM_BATCH_ROWS, max_rows: int = None) -> tuple:
+    """クエリ結果をカーソルから batch_size 行ずつ取り出し、out に書いていく
+
+    結果全体をメモリに載せないので、表（Markdown）は列幅を揃えずに1行ずつ書く。
+    max_rows 行を書いたところで打ち切る。
+
+    Returns:
+        (書いた行数, max_rows で打ち切ったか)
+    """
+    result = run_statement(conn, query, params)
+    columns = result.get_column_names()
+    writer = csv.writer(out) if output_format == 'csv' else None
+    if writer:
+        writer.writerow(columns)
+    elif output_format == 'json':
+        out.write('[')
+
+    written = 0
+    while max_rows is None or written < max_rows:
+        size = batch_size if max_rows is None else min(batch_size, max_rows - written)
+        batch = []
+        while len(batch) < size and result.has_next():
+            batch.append(result.get_next())
+        if not batch:
+            break
+
+        if writer:
+            writer.writerows(batch)
+        elif output_format in ('json', 'ndjson'):
+            lines = [json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) for row in batch]
+            if output_format == 'json':
+                out.write(('\n  ' if written == 0 else ',\n  ') + ',\n  '.join(lines))
+            else:
+                out.write('\n'.join(lines) + '\n')
+        elif output_format == 'table':
+            if written == 0:
+                out.write('| ' + ' | '.join(markdown_cell(col) for col in columns) + ' |\n')
+                out.write('|' + '|'.join('---' for _ in columns) + '|\n')
+            out.writelines('| ' + ' | '.join(markdown_cell(value) for value in row) + ' |\n' for row in batch)
+        else:
+            out.writelines(f"{row}\n" for row in batch)
+        written += len(batch)
+        out.flush()
+
+    if output_format == 'json':
+        out.write('\n]\n' if written else ']\n')
+    elif written == 0 and output_format in ('table', 'raw'):
+        out.write("No results found.\n")
+    out.flush()
+    return written, result.has_next()
+
+
+def write_arrow(conn, query: str, output_format: str, path: Path, params: dict = None,
+                batch_size: int = STREAM_BATCH_ROWS) -> int:
+    """クエリ結果を Arrow IPC ファイルまたは Parquet に書き出し、行数を返す
+
+    エンジンが返す Arrow テーブル（get_as_arrow）をそのまま書くので、列の型が保たれ、
+    pandas や文字列を経由する変換も発生しない。
+    """
+    pa = import_pyarrow()
+    table = run_statement(conn, query, params).get_as_arrow(batch_size)
+    if output_format == 'parquet':
+        pa.parquet.write_table(table, str(path))
+    else:
+        with pa.OSFile(str(path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=batch_size)
+    return table.num_rows
+
+
+def export_runs(names: list, params: dict) -> list:
+    """--export で実行するテンプレートを (テンプレート名, クエリ, パラメータ) のリストにする
+
+    names が空なら、params と既定値だけで実行できるテンプレートをすべて選ぶ。
+    params は各テンプレートが使うものだけを渡す。
+    """
+    def runnable(name):
+        return all(param in params or param in TEMPLATE_DEFAULTS.get(name, {}) for param in template_parameters(name))
+
+    unknown = [name for name in names if name not in QUERY_TEMPLATES]
+    if unknown:
+        raise ValueError(f"Unknown template: {', '.join(unknown)}"
+                         f" (available: {', '.join(QUERY_TEMPLATES.keys())})")
+    runs = []
+    for name in names or [name for name in QUERY_TEMPLATES if runnable(name)]:
+        used = template_parameters(name)
+        runs.append((name, *render_template(name, {k: v for k, v in params.items() if k in used})))
+    return runs
+
+
+def export_dataset(conn, runs: list, output_format: str, export_dir: Path, db_path: str,
+                   batch_size: int = STREAM_BATCH_ROWS) -> dict:
+    """複数のテンプレートの結果を1つのコネクションで実行し、ディレクトリに1ファイルずつ書き出す
+
+    runs は (テンプレート名, クエリ, パラメータ) のリスト。各ファイルの行数・クエリ・パラメータと
+    DBのビルドIDを manifest.json に記録する。失敗したテンプレート（DBにないテーブルを参照するものなど）は
+    途中まで書いたファイルを消してエラーを記録し、残りを続ける。manifest.json は常に書き出す。
+
+    Returns:
+        manifest の内容
+    """
+    export_dir.mkdir(parents=True, exist_ok=True)
+    tables = {}
+    for name, query, params in runs:
+        path = export_dir / f"{name}{EXPORT_FORMATS[output_format]}"
+        entry = {"file": path.name, "rows": None, "query": ' '.join(query.split()), "params": params}
+        tables[name] = entry
+        try:
+            if output_format in ARROW_FORMATS:
+                entry["rows"] = write_arrow(conn, query, output_format, path, params, batch_size)
+            else:
+                with open(path, 'w', encoding='utf-8', newline='') as f:
+                    entry["rows"], _ = stream_query(conn, query, output_format, f, params, batch_size)
+        except Exception as e:
+            path.unlink(missing_ok=True)
+            entry["file"] = None
+            entry["error"] = str(e)
+            print(f"  Failed: {name}: {e}", file=sys.stderr)
+            continue
+        print(f"  Exported: {path} ({entry['rows']} rows)", file=sys.stderr)
+
+    manifest = {
+        "format": output_format,
+        "db_path": str(db_path),
+        "build_id": read_build_id(db_path),
+        "exported_at": datetime.now().isoformat(timespec='seconds'),
+        "tables": tables,
+    }
+    (export_dir / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+    return manifest
+
+
+def execute_query(conn, query: str, output_format: str = 'table', params: dict = None) -> str:
+    """クエリを実行して結果を返す
+
+    params（テンプレートのパラメータ）を渡した場合は、プリペアドステートメントとして実行する。
+    """
     try:
-        result = conn.execute(query)
+        result = run_statement(conn, query, params)
 
         if output_format == 'json':
             rows = []
@@ -88,6 +539,10 @@ def execute_query(conn, query: str, output_format: str = 'table') -> str:
                 rows.append(dict(zip(result.get_column_names(), row)))
             return json.dumps(rows, indent=2, ensure_ascii=False)
 
+        elif output_format == 'ndjson':
+            columns = result.get_column_names()
+            return '\n'.join(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) for row in result)
+
         elif output_format == 'table':
             df = result.get_as_df()
             if df.empty:
@@ -115,7 +570,8 @@ def show_schema(conn) -> str:
     output.append("## Node Tables\n")
 
     # ノード数をカウント
-    node_types = ['UbiquitousTerm', 'Domain', 'Entity', 'Method', 'File', 'Actor', 'Role']
+    node_types = ['UbiquitousTerm', 'Domain', 'Entity', 'Method', 'File', 'Actor', 'Role',
+                  'BusinessProcess', 'Activity', 'SystemProcess']
     for node_type in node_types:
         try:
             result = conn.execute(f"MATCH (n:{node_type}) RETURN count(*) AS count")
@@ -128,7 +584,9 @@ def show_schema(conn) -> str:
     output.append("\n## Relationship Tables\n")
 
     rel_types = ['BELONGS_TO', 'DEFINED_IN', 'METHOD_DEFINED_IN', 'REFERENCES',
-                 'CALLS', 'IMPLEMENTS', 'HAS_TERM', 'METHOD_HAS_TERM', 'HAS_ROLE']
+                 'CALLS', 'IMPLEMENTS', 'HAS_TERM', 'METHOD_HAS_TERM', 'HAS_ROLE',
+                 'HAS_ACTIVITY', 'NEXT_ACTIVITY', 'PERFORMS', 'TRIGGERS', 'INVOKES',
+                 'PARTICIPATES_IN', 'COMPENSATES']
     for rel_type in rel_types:
         try:
             result = conn.execute(f"MATCH ()-[r:{rel_type}]->() RETURN count(*) AS count")
@@ -141,14 +599,183 @@ def show_schema(conn) -> str:
     return '\n'.join(output)
 
 
-def interactive_mode(conn):
-    """対話モードで実行"""
+# ==============================================================================
+# クエリサーバー（--serve）とクライアント（--connect）
+# ==============================================================================
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unixドメインソケットで待ち受けるHTTPサーバー（リクエストごとにスレッドで処理）"""
+    daemon_threads = True
+
+
+class QueryRequestHandler(http.server.BaseHTTPRequestHandler):
+    """POST /query・/schema をプールのコネクションで実行し、出力をJSONで返す
+
+    リクエスト: /query は {"query": Cypher, "format": 出力形式, "params": パラメータ（省略可）}、/schema は {}。
+    パラメータ付きのクエリはコネクションごとに準備したステートメントを使い回す。
+    レスポンス: {"output": 出力}（エラー時は {"error": メッセージ}）。GET /health で死活確認。
+    """
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, {"status": "ok", "db_path": self.server.db_path})
+        else:
+            self.send_json(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError as e:
+            self.send_json(400, {"error": f"Invalid request: {e}"})
+            return
+
+        if self.path == '/query':
+            query = request.get('query')
+            output_format = request.get('format', 'table')
+            params = request.get('params')
+            if (not isinstance(query, str) or output_format not in OUTPUT_FORMATS
+                    or not isinstance(params, (dict, type(None)))):
+                self.send_json(400, {"error": "Expected {\"query\": str, \"format\": one of " +
+                                              ", ".join(OUTPUT_FORMATS) + ", \"params\": object}"})
+                return
+            run = lambda conn: execute_query(conn, query, output_format, params)
+        elif self.path == '/schema':
+            run = show_schema
+        else:
+            self.send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+
+        # コネクションはプールから1つ借り、実行後に返す（空きがなければ返却を待つ）
+        conn = self.server.pool.get()
+        try:
+            output = run(conn)
+        finally:
+            self.server.pool.put(conn)
+        self.send_json(200, {"output": output})
+
+    def send_json(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unixドメインソケットでは client_address がホスト・ポートの組にならない
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'local'
+
+    def log_message(self, format, *args):
+        # リクエストごとのアクセスログは出さない
+        pass
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """Unixドメインソケットへ接続する http.client のコネクション"""
+
+    def __init__(self, socket_path: str, timeout: float = CLIENT_TIMEOUT):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def server_address(db_path: str, socket_path: str = None, port: int = None) -> str:
+    """サーバーの待ち受け先（--port 指定時は 127.0.0.1:ポート、それ以外はUnixソケットのパス）"""
+    if port:
+        return f"127.0.0.1:{port}"
+    return socket_path or f"{Path(db_path)}.sock"
+
+
+def server_request(address: str, path: str, body: dict = None):
+    """サーバーにリクエストを送り、レスポンスのJSONを返す（つながらなければ None）"""
+    host, _, port = address.rpartition(':')
+    if port.isdigit() and host:
+        conn = http.client.HTTPConnection(host, int(port), timeout=CLIENT_TIMEOUT)
+    else:
+        conn = UnixHTTPConnection(address)
+    try:
+        if body is None:
+            conn.request('GET', path)
+        else:
+            conn.request('POST', path, json.dumps(body, ensure_ascii=False).encode('utf-8'),
+                         {'Content-Type': 'application/json; charset=utf-8'})
+        response = conn.getresponse()
+        return json.loads(response.read())
+    except (OSError, http.client.HTTPException, ValueError):
+        return None
+    finally:
+        conn.close()
+
+
+def remote_output(reply) -> str:
+    """サーバーのレスポンスを表示用の文字列にする"""
+    if reply is None:
+        return "Query error: Lost connection to the query server"
+    if 'error' in reply:
+        return f"Query error: {reply['error']}"
+    return reply['output']
+
+
+def serve(db_path: str, address: str, pool_size: int = SERVER_POOL_SIZE):
+    """DBを開いたまま、クエリをHTTPで受け付ける（Ctrl+C で終了）
+
+    コネクションを pool_size 個用意し、同時に届いたクエリはそれぞれ別のコネクションで実行する。
+    DBは読み取り専用で開くので、サーバーの実行中も他のプロセスが読み取り専用で開ける
+    （更新系のクエリは受け付けない。/build-graph の前にはサーバーを止める）。
+    """
+    if server_request(address, '/health') is not None:
+        print(f"Error: A query server is already running at {address}")
+        sys.exit(1)
+
+    db, conn = open_database(db_path, read_only=True)
+    ryugraph = import_ryugraph()
+    pool = queue.Queue()
+    pool.put(conn)
+    for _ in range(pool_size - 1):
+        pool.put(ryugraph.Connection(db))
+
+    host, _, port = address.rpartition(':')
+    if port.isdigit() and host:
+        server = http.server.ThreadingHTTPServer((host, int(port)), QueryRequestHandler)
+    else:
+        # 前回異常終了したサーバーのソケットファイルが残っていれば消す
+        Path(address).unlink(missing_ok=True)
+        server = ThreadingUnixHTTPServer(address, QueryRequestHandler)
+    server.pool = pool
+    server.db_path = db_path
+
+    print(f"Serving {db_path} on {address} ({pool_size} connections). Press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        server.server_close()
+        if not (port.isdigit() and host):
+            Path(address).unlink(missing_ok=True)
+
+
+# ==============================================================================
+# 対話モード
+# ==============================================================================
+
+def interactive_mode(run_query, run_schema):
+    """対話モードで実行
+
+    run_query(クエリ, 出力形式, パラメータ) と run_schema() は、DBを直接開いた場合もサーバー経由の場合も
+    出力文字列を返す。
+    """
     print("RyuGraph Interactive Query Mode")
     print("=" * 40)
     print("Commands:")
     print("  :schema     - Show database schema")
     print("  :templates  - Show query templates")
-    print("  :t <name>   - Execute template query")
+    print("  :t <name> [param=value ...] - Execute template query")
     print("  :format <f> - Set output format (table, json, csv, raw)")
     print("  :quit       - Exit")
     print("=" * 40)
@@ -171,31 +798,42 @@ def interactive_mode(conn):
             break
 
         elif query == ':schema':
-            print(show_schema(conn))
+            print(run_schema())
 
         elif query == ':templates':
             print("\nAvailable templates:")
             for name, q in QUERY_TEMPLATES.items():
-                print(f"  {name}: {q.strip()[:60]}...")
+                params = ' '.join(f"[{param}=...]" if param in TEMPLATE_DEFAULTS.get(name, {}) else f"{param}=..."
+                                  for param in template_parameters(name))
+                print(f"  {name}{' ' + params if params else ''}: {' '.join(q.split())[:60]}...")
             print()
 
         elif query.startswith(':t '):
-            template_name = query[3:].strip()
-            if template_name in QUERY_TEMPLATES:
-                print(f"\nExecuting template: {template_name}")
-                print(f"Query: {QUERY_TEMPLATES[template_name].strip()}")
+            try:
+                template_name, *pairs = shlex.split(query[3:])
+                if template_name not in QUERY_TEMPLATES:
+                    print(f"Unknown template: {template_name}")
+                    print()
+                    continue
+                template_query, params = render_template(template_name, parse_params(pairs))
+            except ValueError as e:
+                print(f"Error: {e}")
                 print()
-                result = execute_query(conn, QUERY_TEMPLATES[template_name], output_format)
-                print(result)
-            else:
-                print(f"Unknown template: {template_name}")
+                continue
+            print(f"\nExecuting template: {template_name}")
+            print(f"Query: {template_query.strip()}")
+            if params:
+                print(f"Parameters: {json.dumps(params, ensure_ascii=False)}")
+            print()
+            result = run_query(template_query, output_format, params)
+            print(result)
 
         elif query.startswith(':format '):
             output_format = query[8:].strip()
             print(f"Output format set to: {output_format}")
 
         else:
-            result = execute_query(conn, query, output_format)
+            result = run_query(query, output_format)
             print(result)
 
         print()
@@ -206,34 +844,186 @@ def main():
     parser.add_argument('--db-path', required=True, help='Path to the RyuGraph database')
     parser.add_argument('--query', '-q', help='Cypher query to execute')
     parser.add_argument('--template', '-t', help='Use a predefined query template')
-    parser.add_argument('--format', '-f', choices=['table', 'json', 'csv', 'raw'],
-                        default='table', help='Output format')
+    parser.add_argument('--param', '-p', action='append', metavar='NAME=VALUE',
+                        help='Template parameter (domain, entity, depth, limit); repeatable')
+    parser.add_argument('--params-file', metavar='CSV',
+                        help='Run the template once per row of this CSV (header = parameter names), '
+                             'reusing one prepared statement')
+    parser.add_argument('--format', '-f', choices=OUTPUT_FORMATS + list(ARROW_FORMATS),
+                        help='Output format (default: table; arrow/parquet need --output or --export '
+                             'and the pyarrow package)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write rows incrementally while reading the result cursor (constant memory; '
+                             'opens the database read-only, bypassing --connect and the cache)')
+    parser.add_argument('--output', '-o', help='Write the result to this file instead of stdout')
+    parser.add_argument('--max-rows', type=int,
+                        help='Stop after this many rows (implies --stream)')
+    parser.add_argument('--batch-size', type=int, default=STREAM_BATCH_ROWS,
+                        help='Rows fetched from the cursor per batch with --stream '
+                             '(record batch size with arrow/parquet)')
+    parser.add_argument('--export', metavar='DIR',
+                        help='Run several templates in one database session and write one file per template '
+                             '(plus manifest.json) to DIR; --format arrow, parquet (default), csv or ndjson')
+    parser.add_argument('--templates', metavar='NAMES',
+                        help='Comma-separated templates for --export '
+                             '(default: every template runnable with the given --param values)')
     parser.add_argument('--interactive', '-i', action='store_true',
                         help='Run in interactive mode')
     parser.add_argument('--schema', '-s', action='store_true',
                         help='Show database schema')
+    parser.add_argument('--serve', action='store_true',
+                        help='Keep the database open and answer queries over HTTP on a Unix socket (or --port)')
+    parser.add_argument('--connect', action='store_true',
+                        help='Send the query to a running --serve server instead of opening the database '
+                             '(falls back to opening it when no server is running)')
+    parser.add_argument('--socket', help='Unix socket path for --serve/--connect (default: <db-path>.sock)')
+    parser.add_argument('--port', type=int, help='Use HTTP on 127.0.0.1:PORT instead of a Unix socket')
+    parser.add_argument('--pool-size', type=int, default=SERVER_POOL_SIZE,
+                        help='Number of database connections kept open by --serve')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the query result cache')
+    parser.add_argument('--cache-dir', help='Directory for cached query results (default: <db-path>.query-cache)')
+    parser.add_argument('--cache-size', type=int, default=QUERY_CACHE_MAX_MB,
+                        help='Maximum size of the query result cache in MB')
     args = parser.parse_args()
+    if args.export:
+        args.format = args.format or 'parquet'
+        if args.format not in EXPORT_FORMATS:
+            parser.error(f"--export supports --format {', '.join(EXPORT_FORMATS)}")
+        if args.query or args.template or args.params_file:
+            parser.error("--export takes --templates, not --query/--template/--params-file")
+    elif args.templates:
+        parser.error("--templates requires --export")
+    elif (args.param or args.params_file) and not args.template:
+        parser.error("--param/--params-file require --template")
+    args.format = args.format or 'table'
+    if args.max_rows is not None:
+        args.stream = True
+    if args.stream and not (args.query or args.template):
+        parser.error("--stream/--max-rows require --query or --template")
+    if args.format in ARROW_FORMATS and not args.export:
+        if not (args.query or args.template) or not args.output:
+            parser.error(f"--format {args.format} requires --query or --template, and --output")
+        if args.params_file or args.stream:
+            parser.error(f"--format {args.format} writes one result per file; use --export for several")
+    if args.format in ARROW_FORMATS:
+        import_pyarrow()
+    # 列指向形式・エクスポートはストリーミングと同じく、サーバーとキャッシュを通さずDBを読み取り専用で直接開く
+    direct = args.stream or args.format in ARROW_FORMATS or bool(args.export)
+
+    address = server_address(args.db_path, args.socket, args.port)
+    if args.serve:
+        serve(args.db_path, address, max(1, args.pool_size))
+        return
+
+    if args.connect and not direct and server_request(address, '/health') is not None:
+        def run_query(query, output_format, params=None):
+            return remote_output(server_request(address, '/query',
+                                                {"query": query, "format": output_format, "params": params}))
+
+        def run_schema():
+            return remote_output(server_request(address, '/schema', {}))
+    else:
+        if args.connect and not direct:
+            print(f"Warning: No query server at {address}; opening the database directly", file=sys.stderr)
+        # キャッシュにある結果だけで済む場合はDBを開かないよう、最初に必要になったときに開く。
+        # サーバーの実行中も開けるよう、更新系のクエリと対話モード以外は読み取り専用で開く
+        opened = {}
+
+        def connection(read_only=True):
+            if not opened:
+                opened['db'], opened['conn'] = open_database(args.db_path,
+                                                             read_only=read_only and not args.interactive)
+            return opened['conn']
+
+        def run_query(query, output_format, params=None):
+            return execute_query(connection(read_only=not is_write_query(query)), query, output_format, params)
 
-    db, conn = open_database(args.db_path)
+        def run_schema():
+            return show_schema(connection())
+
+    if not args.no_cache and not direct:
+        cache_root = Path(args.cache_dir) if args.cache_dir else Path(f"{args.db_path}.query-cache")
+        run_query = cached_runner(run_query, args.db_path, cache_root, args.cache_size * 1024 * 1024)
 
     if args.schema:
-        print(show_schema(conn))
+        print(run_schema())
 
     elif args.interactive:
-        interactive_mode(conn)
+        interactive_mode(run_query, run_schema)
 
-    elif args.template:
-        if args.template in QUERY_TEMPLATES:
-            result = execute_query(conn, QUERY_TEMPLATES[args.template], args.format)
-            print(result)
-        else:
-            print(f"Unknown template: {args.template}")
-            print("Available templates:", ', '.join(QUERY_TEMPLATES.keys()))
+    elif args.export:
+        try:
+            names = [name.strip() for name in (args.templates or '').split(',') if name.strip()]
+            runs = export_runs(names, parse_params(args.param))
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        manifest = export_dataset(connection(), runs, args.format, Path(args.export), args.db_path,
+                                  max(1, args.batch_size))
+        failed = [name for name, entry in manifest['tables'].items() if 'error' in entry]
+        print(f"Exported {len(manifest['tables']) - len(failed)} tables to: {args.export}"
+              + (f" ({len(failed)} failed: {', '.join(failed)}; see manifest.json)" if failed else ''),
+              file=sys.stderr)
+        # 明示したテンプレートは1つでも失敗したら、既定の選択ではすべて失敗したときだけエラー終了
+        if failed and (names or len(failed) == len(manifest['tables'])):
             sys.exit(1)
 
-    elif args.query:
-        result = execute_query(conn, args.query, args.format)
-        print(result)
+    elif args.format in ARROW_FORMATS:
+        query, params = args.query, None
+        if args.template:
+            if args.template not in QUERY_TEMPLATES:
+                print(f"Unknown template: {args.template}")
+                print("Available templates:", ', '.join(QUERY_TEMPLATES.keys()))
+                sys.exit(1)
+            try:
+                query, params = render_template(args.template, parse_params(args.param))
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+        try:
+            rows = write_arrow(connection(read_only=not is_write_query(query)), query, args.format, Path(args.output), params, max(1, args.batch_size))
+        except Exception as e:
+            print(f"Query error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Result written to: {args.output} ({rows} rows)", file=sys.stderr)
+
+    elif args.template or args.query:
+        runs = [(args.query, None)]
+        if args.template:
+            if args.template not in QUERY_TEMPLATES:
+                print(f"Unknown template: {args.template}")
+                print("Available templates:", ', '.join(QUERY_TEMPLATES.keys()))
+                sys.exit(1)
+            try:
+                base = parse_params(args.param)
+                rows = [{**base, **row} for row in read_params_file(args.params_file)] if args.params_file else [base]
+                runs = [render_template(args.template, row) for row in rows]
+            except (OSError, ValueError) as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+
+        out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+        try:
+            for query, params in runs:
+                if args.params_file:
+                    out.write(f"-- {json.dumps(params, ensure_ascii=False)}\n")
+                if not args.stream:
+                    out.write(run_query(query, args.format, params) + '\n')
+                    continue
+                try:
+                    written, truncated = stream_query(connection(read_only=not is_write_query(query)), query, args.format, out, params,
+                                                      batch_size=max(1, args.batch_size), max_rows=args.max_rows)
+                except Exception as e:
+                    print(f"Query error: {e}", file=sys.stderr)
+                    sys.exit(1)
+                if truncated:
+                    print(f"Warning: Stopped after {written} rows (--max-rows {args.max_rows})", file=sys.stderr)
+        finally:
+            if args.output:
+                out.close()
+        if args.output:
+            print(f"Result written to: {args.output}", file=sys.stderr)
 
     else:
         parser.print_help()
@@ -12,51 +12,424 @@ RyuGraphデータベースの内容をMermaid/DOT/HTML形式で可視化しま
 """
 
 import argparse
+import hashlib
 import json
+import multiprocessing
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
 try:
+    import numpy as np
     import pandas as pd
 except ImportError:
     print("Error: pandas is not installed. Run: pip install pandas")
     sys.exit(1)
 
 
-ALL_CSV_FILES = [
-    # Nodes
-    'terms.csv', 'domains.csv', 'entities.csv', 'methods.csv', 'files.csv',
-    'actors.csv', 'roles.csv', 'business_processes.csv', 'activities.csv',
-    'system_processes.csv',
-    # Relationships
-    'belongs_to.csv', 'defined_in.csv', 'method_defined_in.csv',
-    'references.csv', 'calls.csv', 'implements.csv',
-    'has_term.csv', 'method_has_term.csv', 'has_role.csv',
-    'has_activity.csv', 'next_activity.csv', 'performs.csv',
-    'triggers.csv', 'invokes.csv', 'participates_in.csv',
-    'compensates.csv',
+# ノード定義: (CSVキー, ラベル, 主キーカラム)
+NODE_SPECS = [
+    ('terms', 'Term', 'name'),
+    ('domains', 'Domain', 'name'),
+    ('entities', 'Entity', 'name'),
+    ('methods', 'Method', 'name'),
+    ('files', 'File', 'path'),
+    ('actors', 'Actor', 'name'),
+    ('roles', 'Role', 'name'),
+    ('business_processes', 'BusinessProcess', 'name'),
+    ('activities', 'Activity', 'name'),
+    ('system_processes', 'SystemProcess', 'name'),
+]
+
+# リレーション定義: (CSVキー, FROMラベル, TOラベル, FROMカラム, TOカラム)
+REL_SPECS = [
+    ('belongs_to', 'Entity', 'Domain', 'entity', 'domain'),
+    ('defined_in', 'Entity', 'File', 'entity', 'file'),
+    ('method_defined_in', 'Method', 'File', 'method', 'file'),
+    ('references', 'Entity', 'Entity', 'source', 'target'),
+    ('calls', 'Method', 'Method', 'caller', 'callee'),
+    ('implements', 'Entity', 'Entity', 'child', 'parent'),
+    ('has_term', 'Entity', 'Term', 'entity', 'term'),
+    ('method_has_term', 'Method', 'Term', 'method', 'term'),
+    ('has_role', 'Actor', 'Role', 'actor', 'role'),
+    ('has_activity', 'BusinessProcess', 'Activity', 'process', 'activity'),
+    ('next_activity', 'Activity', 'Activity', 'from_activity', 'to_activity'),
+    ('performs', 'Actor', 'Activity', 'actor', 'activity'),
+    ('triggers', 'Activity', 'SystemProcess', 'activity', 'system_process'),
+    ('invokes', 'SystemProcess', 'Method', 'source', 'method'),
+    ('participates_in', 'Entity', 'BusinessProcess', 'entity', 'process'),
+    ('compensates', 'SystemProcess', 'SystemProcess', 'source', 'target'),
+]
+
+ALL_CSV_FILES = [f"{spec[0]}.csv" for spec in NODE_SPECS + REL_SPECS]
+
+# 絞り込み読み込みで1回に読むCSVの行数
+LOAD_CHUNK_ROWS = 100_000
+
+# --domain 指定時に、ドメインのノードから何ホップ先のノードまで読み込むか
+FILTER_HOPS = 1
+
+# --domain 指定時に、読み込むビジネスプロセスから hops に関係なくたどるリレーション: (CSVキー, 順方向か)。
+# プロセスフロー・アクターマップ・システムプロセス図が、プロセスを絞り込まない場合と同じ内容で描けるよう、
+# アクティビティ → 実行するアクター・トリガーするシステムプロセス → アクターのロール・呼び出すメソッドの順にたどる
+PROCESS_CLOSURE = [
+    ('has_activity', True),
+    ('performs', False),
+    ('triggers', True),
+    ('has_role', True),
+    ('invokes', True),
 ]
 
 
-def load_csv_data(data_dir: str) -> dict:
-    """CSVファイルからデータを読み込む"""
+def load_csv_data(data_dir: str, domain: str = None, node_types: list = None, hops: int = FILTER_HOPS) -> dict:
+    """CSVファイルからデータを読み込み、グラフモデルを構築する
+
+    domain を指定すると、そのドメインに属するノードから hops ホップ以内のノードと、それらのビジネスプロセスの
+    構成要素（PROCESS_CLOSURE）、両端がそれらのノードであるリレーションだけを読み込む。node_types（ラベルのリスト）を指定すると、
+    そのラベルのノードと両端がそのラベルのリレーションだけを読み込む。
+    絞り込む場合はCSVをチャンク単位で読み、条件に合う行だけをメモリに残す。
+    """
     data_path = Path(data_dir)
-    data = {}
+    labels = set(node_types) if node_types else {label for _, label, _ in NODE_SPECS}
+    kept = None
+    if domain:
+        kept = expand_nodes(data_path, domain_seed_nodes(data_path, domain, labels), labels, hops)
+        kept = expand_processes(data_path, kept, labels)
+
+    tables = {}
+    # CSVごとの内容ハッシュ（成果物の再生成要否の判定に使う。ファイルがないか読まなければ None）
+    table_hashes = {}
+    # テーブルごとの行の条件: (ラベル, カラム) の組。すべてのカラムが kept の名前に含まれる行を残す
+    columns = {key: [(label, pk)] for key, label, pk in NODE_SPECS}
+    columns.update({key: [(from_label, from_col), (to_label, to_col)]
+                    for key, from_label, to_label, from_col, to_col in REL_SPECS})
 
     for csv_file in ALL_CSV_FILES:
         csv_path = data_path / csv_file
         key = csv_file.replace('.csv', '')
-        if csv_path.exists():
+        if not csv_path.exists() or any(label not in labels for label, _ in columns[key]):
+            tables[key] = pd.DataFrame()
+            table_hashes[key] = None
+            continue
+        table_hashes[key] = file_digest(csv_path)
+        if kept is None:
             df = pd.read_csv(csv_path)
-            data[key] = df
             print(f"  Loaded: {csv_file} ({len(df)} rows)")
         else:
-            data[key] = pd.DataFrame()
+            df, total = read_csv_rows(csv_path, lambda chunk, key=key: np.logical_and.reduce(
+                [column_in(chunk, col, kept[label]) for label, col in columns[key]]))
+            print(f"  Loaded: {csv_file} ({len(df)} of {total} rows)")
+        tables[key] = df
+
+    graph = build_graph_model(tables)
+    graph['table_hashes'] = table_hashes
+    # 読み込み時の絞り込み条件（成果物の再生成要否の判定に使う）
+    graph['filters'] = {'domain': domain, 'node_types': sorted(node_types) if node_types else None,
+                        'hops': hops if domain else None}
+    return graph
+
+
+def read_csv_rows(csv_path: Path, keep=None, usecols=None) -> tuple:
+    """CSVをチャンク単位で読み、keep(chunk) が True の行だけを残す
+
+    Returns:
+        (残した行の DataFrame, CSVの全行数)
+    """
+    chunks = []
+    total = 0
+    for chunk in pd.read_csv(csv_path, chunksize=LOAD_CHUNK_ROWS, usecols=usecols):
+        total += len(chunk)
+        chunks.append(chunk if keep is None else chunk[keep(chunk)])
+    if not chunks:
+        return pd.read_csv(csv_path, nrows=0, usecols=usecols), 0
+    return pd.concat(chunks, ignore_index=True), total
+
+
+def column_in(chunk: pd.DataFrame, column: str, names: set) -> np.ndarray:
+    """チャンクの各行について、column の値が names に含まれるか（カラムがなければすべて False）"""
+    if column not in chunk.columns:
+        return np.zeros(len(chunk), dtype=bool)
+    values = chunk[column]
+    return (values.notna() & values.astype(str).isin(names)).to_numpy()
+
+
+def domain_seed_nodes(data_path: Path, domain: str, labels: set) -> dict:
+    """ドメインに直接属するノードの名前をラベルごとに集める
+
+    エンティティは BELONGS_TO、用語・ビジネスプロセスは domain 属性、
+    メソッドは methods.csv のうちクラス名（名前の最初の "." より前）が所属エンティティのもの。
+    """
+    kept = {label: set() for label in labels}
+    if 'Domain' in labels:
+        kept['Domain'].add(domain)
+
+    def collect(key, column, keep):
+        csv_path = data_path / f"{key}.csv"
+        if not csv_path.exists():
+            return set()
+        df, _ = read_csv_rows(csv_path, keep, usecols=lambda c: c in (column, 'domain'))
+        return set(df[column].dropna().astype(str)) if column in df.columns else set()
+
+    def in_domain(chunk):
+        return column_in(chunk, 'domain', {domain})
+
+    if 'Entity' in labels:
+        kept['Entity'] = collect('belongs_to', 'entity', in_domain)
+    if 'Term' in labels:
+        kept['Term'] = collect('terms', 'name', in_domain)
+    if 'BusinessProcess' in labels:
+        kept['BusinessProcess'] = collect('business_processes', 'name', in_domain)
+    if 'Method' in labels and kept.get('Entity'):
+        entities = kept['Entity']
+
+        def in_class(chunk):
+            if 'name' not in chunk.columns:
+                return np.zeros(len(chunk), dtype=bool)
+            return np.array([isinstance(name, str) and name.split('.', 1)[0] in entities
+                             for name in chunk['name'].tolist()], dtype=bool)
+
+        kept['Method'] = collect('methods', 'name', in_class)
+    return kept
+
+
+def expand_nodes(data_path: Path, kept: dict, labels: set, hops: int) -> dict:
+    """リレーションを hops 回たどって kept にノードを加える
+
+    1ホップごとに対象のリレーションCSVを1回チャンク単位で走査し、今回のフロンティアに触れる行の
+    反対側のノードを加える。ドメインは多数のエンティティにつながるハブなので、ドメインからはたどらない。
+
+    Returns:
+        ラベル -> ノード名の集合
+    """
+    rels = [spec for spec in REL_SPECS
+            if spec[1] in labels and spec[2] in labels and (data_path / f"{spec[0]}.csv").exists()]
+    frontier = {label: set(names) for label, names in kept.items()}
+    reached = {label: set() for label in labels}
+
+    def touches(chunk, names, sides):
+        hit = np.zeros(len(chunk), dtype=bool)
+        for label, col in sides:
+            if label != 'Domain' and names[label]:
+                hit |= column_in(chunk, col, names[label])
+        return hit
+
+    for _ in range(hops):
+        added = {label: set() for label in labels}
+        for key, from_label, to_label, from_col, to_col in rels:
+            sides = ((from_label, from_col), (to_label, to_col))
+            for chunk in pd.read_csv(data_path / f"{key}.csv", chunksize=LOAD_CHUNK_ROWS):
+                if from_col not in chunk.columns or to_col not in chunk.columns:
+                    break
+                hit = touches(chunk, frontier, sides)
+                hit &= chunk[from_col].notna().to_numpy() & chunk[to_col].notna().to_numpy()
+                added[from_label].update(chunk[from_col][hit].astype(str))
+                added[to_label].update(chunk[to_col][hit].astype(str))
+        for label in labels:
+            reached[label] |= frontier[label]
+            kept[label] |= added[label]
+        frontier = {label: added[label] - reached[label] for label in labels}
+        if not any(frontier.values()):
+            break
+    return kept
+
+
+def expand_processes(data_path: Path, kept: dict, labels: set) -> dict:
+    """読み込むビジネスプロセスの構成要素（PROCESS_CLOSURE）を hops に関係なく kept に加える"""
+    specs = {spec[0]: spec for spec in REL_SPECS}
+    for key, forward in PROCESS_CLOSURE:
+        _, from_label, to_label, from_col, to_col = specs[key]
+        csv_path = data_path / f"{key}.csv"
+        if from_label not in labels or to_label not in labels or not csv_path.exists():
+            continue
+        seed_label, seed_col, add_label, add_col = ((from_label, from_col, to_label, to_col) if forward
+                                                    else (to_label, to_col, from_label, from_col))
+        if not kept[seed_label]:
+            continue
+        df, _ = read_csv_rows(csv_path, lambda chunk: column_in(chunk, seed_col, kept[seed_label]),
+                              usecols=lambda c: c in (seed_col, add_col))
+        if add_col in df.columns:
+            kept[add_label] |= set(df[add_col].dropna().astype(str))
+    return kept
+
+
+def intern_names(node: dict, names: pd.Series) -> np.ndarray:
+    """名前列をノードIDの配列に変換（ノードCSVにない名前は末尾に追加してIDを振る）"""
+    # 辞書の参照はユニークな名前についてのみ行い、行へはコードで展開する
+    codes, uniques = pd.factorize(names)
+    ids = np.empty(len(uniques), dtype=np.int64)
+    for i, name in enumerate(uniques.tolist()):
+        nid = node['ids'].get(name)
+        if nid is None:
+            nid = node['ids'][name] = len(node['names'])
+            node['names'].append(name)
+        ids[i] = nid
+    return ids[codes]
+
+
+def build_csr(keys: np.ndarray, size: int) -> tuple:
+    """CSR形式の隣接配列を構築
+
+    Returns:
+        (indptr, エッジIDの配列) - ノード v のエッジは order[indptr[v]:indptr[v + 1]]（CSVの行順）
+    """
+    order = np.argsort(keys, kind='stable')
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=size), out=indptr[1:])
+    return indptr, order
+
+
+def build_graph_model(tables: dict) -> dict:
+    """CSVのDataFrameから、全ジェネレーターが共有するグラフモデルを構築
+
+    ノードはラベルごとに整数IDを振り（ノードCSVの行順。主キー重複は先頭行を採用）、
+    名前→IDの辞書と属性のリストを持つ。リレーションはエッジごとの始点・終点IDと
+    プロパティ、および順方向・逆方向のCSR隣接配列を持つ。
+    """
+    nodes = {}
+    for key, label, pk in NODE_SPECS:
+        df = tables[key]
+        if pk in df.columns:
+            df = df[df[pk].notna()]
+            df = df.assign(**{pk: df[pk].astype(str)}).drop_duplicates(pk).reset_index(drop=True)
+            names = df[pk].tolist()
+        else:
+            names = []
+        nodes[label] = {
+            'names': names,
+            'ids': {name: i for i, name in enumerate(names)},
+            # ノードCSVに存在するノード数（これ以降のIDはリレーションにのみ現れる名前）
+            'count': len(names),
+            'attrs': {col: df[col].tolist() for col in df.columns} if names else {},
+        }
+
+    rels = {}
+    for key, from_label, to_label, from_col, to_col in REL_SPECS:
+        df = tables[key]
+        if from_col in df.columns and to_col in df.columns:
+            df = df[df[from_col].notna() & df[to_col].notna()].reset_index(drop=True)
+        else:
+            df = pd.DataFrame(columns=[from_col, to_col])
+        rels[key] = {
+            'from': from_label,
+            'to': to_label,
+            'src': intern_names(nodes[from_label], df[from_col].astype(str)),
+            'dst': intern_names(nodes[to_label], df[to_col].astype(str)),
+            'attrs': {col: df[col].tolist() for col in df.columns if col not in (from_col, to_col)},
+        }
+
+    # 全リレーションの名前を登録し終えてからノード数に合わせて隣接配列を作る
+    for rel in rels.values():
+        rel['out'] = build_csr(rel['src'], len(nodes[rel['from']]['names']))
+        rel['in'] = build_csr(rel['dst'], len(nodes[rel['to']]['names']))
+
+    return {'tables': tables, 'nodes': nodes, 'rels': rels}
+
+
+def node_names(graph: dict, label: str) -> list:
+    """ノードCSVに存在するノード名の一覧（CSVの行順）"""
+    node = graph['nodes'][label]
+    return node['names'][:node['count']]
+
+
+def node_attr(graph: dict, label: str, name: str, col: str, default=''):
+    """ノード属性を取得（ノードCSVに行やカラムがない場合は default）"""
+    node = graph['nodes'][label]
+    nid = node['ids'].get(name)
+    if nid is None or nid >= node['count'] or col not in node['attrs']:
+        return default
+    return node['attrs'][col][nid]
+
+
+def out_edges(graph: dict, rel_key: str, name: str) -> np.ndarray:
+    """ノードから出るエッジのID（CSVの行順）"""
+    rel = graph['rels'][rel_key]
+    nid = graph['nodes'][rel['from']]['ids'].get(name)
+    if nid is None:
+        return np.empty(0, dtype=np.int64)
+    indptr, order = rel['out']
+    return order[indptr[nid]:indptr[nid + 1]]
+
+
+def in_edges(graph: dict, rel_key: str, name: str) -> np.ndarray:
+    """ノードに入るエッジのID（CSVの行順）"""
+    rel = graph['rels'][rel_key]
+    nid = graph['nodes'][rel['to']]['ids'].get(name)
+    if nid is None:
+        return np.empty(0, dtype=np.int64)
+    indptr, order = rel['in']
+    return order[indptr[nid]:indptr[nid + 1]]
+
+
+def csr_edges(indptr: np.ndarray, order: np.ndarray, nids: np.ndarray) -> np.ndarray:
+    """複数ノードのエッジIDをノード順に連結して返す（各ノード内はCSVの行順）"""
+    starts, ends = indptr[nids], indptr[nids + 1]
+    lengths = ends - starts
+    if not lengths.sum():
+        return np.empty(0, dtype=np.int64)
+    # 各ノードの [start, end) を1本の連番に展開
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return order[np.arange(lengths.sum()) + offsets]
 
-    return data
+
+def edge_sources(graph: dict, rel_key: str, edges) -> list:
+    """エッジIDの始点ノード名"""
+    rel = graph['rels'][rel_key]
+    names = graph['nodes'][rel['from']]['names']
+    return [names[i] for i in rel['src'][edges].tolist()]
+
+
+def edge_targets(graph: dict, rel_key: str, edges) -> list:
+    """エッジIDの終点ノード名"""
+    rel = graph['rels'][rel_key]
+    names = graph['nodes'][rel['to']]['names']
+    return [names[i] for i in rel['dst'][edges].tolist()]
+
+
+def edge_attr(graph: dict, rel_key: str, edge: int, col: str, default=''):
+    """エッジのプロパティを取得（カラムがない場合は default）"""
+    attrs = graph['rels'][rel_key]['attrs']
+    return attrs[col][edge] if col in attrs else default
+
+
+def attr_array(graph: dict, label: str, col: str, default='') -> np.ndarray:
+    """ノード属性をID順の配列で取得（ノードCSVに行やカラムがない場合は default）"""
+    node = graph['nodes'][label]
+    values = np.full(len(node['names']), default, dtype=object)
+    if col in node['attrs']:
+        values[:node['count']] = node['attrs'][col]
+    return values
+
+
+def safe_ids(graph: dict, label: str) -> np.ndarray:
+    """ラベルの全ノードの safe_id をID順の配列で取得（初回に一括変換してキャッシュ）"""
+    node = graph['nodes'][label]
+    if 'safe_ids' not in node:
+        node['safe_ids'] = np.array([safe_id(name) for name in node['names']], dtype=object)
+    return node['safe_ids']
+
+
+def edge_safe_ids(graph: dict, rel_key: str, edges=None) -> tuple:
+    """エッジ両端の safe_id の配列（edges 省略時は全エッジをCSVの行順で）"""
+    rel = graph['rels'][rel_key]
+    src, dst = rel['src'], rel['dst']
+    if edges is not None:
+        src, dst = src[edges], dst[edges]
+    return safe_ids(graph, rel['from'])[src], safe_ids(graph, rel['to'])[dst]
+
+
+def edge_count(graph: dict, rel_key: str) -> int:
+    """リレーションのエッジ数"""
+    return len(graph['rels'][rel_key]['src'])
+
+
+def all_edges(graph: dict, rel_key: str) -> zip:
+    """全エッジの (始点名, 終点名) をCSVの行順で返す"""
+    edges = np.arange(edge_count(graph, rel_key))
+    return zip(edge_sources(graph, rel_key, edges), edge_targets(graph, rel_key, edges))
 
 
 def safe_id(name: str) -> str:
@@ -69,54 +442,335 @@ def quote_ja(text: str) -> str:
     return f'"{text}"'
 
 
+def file_digest(path: Path) -> str:
+    """ファイル内容の SHA-256（16進）"""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+# 実行中のタスクが書き出したファイル -> 内容の SHA-256（run_task が成果物ごとに集める）
+_WRITTEN_FILES = {}
+
+
+def write_output(path, text: str) -> bool:
+    """テキストを書き出す。内容が既存ファイルと同じなら書き換えず（更新日時を保つ）、False を返す"""
+    path = Path(path)
+    data = text.encode('utf-8')
+    _WRITTEN_FILES[str(path)] = hashlib.sha256(data).hexdigest()
+    if path.is_file() and path.stat().st_size == len(data) and path.read_bytes() == data:
+        return False
+    path.write_bytes(data)
+    return True
+
+
+# ==============================================================================
+# Mermaid: ページ分割
+# ==============================================================================
+
+# 1ページ（1つの .mmd）に含めるノード数・エッジ数の上限（Mermaid の既定の maxEdges は 500）
+MERMAID_MAX_NODES = 150
+MERMAID_MAX_EDGES = 300
+
+# ページ分割の単位: domain（ドメイン単位）、component（連結成分単位）、partition（グラフ全体を探索順に分割）
+PARTITION_STRATEGIES = ['domain', 'component', 'partition']
+
+
+def connected_components(n: int, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """無向グラフとしての連結成分を求める（ラベル伝播 + ポインタジャンプ）
+
+    Returns:
+        ノードごとの成分ラベル（成分内の最小ノードID）
+    """
+    labels = np.arange(n)
+    while len(sources):
+        low = np.minimum(labels[sources], labels[targets])
+        updated = labels.copy()
+        np.minimum.at(updated, sources, low)
+        np.minimum.at(updated, targets, low)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+    return labels
+
+
+def partition_diagram(sources: np.ndarray, targets: np.ndarray, blocks: np.ndarray, block_names: list,
+                      strategy: str = 'domain', max_nodes: int = MERMAID_MAX_NODES,
+                      max_edges: int = MERMAID_MAX_EDGES) -> tuple:
+    """図のノードを、ノード数・エッジ数の上限に収まるページに分割
+
+    blocks はノードごとの所属ドメイン（block_names の番号。-1 は図に現れないノード）。
+    strategy が component なら連結成分、partition なら全体を1ブロックとして扱う。
+    ブロックは丸ごと入るならページにまとめて詰め、入らなければ幅優先探索の順に切り分ける
+    （つながったノードが同じページに残りやすい）。ページ内のエッジ数は両端が同じページにあるものを数える。
+
+    Returns:
+        (ノードごとのページ番号（図に現れないノードは -1）, ページ名のリスト)
+    """
+    n = len(blocks)
+    active = blocks >= 0
+    if strategy == 'component':
+        blocks = np.where(active, connected_components(n, sources, targets), -1)
+        _, blocks[active] = np.unique(blocks[active], return_inverse=True)
+        block_names = [f"Component {i + 1}" for i in range(int(blocks.max()) + 1 if active.any() else 0)]
+    elif strategy == 'partition':
+        blocks = np.where(active, 0, -1)
+        block_names = ["Graph"]
+
+    # 無向の隣接リスト（ブロック内のエッジのみ）
+    inner = (blocks[sources] == blocks[targets]) & (blocks[sources] >= 0)
+    ends = np.concatenate([sources[inner], targets[inner]])
+    others = np.concatenate([targets[inner], sources[inner]])
+    indptr, order = build_csr(ends, n)
+    neighbors = others[order].tolist()
+    indptr = indptr.tolist()
+    block_edges = np.bincount(blocks[sources[inner]], minlength=len(block_names))
+
+    page_list = [-1] * n
+    page_blocks = []
+    current, page_nodes, page_edges = -1, 0, 0
+    members = np.flatnonzero(active)
+    members = members[np.argsort(blocks[members], kind='stable')]
+    bounds = np.searchsorted(blocks[members], np.arange(len(block_names) + 1))
+
+    def new_page():
+        nonlocal current, page_nodes, page_edges
+        current += 1
+        page_nodes, page_edges = 0, 0
+        page_blocks.append([])
+
+    for block in range(len(block_names)):
+        block_nodes = members[bounds[block]:bounds[block + 1]].tolist()
+        if not block_nodes:
+            continue
+        if current < 0 or (page_nodes and (page_nodes + len(block_nodes) > max_nodes
+                                           or page_edges + block_edges[block] > max_edges)):
+            new_page()
+
+        # ブロック内を幅優先探索の順にたどる
+        seen = set()
+        for root in block_nodes:
+            if root in seen:
+                continue
+            seen.add(root)
+            queue = [root]
+            for v in queue:
+                cost = sum(1 for u in neighbors[indptr[v]:indptr[v + 1]] if page_list[u] == current)
+                if page_nodes >= max_nodes or page_edges + cost > max_edges:
+                    new_page()
+                    cost = 0
+                page_list[v] = current
+                page_nodes += 1
+                page_edges += cost
+                if not page_blocks[current] or page_blocks[current][-1] != block:
+                    page_blocks[current].append(block)
+                for u in neighbors[indptr[v]:indptr[v + 1]]:
+                    if u not in seen:
+                        seen.add(u)
+                        queue.append(u)
+
+    # ページ名: 含むブロック名（分割されたブロックは「名前 (i/n)」）
+    parts = defaultdict(list)
+    for page, page_block_list in enumerate(page_blocks):
+        for block in page_block_list:
+            parts[block].append(page)
+    names = []
+    for page, page_block_list in enumerate(page_blocks):
+        first = page_block_list[0]
+        name = block_names[first]
+        if len(parts[first]) > 1:
+            name += f" ({parts[first].index(page) + 1}/{len(parts[first])})"
+        if len(page_block_list) > 1:
+            name += f" +{len(page_block_list) - 1}"
+        names.append(name)
+    return np.array(page_list, dtype=np.int64), names
+
+
+def mermaid_index_lines(pages: np.ndarray, page_names: list, sources: np.ndarray, targets: np.ndarray,
+                        page_dir: str, max_nodes: int = MERMAID_MAX_NODES, max_edges: int = MERMAID_MAX_EDGES) -> list:
+    """ページ一覧のMermaid図（ページ間のエッジは本数で集約し、各ページへのリンクを張る）
+
+    ページ数が max_nodes を超える場合は一覧自体もページに分け、前後の一覧へのリンクを置く。
+    1枚目は page_dir の親（output_path）に、2枚目以降は page_dir/index-NNN.mmd に置く前提でリンクを張る。
+
+    Returns:
+        一覧ごとの行のリスト
+    """
+    page_count = len(page_names)
+    counts = np.bincount(pages[pages >= 0], minlength=page_count)
+    src_pages, dst_pages = pages[sources], pages[targets]
+    inner_edges = np.bincount(src_pages[(src_pages == dst_pages) & (src_pages >= 0)], minlength=page_count)
+    cross = (src_pages != dst_pages) & (src_pages >= 0) & (dst_pages >= 0)
+    pairs, weights = np.unique(src_pages[cross] * page_count + dst_pages[cross], return_counts=True)
+
+    # 複数枚になる場合は前後の一覧へのリンク2つ分を空けておく
+    per_index = page_count if page_count <= max_nodes else max(1, max_nodes - 2)
+    index_count = -(-page_count // per_index)
+    indexes = []
+    for index in range(index_count):
+        start, end = index * per_index, min(page_count, (index + 1) * per_index)
+        # 1枚目は output_path と同じ場所、2枚目以降はページと同じディレクトリにある
+        prefix = f"{page_dir}/" if index == 0 else ''
+        index_paths = [f"../{page_dir.removesuffix('-pages')}.mmd"] + \
+                      [f"{prefix}index-{i + 1:03d}.mmd" for i in range(1, index_count)]
+        lines = ['graph LR']
+        if index_count > 1:
+            lines.append(f'    %% index {index + 1}/{index_count}: pages {start + 1}-{end} of {page_count}')
+        for page in range(start, end):
+            lines.append(f'    page_{page + 1:03d}["{page_names[page]}<br/>{counts[page]} nodes / '
+                         f'{inner_edges[page]} edges"]')
+        if index > 0:
+            lines.append(f'    index_prev["◀ pages {start - per_index + 1}-{start}"]')
+        if index < index_count - 1:
+            lines.append(f'    index_next["pages {end + 1}-{min(page_count, end + per_index)} ▶"]')
+        lines.append('')
+
+        # この一覧に載っているページどうしのエッジを、本数の多いものから上限まで
+        in_index = (pairs // page_count >= start) & (pairs // page_count < end) & \
+                   (pairs % page_count >= start) & (pairs % page_count < end)
+        index_pairs, index_weights = pairs[in_index], weights[in_index]
+        keep = np.sort(np.argsort(-index_weights, kind='stable')[:max_edges])
+        if len(keep) < len(index_pairs):
+            lines.append(f'    %% {len(index_pairs) - len(keep)} lighter page links omitted')
+        for pair, weight in zip(index_pairs[keep].tolist(), index_weights[keep].tolist()):
+            lines.append(f'    page_{pair // page_count + 1:03d} -->|"{weight}"| page_{pair % page_count + 1:03d}')
+        lines.append('')
+
+        for page in range(start, end):
+            lines.append(f'    click page_{page + 1:03d} "{prefix}page-{page + 1:03d}.mmd" "{page_names[page]}"')
+        if index > 0:
+            lines.append(f'    click index_prev "{index_paths[index - 1]}" "Previous pages"')
+        if index < index_count - 1:
+            lines.append(f'    click index_next "{index_paths[index + 1]}" "Next pages"')
+        indexes.append(lines)
+    return indexes
+
+
+def write_mermaid_pages(output_path: Path, index_pages: list, page_lines: list) -> Path:
+    """ページ一覧を output_path（2枚目以降は <名前>-pages/index-NNN.mmd）に、各ページを
+    <名前>-pages/page-NNN.mmd に書き出す（前回より増えたページ・一覧は削除）"""
+    page_dir = output_path.with_name(f"{output_path.stem}-pages")
+    page_dir.mkdir(parents=True, exist_ok=True)
+    names = {f"page-{page + 1:03d}.mmd" for page in range(len(page_lines))}
+    names |= {f"index-{index + 1:03d}.mmd" for index in range(1, len(index_pages))}
+    for stale in [*page_dir.glob('page-*.mmd'), *page_dir.glob('index-*.mmd')]:
+        if stale.name not in names:
+            stale.unlink()
+    for page, lines in enumerate(page_lines):
+        write_output(page_dir / f"page-{page + 1:03d}.mmd", '\n'.join(lines))
+    for index, lines in enumerate(index_pages[1:], start=1):
+        write_output(page_dir / f"index-{index + 1:03d}.mmd", '\n'.join(lines))
+    write_output(output_path, '\n'.join(index_pages[0]))
+    return page_dir
+
+
+def remove_mermaid_pages(output_path: Path) -> None:
+    """前回分割して書き出したページとページ一覧を削除（今回は1枚に収まった場合）"""
+    page_dir = output_path.with_name(f"{output_path.stem}-pages")
+    if page_dir.exists():
+        for stale in [*page_dir.glob('page-*.mmd'), *page_dir.glob('index-*.mmd')]:
+            stale.unlink()
+        if not any(page_dir.iterdir()):
+            page_dir.rmdir()
+
+
 # ==============================================================================
 # Mermaid: 全体グラフ
 # ==============================================================================
 
-def generate_mermaid_full(data: dict, output_path: str, layout: str = "LR"):
-    """全体構造のMermaidグラフを生成"""
-    domains = data.get('domains', pd.DataFrame())
-    entities = data.get('entities', pd.DataFrame())
-    belongs_to = data.get('belongs_to', pd.DataFrame())
-    references = data.get('references', pd.DataFrame())
-    implements_df = data.get('implements', pd.DataFrame())
+def generate_mermaid_full(graph: dict, output_path: str, layout: str = "LR", partition: str = 'domain',
+                          max_nodes: int = MERMAID_MAX_NODES, max_edges: int = MERMAID_MAX_EDGES):
+    """全体構造のMermaidグラフを生成
+
+    エンティティ数・エッジ数が上限を超える場合は partition の単位でページに分割し、
+    graph.mmd にはページ一覧の図を書き出す。
+    """
+    output_path = Path(output_path)
+    rel_keys = ['belongs_to', 'references', 'implements']
+    rels = [graph['rels'][key] for key in rel_keys[1:]]
+    sources = np.concatenate([rel['src'] for rel in rels])
+    targets = np.concatenate([rel['dst'] for rel in rels])
+    entity_count = len(graph['nodes']['Entity']['names'])
+
+    # 図に現れるエンティティ（ドメインに属するか、エッジの端点になっているもの）
+    domains = graph['nodes']['Domain']['names']
+    homes = dataset_home_groups(graph, {name: i for i, name in enumerate(domains)}, len(domains))['Entity']
+    shown = np.zeros(entity_count, dtype=bool)
+    shown[graph['rels']['belongs_to']['src']] = True
+    shown[sources] = True
+    shown[targets] = True
+
+    if shown.sum() <= max_nodes and len(sources) <= max_edges:
+        write_output(output_path, '\n'.join(mermaid_full_lines(graph, layout)))
+        remove_mermaid_pages(output_path)
+        print(f"  Generated: {output_path}")
+        return
 
-    # ドメイン→エンティティのマッピング
-    domain_entities = defaultdict(list)
-    for _, row in belongs_to.iterrows():
-        domain_entities[row['domain']].append(row['entity'])
+    pages, page_names = partition_diagram(sources, targets, np.where(shown, homes, -1),
+                                          list(domains) + [UNGROUPED_NAME], partition, max_nodes, max_edges)
+    page_count = len(page_names)
+    entity_slices = group_slices(pages, page_count)
+    # BELONGS_TO はエンティティのページ、エンティティ間のエッジは両端が同じページのものだけ
+    belongs_to = graph['rels']['belongs_to']
+    edge_slices = {'belongs_to': group_slices(pages[belongs_to['src']], page_count)}
+    for key, rel in zip(rel_keys[1:], rels):
+        edge_slices[key] = group_slices(np.where(pages[rel['src']] == pages[rel['dst']], pages[rel['src']], -1),
+                                        page_count)
+
+    def members(slices, page):
+        order, bounds = slices
+        return np.sort(order[bounds[page]:bounds[page + 1]])
+
+    page_dir = write_mermaid_pages(
+        output_path,
+        mermaid_index_lines(pages, page_names, sources, targets, f"{output_path.stem}-pages",
+                            max_nodes, max_edges),
+        [mermaid_full_lines(graph, layout, members(entity_slices, page),
+                            {key: members(edge_slices[key], page) for key in rel_keys})
+         for page in range(page_count)])
+    print(f"  Generated: {output_path} (index of {page_count} pages in {page_dir})")
+
+
+def mermaid_full_lines(graph: dict, layout: str, entities: np.ndarray = None, edges: dict = None) -> list:
+    """全体グラフの行を生成
+
+    entities（エンティティIDの配列）と edges（リレーション -> エッジIDの配列）を渡すと、そのページの分のみ。
+    """
+    entity_names = graph['nodes']['Entity']['names']
+    entity_ids = safe_ids(graph, 'Entity')
+    entity_types = attr_array(graph, 'Entity', 'type')
+    belongs_to = graph['rels']['belongs_to']
+    domain_names = graph['nodes']['Domain']['names']
 
     lines = [f"graph {layout}"]
 
-    # ドメインサブグラフ
-    for _, domain in domains.iterrows():
-        dname = domain['name']
-        dtype = domain.get('type', 'Unknown')
+    # ドメインサブグラフ（ページではエンティティのあるドメインのみ）
+    if edges is None:
+        domain_entities = ((d, belongs_to['src'][in_edges(graph, 'belongs_to', d)])
+                           for d in node_names(graph, 'Domain'))
+    else:
+        page_edges = edges['belongs_to']
+        page_edges = page_edges[np.argsort(belongs_to['dst'][page_edges], kind='stable')]
+        domain_ids, starts = np.unique(belongs_to['dst'][page_edges], return_index=True)
+        domain_entities = ((domain_names[d], ents) for d, ents in
+                           zip(domain_ids.tolist(), np.split(belongs_to['src'][page_edges], starts[1:]))
+                           if d < graph['nodes']['Domain']['count'])
+    for dname, ents in domain_entities:
+        dtype = node_attr(graph, 'Domain', dname, 'type', 'Unknown')
         sid = safe_id(dname)
         lines.append(f'    subgraph {sid}["{dname}<br/>{dtype}"]')
-        for ent in domain_entities.get(dname, []):
-            eid = safe_id(ent)
-            etype = ""
-            if not entities.empty:
-                match = entities[entities['name'] == ent]
-                if not match.empty:
-                    etype = match.iloc[0].get('type', '')
-            label = f"{ent}" + (f"<br/>({etype})" if etype else "")
+        for ent, eid, etype in zip(ents.tolist(), entity_ids[ents], entity_types[ents]):
+            label = f"{entity_names[ent]}" + (f"<br/>({etype})" if etype else "")
             lines.append(f'        {eid}["{label}"]')
         lines.append('    end')
         lines.append('')
 
     # エンティティ参照
-    for _, row in references.iterrows():
-        src = safe_id(row['source'])
-        tgt = safe_id(row['target'])
-        lines.append(f'    {src} -->|"references"| {tgt}')
+    lines.extend(f'    {src} -->|"references"| {tgt}'
+                 for src, tgt in zip(*edge_safe_ids(graph, 'references', None if edges is None else edges['references'])))
 
     # implements
-    for _, row in implements_df.iterrows():
-        child = safe_id(row['child'])
-        parent = safe_id(row['parent'])
-        lines.append(f'    {child} -.->|"implements"| {parent}')
+    lines.extend(f'    {child} -.->|"implements"| {parent}'
+                 for child, parent in zip(*edge_safe_ids(graph, 'implements', None if edges is None else edges['implements'])))
 
     # スタイリング
     lines.append('')
@@ -128,114 +782,94 @@ def generate_mermaid_full(data: dict, output_path: str, layout: str = "LR"):
     lines.append('    classDef controller fill:#1abc9c,stroke:#16a085,color:white')
     lines.append('    classDef infra fill:#95a5a6,stroke:#7f8c8d,color:white')
 
-    if not entities.empty:
-        type_class_map = {
-            'AggregateRoot': 'aggRoot', 'Entity': 'entity', 'ValueObject': 'vo',
-            'RepositoryInterface': 'repo', 'DomainService': 'service',
-            'ApplicationService': 'service', 'Controller': 'controller',
-            'RepositoryImplementation': 'infra',
-        }
-        for _, ent in entities.iterrows():
-            etype = ent.get('type', '')
-            cls = type_class_map.get(etype)
-            if cls:
-                lines.append(f'    class {safe_id(ent["name"])} {cls}')
-
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
-    print(f"  Generated: {output_path}")
+    type_class_map = {
+        'AggregateRoot': 'aggRoot', 'Entity': 'entity', 'ValueObject': 'vo',
+        'RepositoryInterface': 'repo', 'DomainService': 'service',
+        'ApplicationService': 'service', 'Controller': 'controller',
+        'RepositoryImplementation': 'infra',
+    }
+    count = graph['nodes']['Entity']['count']
+    styled_ids = np.arange(count) if entities is None else entities[entities < count]
+    classes = pd.Series(entity_types[styled_ids]).map(type_class_map)
+    styled = classes.notna().to_numpy()
+    lines.extend(f'    class {eid} {cls}' for eid, cls in zip(entity_ids[styled_ids][styled], classes[styled]))
+    return lines
 
 
 # ==============================================================================
 # Mermaid: ドメイン別
 # ==============================================================================
 
-def generate_mermaid_domain(data: dict, output_dir: Path):
+def generate_mermaid_domain(graph: dict, output_dir: Path):
     """ドメイン別のMermaidグラフを生成"""
-    domains = data.get('domains', pd.DataFrame())
-    entities = data.get('entities', pd.DataFrame())
-    belongs_to = data.get('belongs_to', pd.DataFrame())
-    has_term = data.get('has_term', pd.DataFrame())
-    terms = data.get('terms', pd.DataFrame())
-    references = data.get('references', pd.DataFrame())
-
-    for _, domain in domains.iterrows():
-        dname = domain['name']
-        desc = domain.get('description', '')
+    has_entities = graph['nodes']['Entity']['count'] > 0
+    entity_names = graph['nodes']['Entity']['names']
+    entity_ids = safe_ids(graph, 'Entity')
+    entity_types = attr_array(graph, 'Entity', 'type')
+    term_names = graph['nodes']['Term']['names']
+    term_name_ja = attr_array(graph, 'Term', 'name_ja')
+    belongs_to = graph['rels']['belongs_to']
+    has_term = graph['rels']['has_term']
+    ref_out_ptr, ref_out = graph['rels']['references']['out']
+    ref_in_ptr, ref_in = graph['rels']['references']['in']
+    term_ptr, term_order = has_term['out']
+
+    for dname in node_names(graph, 'Domain'):
+        desc = node_attr(graph, 'Domain', dname, 'description')
 
         # このドメインのエンティティ
-        domain_ents = set(belongs_to[belongs_to['domain'] == dname]['entity'].tolist()) if not belongs_to.empty else set()
-        if not domain_ents:
+        domain_ents = pd.unique(belongs_to['src'][in_edges(graph, 'belongs_to', dname)])
+        if not len(domain_ents):
             continue
 
         lines = [f'graph TB']
         lines.append(f'    subgraph domain["{dname}<br/>{desc}"]')
 
-        for ent in domain_ents:
-            eid = safe_id(ent)
-            etype = ""
-            if not entities.empty:
-                match = entities[entities['name'] == ent]
-                if not match.empty:
-                    etype = match.iloc[0].get('type', '')
-            lines.append(f'        {eid}["{ent}<br/>({etype})"]')
+        for ent, eid, etype in zip(domain_ents.tolist(), entity_ids[domain_ents], entity_types[domain_ents]):
+            lines.append(f'        {eid}["{entity_names[ent]}<br/>({etype})"]')
 
         lines.append('    end')
         lines.append('')
 
-        # エンティティ間参照（ドメイン内）
-        for _, row in references.iterrows():
-            if row['source'] in domain_ents or row['target'] in domain_ents:
-                src = safe_id(row['source'])
-                tgt = safe_id(row['target'])
-                lines.append(f'    {src} -->|"references"| {tgt}')
+        # エンティティ間参照（ドメイン内のエンティティを端点に持つもの）
+        ref_edges = np.unique(np.concatenate(
+            [csr_edges(ref_out_ptr, ref_out, domain_ents), csr_edges(ref_in_ptr, ref_in, domain_ents)]))
+        lines.extend(f'    {src} -->|"references"| {tgt}'
+                     for src, tgt in zip(*edge_safe_ids(graph, 'references', ref_edges)))
 
-        # 関連する用語
-        domain_terms = set()
-        for ent in domain_ents:
-            ent_terms = has_term[has_term['entity'] == ent]['term'].tolist() if not has_term.empty else []
-            domain_terms.update(ent_terms)
+        # 関連する用語（エンティティ順・CSVの行順）
+        term_edges = csr_edges(term_ptr, term_order, domain_ents)
+        domain_terms = pd.unique(has_term['dst'][term_edges])
 
-        if domain_terms:
+        if len(domain_terms):
             lines.append('')
             lines.append(f'    subgraph terms["{dname} - ユビキタス言語"]')
-            for t in list(domain_terms)[:15]:
-                tid = safe_id(f"term_{t}")
-                name_ja = ""
-                if not terms.empty:
-                    match = terms[terms['name'] == t]
-                    if not match.empty:
-                        name_ja = match.iloc[0].get('name_ja', '')
-                label = f"{t}" + (f"<br/>({name_ja})" if name_ja else "")
+            for t in domain_terms[:15].tolist():
+                tid = safe_id(f"term_{term_names[t]}")
+                name_ja = term_name_ja[t]
+                label = f"{term_names[t]}" + (f"<br/>({name_ja})" if name_ja else "")
                 lines.append(f'        {tid}["{label}"]')
             lines.append('    end')
 
             # 用語-エンティティ関連
-            for ent in domain_ents:
-                ent_terms = has_term[has_term['entity'] == ent]['term'].tolist() if not has_term.empty else []
-                for t in ent_terms:
-                    if t in domain_terms:
-                        lines.append(f'    {safe_id(ent)} -.->|"has_term"| {safe_id(f"term_{t}")}')
+            lines.extend(f'    {eid} -.->|"has_term"| {safe_id(f"term_{term_names[t]}")}'
+                         for eid, t in zip(entity_ids[has_term['src'][term_edges]],
+                                           has_term['dst'][term_edges].tolist()))
 
         lines.append('')
         lines.append('    classDef aggRoot fill:#e74c3c,stroke:#c0392b,color:white')
         lines.append('    classDef entity fill:#3498db,stroke:#2980b9,color:white')
         lines.append('    classDef term fill:#2ecc71,stroke:#27ae60,color:white')
 
-        for ent in domain_ents:
-            if not entities.empty:
-                match = entities[entities['name'] == ent]
-                if not match.empty and match.iloc[0].get('type', '') == 'AggregateRoot':
-                    lines.append(f'    class {safe_id(ent)} aggRoot')
-                else:
-                    lines.append(f'    class {safe_id(ent)} entity')
+        if has_entities:
+            for eid, etype in zip(entity_ids[domain_ents], entity_types[domain_ents]):
+                lines.append(f'    class {eid} {"aggRoot" if etype == "AggregateRoot" else "entity"}')
 
-        for t in domain_terms:
-            lines.append(f'    class {safe_id(f"term_{t}")} term')
+        for t in domain_terms.tolist():
+            lines.append(f'    class {safe_id(f"term_{term_names[t]}")} term')
 
         fname = f"domain-{safe_id(dname).lower()}.mmd"
-        with open(output_dir / fname, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
+        write_output(output_dir / fname, '\n'.join(lines))
         print(f"  Generated: {output_dir / fname}")
 
 
@@ -243,30 +877,68 @@ def generate_mermaid_domain(data: dict, output_dir: Path):
 # Mermaid: ビジネスプロセスフロー
 # ==============================================================================
 
-def generate_process_flows(data: dict, output_dir: Path):
-    """ビジネスプロセスのフローチャートを生成"""
-    bp = data.get('business_processes', pd.DataFrame())
-    activities = data.get('activities', pd.DataFrame())
-    has_activity = data.get('has_activity', pd.DataFrame())
-    next_activity_df = data.get('next_activity', pd.DataFrame())
-    performs = data.get('performs', pd.DataFrame())
-    triggers = data.get('triggers', pd.DataFrame())
+# プロセス一覧図のエッジラベルに表示する共有エンティティ名の上限
+SHARED_LABEL_LIMIT = 3
+
+
+def is_decision_activity(graph: dict, act_name: str) -> bool:
+    """アクティビティが分岐（is_decision）かどうか"""
+    return str(node_attr(graph, 'Activity', act_name, 'is_decision', 'false')).lower() == 'true'
+
+
+def shared_entity_pairs(graph: dict, min_shared: int = 1, max_links: int = None) -> tuple:
+    """エンティティを共有するプロセスの組を、エンティティ→プロセスの転置インデックスから求める
 
+    2つ以上のプロセスに参加するエンティティについてのみ、そのプロセス同士の組に計上するため、
+    共有のない組は一切走査しない。共有数が min_shared 未満の組は除外し、max_links を指定した
+    場合は共有数の多い順に上位のみ残す。
+
+    Returns:
+        ([(プロセスID, プロセスID, 共有エンティティIDのリスト)], 除外した組の数)。
+        組はプロセスの出現順（participates_in の行順）に並ぶ。
+    """
+    rel = graph['rels']['participates_in']
+    if not len(rel['src']):
+        return [], 0
+
+    # participates_in に現れる順でプロセスを順位付けし、組を (先, 後) の向きに揃える
+    rank = np.full(len(graph['nodes']['BusinessProcess']['names']), -1, dtype=np.int64)
+    first_seen = pd.unique(rel['dst'])
+    rank[first_seen] = np.arange(len(first_seen))
+
+    indptr, order = rel['out']
+    shared = defaultdict(list)
+    for ent in np.flatnonzero(np.diff(indptr) >= 2).tolist():
+        procs = sorted(dict.fromkeys(rel['dst'][order[indptr[ent]:indptr[ent + 1]]].tolist()), key=rank.__getitem__)
+        for i in range(len(procs)):
+            for j in range(i + 1, len(procs)):
+                shared[(procs[i], procs[j])].append(ent)
+
+    pairs = [(a, b, ents) for (a, b), ents in shared.items() if len(ents) >= min_shared]
+    if max_links is not None and len(pairs) > max_links:
+        pairs = sorted(pairs, key=lambda pair: len(pair[2]), reverse=True)[:max_links]
+    pairs.sort(key=lambda pair: (rank[pair[0]], rank[pair[1]]))
+    return pairs, len(shared) - len(pairs)
+
+
+def generate_process_flows(graph: dict, output_dir: Path, min_shared: int = 1, max_links: int = None):
+    """ビジネスプロセスのフローチャートを生成"""
     proc_dir = output_dir / "processes"
     proc_dir.mkdir(parents=True, exist_ok=True)
 
-    if bp.empty:
+    processes = node_names(graph, 'BusinessProcess')
+    if not processes:
         return
 
-    for _, proc in bp.iterrows():
-        pname = proc['name']
-        pname_ja = proc.get('name_ja', pname)
-        pdesc = proc.get('description', '')
+    for pname in processes:
+        pname_ja = node_attr(graph, 'BusinessProcess', pname, 'name_ja', pname)
 
         # このプロセスのアクティビティ
-        proc_acts = has_activity[has_activity['process'] == pname]['activity'].tolist() if not has_activity.empty else []
+        proc_acts = edge_targets(graph, 'has_activity', out_edges(graph, 'has_activity', pname))
         if not proc_acts:
             continue
+        proc_act_set = set(proc_acts)
+        unique_acts = list(dict.fromkeys(proc_acts))
 
         lines = ['flowchart TD']
         lines.append(f'    subgraph proc["{pname_ja}"]')
@@ -274,14 +946,8 @@ def generate_process_flows(data: dict, output_dir: Path):
         # アクティビティノード
         for act_name in proc_acts:
             aid = safe_id(act_name)
-            act_ja = act_name
-            is_decision = False
-            if not activities.empty:
-                match = activities[activities['name'] == act_name]
-                if not match.empty:
-                    act_ja = match.iloc[0].get('name_ja', act_name)
-                    is_decision = str(match.iloc[0].get('is_decision', 'false')).lower() == 'true'
-            if is_decision:
+            act_ja = node_attr(graph, 'Activity', act_name, 'name_ja', act_name)
+            if is_decision_activity(graph, act_name):
                 lines.append(f'        {aid}{{{{{quote_ja(act_ja)}}}}}')
             else:
                 lines.append(f'        {aid}[{quote_ja(act_ja)}]')
@@ -289,38 +955,38 @@ def generate_process_flows(data: dict, output_dir: Path):
         lines.append('    end')
 
         # アクティビティ遷移
-        for _, row in next_activity_df.iterrows():
-            if row['from_activity'] in proc_acts:
-                fid = safe_id(row['from_activity'])
-                tid = safe_id(row['to_activity'])
-                cond = row.get('condition', '')
-                if pd.notna(cond) and str(cond).strip():
-                    lines.append(f'    {fid} -->|{quote_ja(str(cond))}| {tid}')
-                else:
-                    lines.append(f'    {fid} --> {tid}')
+        next_edges = np.sort(np.concatenate(
+            [out_edges(graph, 'next_activity', act) for act in unique_acts]))
+        for edge, from_act, to_act in zip(next_edges.tolist(),
+                                          edge_sources(graph, 'next_activity', next_edges),
+                                          edge_targets(graph, 'next_activity', next_edges)):
+            fid = safe_id(from_act)
+            tid = safe_id(to_act)
+            cond = edge_attr(graph, 'next_activity', edge, 'condition')
+            if pd.notna(cond) and str(cond).strip():
+                lines.append(f'    {fid} -->|{quote_ja(str(cond))}| {tid}')
+            else:
+                lines.append(f'    {fid} --> {tid}')
 
         # アクター
-        actors_set = set()
-        for act_name in proc_acts:
-            act_actors = performs[performs['activity'] == act_name]['actor'].tolist() if not performs.empty else []
-            actors_set.update(act_actors)
+        actors_set = list(dict.fromkeys(
+            actor for act_name in proc_acts
+            for actor in edge_sources(graph, 'performs', in_edges(graph, 'performs', act_name))))
 
         for actor in actors_set:
             actor_id = safe_id(f"actor_{actor}")
             lines.append(f'    {actor_id}(("{actor}"))')
             # アクターが実行するアクティビティへのリンク
-            actor_acts = performs[performs['actor'] == actor]['activity'].tolist() if not performs.empty else []
-            for act_name in actor_acts:
-                if act_name in proc_acts:
+            for act_name in edge_targets(graph, 'performs', out_edges(graph, 'performs', actor)):
+                if act_name in proc_act_set:
                     lines.append(f'    {actor_id} -.->|"performs"| {safe_id(act_name)}')
 
         # システムプロセストリガー
         for act_name in proc_acts:
-            triggered = triggers[triggers['activity'] == act_name] if not triggers.empty else pd.DataFrame()
-            for _, tr in triggered.iterrows():
-                sp_name = tr['system_process']
+            triggered = out_edges(graph, 'triggers', act_name)
+            for edge, sp_name in zip(triggered.tolist(), edge_targets(graph, 'triggers', triggered)):
                 sp_id = safe_id(f"sp_{sp_name}")
-                event = tr.get('event_name', '')
+                event = edge_attr(graph, 'triggers', edge, 'event_name')
                 lines.append(f'    {sp_id}[/"{sp_name}"/]')
                 label = f'"{event}"' if pd.notna(event) and str(event).strip() else '"triggers"'
                 lines.append(f'    {safe_id(act_name)} ==>|{label}| {sp_id}')
@@ -332,42 +998,35 @@ def generate_process_flows(data: dict, output_dir: Path):
 
         # Apply styles
         for act_name in proc_acts:
-            if not activities.empty:
-                match = activities[activities['name'] == act_name]
-                if not match.empty and str(match.iloc[0].get('is_decision', 'false')).lower() == 'true':
-                    lines.append(f'    class {safe_id(act_name)} decision')
+            if is_decision_activity(graph, act_name):
+                lines.append(f'    class {safe_id(act_name)} decision')
         for actor in actors_set:
             lines.append(f'    class {safe_id(f"actor_{actor}")} actor')
 
         fname = f"{safe_id(pname).lower()}-flow.mmd"
-        with open(proc_dir / fname, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
+        write_output(proc_dir / fname, '\n'.join(lines))
         print(f"  Generated: {proc_dir / fname}")
 
     # ビジネスプロセス一覧図
     lines = ['graph LR']
-    for _, proc in bp.iterrows():
-        pname = proc['name']
-        pname_ja = proc.get('name_ja', pname)
-        pdomain = proc.get('domain', '')
-        pid = safe_id(pname)
-        lines.append(f'    {pid}["{pname_ja}<br/>({pdomain})"]')
+    for pname in processes:
+        pname_ja = node_attr(graph, 'BusinessProcess', pname, 'name_ja', pname)
+        pdomain = node_attr(graph, 'BusinessProcess', pname, 'domain')
+        lines.append(f'    {safe_id(pname)}["{pname_ja}<br/>({pdomain})"]')
 
     # プロセス間の共有エンティティを通じた関連
-    participates = data.get('participates_in', pd.DataFrame())
-    if not participates.empty:
-        proc_entities = defaultdict(set)
-        for _, row in participates.iterrows():
-            proc_entities[row['process']].add(row['entity'])
-        procs = list(proc_entities.keys())
-        for i in range(len(procs)):
-            for j in range(i+1, len(procs)):
-                shared = proc_entities[procs[i]] & proc_entities[procs[j]]
-                if shared:
-                    lines.append(f'    {safe_id(procs[i])} <-->|"{", ".join(shared)}"| {safe_id(procs[j])}')
-
-    with open(proc_dir / "business-processes.mmd", 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
+    pairs, omitted = shared_entity_pairs(graph, min_shared=min_shared, max_links=max_links)
+    proc_names = graph['nodes']['BusinessProcess']['names']
+    entity_names = graph['nodes']['Entity']['names']
+    for proc_a, proc_b, shared in pairs:
+        label = ", ".join(entity_names[e] for e in shared[:SHARED_LABEL_LIMIT])
+        if len(shared) > SHARED_LABEL_LIMIT:
+            label += f" 他{len(shared) - SHARED_LABEL_LIMIT}件"
+        lines.append(f'    {safe_id(proc_names[proc_a])} <-->|"{label}"| {safe_id(proc_names[proc_b])}')
+    if omitted:
+        lines.append(f'    %% {omitted} process pairs omitted (--min-shared-entities / --max-process-links)')
+
+    write_output(proc_dir / "business-processes.mmd", '\n'.join(lines))
     print(f"  Generated: {proc_dir / 'business-processes.mmd'}")
 
 
@@ -375,50 +1034,38 @@ def generate_process_flows(data: dict, output_dir: Path):
 # Mermaid: システムプロセス（Saga）シーケンス図
 # ==============================================================================
 
-def generate_system_process_diagrams(data: dict, output_dir: Path):
+def generate_system_process_diagrams(graph: dict, output_dir: Path):
     """システムプロセスのシーケンス図を生成"""
-    sp = data.get('system_processes', pd.DataFrame())
-    sp_invokes = data.get('invokes', pd.DataFrame())
-    triggers = data.get('triggers', pd.DataFrame())
-
     proc_dir = output_dir / "processes"
     proc_dir.mkdir(parents=True, exist_ok=True)
 
-    if sp.empty:
+    processes = node_names(graph, 'SystemProcess')
+    if not processes:
         return
 
     lines = ['sequenceDiagram']
 
     # パーティシパント
-    for _, proc in sp.iterrows():
-        pname = proc['name']
-        ptype = proc.get('type', 'sync')
+    for pname in processes:
+        ptype = node_attr(graph, 'SystemProcess', pname, 'type', 'sync')
         lines.append(f'    participant {safe_id(pname)} as "{pname}<br/>({ptype})"')
 
     lines.append('')
 
     # トリガーとメソッド呼び出し
-    for _, proc in sp.iterrows():
-        pname = proc['name']
+    for pname in processes:
         pid = safe_id(pname)
 
         # トリガーアクティビティ
-        triggered_by = triggers[triggers['system_process'] == pname] if not triggers.empty else pd.DataFrame()
-        for _, tr in triggered_by.iterrows():
-            event = tr.get('event_name', 'trigger')
+        for edge in in_edges(graph, 'triggers', pname).tolist():
+            event = edge_attr(graph, 'triggers', edge, 'event_name', 'trigger')
             lines.append(f'    Note over {pid}: "{event}"')
 
         # 呼び出すメソッド
-        invoked = sp_invokes[sp_invokes['source'] == pname] if not sp_invokes.empty else pd.DataFrame()
-        # 他のシステムプロセスへの連携があれば矢印
-        for _, inv in invoked.iterrows():
-            method = inv['method']
-            # メソッドのクラス名を抽出
-            class_name = method.split('.')[0] if '.' in method else method
+        for method in edge_targets(graph, 'invokes', out_edges(graph, 'invokes', pname)):
             lines.append(f'    {pid} ->> {pid}: "{method}"')
 
-    with open(proc_dir / "system-processes.mmd", 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
+    write_output(proc_dir / "system-processes.mmd", '\n'.join(lines))
     print(f"  Generated: {proc_dir / 'system-processes.mmd'}")
 
 
@@ -426,45 +1073,33 @@ def generate_system_process_diagrams(data: dict, output_dir: Path):
 # Mermaid: アクター-アクティビティマップ
 # ==============================================================================
 
-def generate_actor_maps(data: dict, output_dir: Path):
+def generate_actor_maps(graph: dict, output_dir: Path):
     """アクター-アクティビティマップを生成"""
-    actors = data.get('actors', pd.DataFrame())
-    roles = data.get('roles', pd.DataFrame())
-    has_role = data.get('has_role', pd.DataFrame())
-    performs = data.get('performs', pd.DataFrame())
-    activities = data.get('activities', pd.DataFrame())
-
     actor_dir = output_dir / "actors"
     actor_dir.mkdir(parents=True, exist_ok=True)
 
-    if actors.empty:
+    actor_names = node_names(graph, 'Actor')
+    if not actor_names:
         return
 
     # アクター-アクティビティマップ（Mermaid）
     lines = ['graph TB']
 
-    for _, actor in actors.iterrows():
-        aname = actor['name']
-        atype = actor.get('type', 'Unknown')
+    for aname in actor_names:
+        atype = node_attr(graph, 'Actor', aname, 'type', 'Unknown')
         aid = safe_id(f"actor_{aname}")
         lines.append(f'    {aid}(("{aname}<br/>({atype})"))')
 
         # ロール
-        actor_roles = has_role[has_role['actor'] == aname]['role'].tolist() if not has_role.empty else []
-        for role in actor_roles:
+        for role in edge_targets(graph, 'has_role', out_edges(graph, 'has_role', aname)):
             rid = safe_id(f"role_{role}")
             lines.append(f'    {rid}[/"{role}"/]')
             lines.append(f'    {aid} --> {rid}')
 
         # 実行するアクティビティ
-        actor_acts = performs[performs['actor'] == aname]['activity'].tolist() if not performs.empty else []
-        for act in actor_acts:
+        for act in edge_targets(graph, 'performs', out_edges(graph, 'performs', aname)):
             act_id = safe_id(f"act_{act}")
-            act_ja = act
-            if not activities.empty:
-                match = activities[activities['name'] == act]
-                if not match.empty:
-                    act_ja = match.iloc[0].get('name_ja', act)
+            act_ja = node_attr(graph, 'Activity', act, 'name_ja', act)
             lines.append(f'    {act_id}["{act_ja}"]')
             lines.append(f'    {aid} -.->|"performs"| {act_id}')
 
@@ -473,21 +1108,20 @@ def generate_actor_maps(data: dict, output_dir: Path):
     lines.append('    classDef role fill:#e67e22,stroke:#d35400,color:white')
     lines.append('    classDef activity fill:#3498db,stroke:#2980b9,color:white')
 
-    for _, actor in actors.iterrows():
-        lines.append(f'    class {safe_id(f"actor_{actor["name"]}")} actor')
-    for _, row in has_role.iterrows():
-        lines.append(f'    class {safe_id(f"role_{row["role"]}")} role')
-    if not performs.empty:
-        for act in performs['activity'].unique():
-            lines.append(f'    class {safe_id(f"act_{act}")} activity')
+    for aname in actor_names:
+        lines.append(f'    class {safe_id("actor_" + aname)} actor')
+    for _, role in all_edges(graph, 'has_role'):
+        lines.append(f'    class {safe_id("role_" + role)} role')
+    performed = graph['rels']['performs']['dst']
+    activity_names = graph['nodes']['Activity']['names']
+    for act_id in pd.unique(performed).tolist():
+        lines.append(f'    class {safe_id("act_" + activity_names[act_id])} activity')
 
-    with open(actor_dir / "actor-activity-map.mmd", 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
+    write_output(actor_dir / "actor-activity-map.mmd", '\n'.join(lines))
     print(f"  Generated: {actor_dir / 'actor-activity-map.mmd'}")
 
     # ロール-プロセスマトリクス（Markdown）
-    bp = data.get('business_processes', pd.DataFrame())
-    has_activity = data.get('has_activity', pd.DataFrame())
+    procs = node_names(graph, 'BusinessProcess')
 
     md_lines = [
         "# ロール-プロセスマトリクス",
@@ -496,31 +1130,27 @@ def generate_actor_maps(data: dict, output_dir: Path):
         "",
     ]
 
-    if not bp.empty and not performs.empty:
-        procs = bp['name'].tolist()
-        actor_names = actors['name'].tolist()
-
+    if procs and edge_count(graph, 'performs'):
         # ヘッダー
         header = "| アクター |"
         sep = "|--------|"
         for p in procs:
-            pja = bp[bp['name'] == p].iloc[0].get('name_ja', p) if not bp.empty else p
+            pja = node_attr(graph, 'BusinessProcess', p, 'name_ja', p)
             header += f" {pja} |"
             sep += "------|"
         md_lines.append(header)
         md_lines.append(sep)
 
+        proc_acts = {p: set(edge_targets(graph, 'has_activity', out_edges(graph, 'has_activity', p))) for p in procs}
         for aname in actor_names:
-            actor_acts = set(performs[performs['actor'] == aname]['activity'].tolist())
+            actor_acts = set(edge_targets(graph, 'performs', out_edges(graph, 'performs', aname)))
             row = f"| {aname} |"
             for p in procs:
-                proc_acts = set(has_activity[has_activity['process'] == p]['activity'].tolist()) if not has_activity.empty else set()
-                shared = actor_acts & proc_acts
+                shared = actor_acts & proc_acts[p]
                 row += f" {'Yes (' + str(len(shared)) + ')' if shared else '-'} |"
             md_lines.append(row)
 
-    with open(actor_dir / "role-process-matrix.md", 'w', encoding='utf-8') as f:
-        f.write('\n'.join(md_lines))
+    write_output(actor_dir / "role-process-matrix.md", '\n'.join(md_lines))
     print(f"  Generated: {actor_dir / 'role-process-matrix.md'}")
 
 
@@ -528,72 +1158,445 @@ def generate_actor_maps(data: dict, output_dir: Path):
 # Mermaid: メソッド呼び出しグラフ
 # ==============================================================================
 
-def generate_call_graph(data: dict, output_path: str):
-    """メソッド呼び出しグラフのMermaid図を生成"""
-    calls = data.get('calls', pd.DataFrame())
-    methods = data.get('methods', pd.DataFrame())
+# 縮約モードで1つの SCC ノードのラベルに並べるクラス名の上限
+SCC_LABEL_LIMIT = 3
+
+# 循環レポートの1行に並べるクラス名・メソッド名の上限
+CYCLE_REPORT_LIMIT = 50
+
+
+def generate_call_graph(graph: dict, output_path: str, condense: bool = False, partition: str = 'domain',
+                        max_nodes: int = MERMAID_MAX_NODES, max_edges: int = MERMAID_MAX_EDGES):
+    """メソッド呼び出しグラフのMermaid図を生成
+
+    condense が有効な場合は、クラス間の呼び出しを強連結成分（SCC）で縮約した図にし、
+    循環を call-graph-cycles.md に書き出す（縮約モード）。
+    ノード数・エッジ数が上限を超える場合は partition の単位でページに分割し、
+    call-graph.mmd にはページ一覧の図を書き出す。domain 単位では、クラス名と同名の
+    エンティティが属するドメインでまとめる。
+    """
+    if not edge_count(graph, 'calls'):
+        return
 
-    if calls.empty:
+    output_path = Path(output_path)
+    calls = graph['rels']['calls']
+    method_names = graph['nodes']['Method']['names']
+    domains = graph['nodes']['Domain']['names']
+    entity_ids = graph['nodes']['Entity']['ids']
+    entity_home = dataset_home_groups(graph, {name: i for i, name in enumerate(domains)}, len(domains))['Entity']
+    class_names, class_codes = np.unique(np.array([name.split('.')[0] for name in method_names], dtype=object),
+                                         return_inverse=True)
+    class_homes = np.array([entity_home[entity_ids[cls]] if cls in entity_ids else len(domains)
+                            for cls in class_names.tolist()], dtype=np.int64)
+
+    if condense:
+        condensed = condense_call_graph(graph, class_names, class_codes)
+        write_call_graph_cycles(output_path.with_name('call-graph-cycles.md'), graph, condensed)
+        sources, targets = condensed['src'], condensed['dst']
+        # SCC のドメインは先頭のクラスのドメイン
+        blocks = np.where(condensed['involved'], class_homes[condensed['first_class']], -1)
+
+        def render(nodes, edges):
+            return condensed_call_graph_lines(condensed, nodes, edges)
+    else:
+        sources, targets = calls['src'], calls['dst']
+        shown = np.zeros(len(method_names), dtype=bool)
+        shown[sources] = True
+        shown[targets] = True
+        blocks = np.where(shown, class_homes[class_codes], -1)
+
+        def render(nodes, edges):
+            return call_graph_lines(graph, nodes, edges)
+
+    write_paged_mermaid(output_path, sources, targets, blocks, list(domains) + [UNGROUPED_NAME], render,
+                        partition, max_nodes, max_edges)
+
+
+def write_paged_mermaid(output_path: Path, sources: np.ndarray, targets: np.ndarray, blocks: np.ndarray,
+                        block_names: list, render, partition: str = 'domain',
+                        max_nodes: int = MERMAID_MAX_NODES, max_edges: int = MERMAID_MAX_EDGES) -> None:
+    """図をそのまま、または上限を超える場合はページに分割して書き出す
+
+    blocks はノードごとのドメイン番号（-1 は図に現れないノード）。render(nodes, edges) は図の行を返す関数で、
+    引数が None なら図全体、配列ならそのページのノードIDとエッジID（昇順）。
+    """
+    if (blocks >= 0).sum() <= max_nodes and len(sources) <= max_edges:
+        write_output(output_path, '\n'.join(render(None, None)))
+        remove_mermaid_pages(output_path)
+        print(f"  Generated: {output_path}")
         return
 
+    pages, page_names = partition_diagram(sources, targets, blocks, block_names, partition, max_nodes, max_edges)
+    node_order, node_bounds = group_slices(pages, len(page_names))
+    edge_order, edge_bounds = group_slices(np.where(pages[sources] == pages[targets], pages[sources], -1),
+                                           len(page_names))
+    page_dir = write_mermaid_pages(
+        output_path,
+        mermaid_index_lines(pages, page_names, sources, targets, f"{output_path.stem}-pages",
+                            max_nodes, max_edges),
+        [render(np.sort(node_order[node_bounds[page]:node_bounds[page + 1]]),
+                np.sort(edge_order[edge_bounds[page]:edge_bounds[page + 1]]))
+         for page in range(len(page_names))])
+    print(f"  Generated: {output_path} (index of {len(page_names)} pages in {page_dir})")
+
+
+def strongly_connected_components(n: int, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """有向グラフの強連結成分を求める（Tarjan 法の反復版。再帰しないので長い呼び出し連鎖でも動く）
+
+    Returns:
+        ノードごとの成分番号。番号は成分が確定した順で、成分間のエッジは必ず番号の大きい方から
+        小さい方へ向かう（番号の降順がトポロジカル順）
+    """
+    indptr, order = build_csr(sources, n)
+    indptr = indptr.tolist()
+    adjacent = targets[order].tolist()
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    component = [-1] * n
+    stack = []
+    counter = 0
+    components = 0
+
+    for root in range(n):
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        # 探索中のノードと、次に調べる隣接リストの位置
+        work = [[root, indptr[root]]]
+        while work:
+            frame = work[-1]
+            v, i = frame
+            if i < indptr[v + 1]:
+                frame[1] = i + 1
+                w = adjacent[i]
+                if index[w] < 0:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append([w, indptr[w]])
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+
+            work.pop()
+            if work and low[v] < low[work[-1][0]]:
+                low[work[-1][0]] = low[v]
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component[w] = components
+                    if w == v:
+                        break
+                components += 1
+
+    return np.array(component, dtype=np.int64)
+
+
+def condense_call_graph(graph: dict, class_names: np.ndarray, class_codes: np.ndarray) -> dict:
+    """クラス間の呼び出しグラフを強連結成分で縮約し、成分ごとのDAG上の深さを求める
+
+    深さは呼び出し元のない成分を0とした最長経路の長さ。メソッド単位の再帰・相互呼び出しも求める。
+
+    Returns:
+        {'members': 成分ごとのクラスIDの配列のリスト, 'first_class', 'depth', 'involved'（呼び出しに関わる成分か）,
+         'src', 'dst', 'weight'（成分間の呼び出し本数）, 'class_names', 'method_cycles': メソッドIDの配列のリスト}
+    """
+    calls = graph['rels']['calls']
+    class_count = len(class_names)
+    callers, callees = class_codes[calls['src']], class_codes[calls['dst']]
+
+    # クラス単位のSCC（平行エッジは1本にしてから）
+    pairs = np.unique(callers * class_count + callees)
+    components = strongly_connected_components(class_count, pairs // class_count, pairs % class_count)
+    count = int(components.max()) + 1 if class_count else 0
+
+    # 成分間の呼び出しを本数付きで集約（成分内の呼び出しは除く）
+    src, dst = components[callers], components[callees]
+    cross = src != dst
+    pairs, weights = np.unique(src[cross] * count + dst[cross], return_counts=True)
+    src, dst = pairs // count, pairs % count
+
+    # 成分間のエッジは番号の大きい方から小さい方へ向かうので、始点の降順に深さを伝播
+    depth = np.zeros(count, dtype=np.int64)
+    order = np.argsort(-src, kind='stable')
+    for s, t in zip(src[order].tolist(), dst[order].tolist()):
+        if depth[s] + 1 > depth[t]:
+            depth[t] = depth[s] + 1
+
+    # 成分ごとのクラス（クラス名順）。図に現れるのは呼び出しに関わるクラスのみ
+    involved = np.zeros(class_count, dtype=bool)
+    involved[callers] = True
+    involved[callees] = True
+    member_order, member_bounds = group_slices(np.where(involved, components, -1), count)
+    members = [member_order[member_bounds[c]:member_bounds[c + 1]] for c in range(count)]
+
+    # メソッド単位の循環: 2メソッド以上の成分と、自分自身を呼ぶメソッド
+    method_count = len(graph['nodes']['Method']['names'])
+    method_components = strongly_connected_components(method_count, calls['src'], calls['dst'])
+    sizes = np.bincount(method_components, minlength=method_count)
+    recursive = np.zeros(method_count, dtype=bool)
+    recursive[calls['src'][calls['src'] == calls['dst']]] = True
+    cyclic = (sizes[method_components] > 1) | recursive
+    cycle_order, cycle_bounds = group_slices(np.where(cyclic, method_components, -1), method_count)
+    method_cycles = [cycle_order[cycle_bounds[c]:cycle_bounds[c + 1]] for c in range(method_count)
+                     if cycle_bounds[c + 1] > cycle_bounds[c]]
+
+    return {
+        'members': members,
+        'first_class': np.array([m[0] if len(m) else 0 for m in members], dtype=np.int64),
+        'depth': depth,
+        'src': src,
+        'dst': dst,
+        'weight': weights,
+        'class_names': class_names,
+        'involved': np.array([len(m) > 0 for m in members], dtype=bool),
+        'method_cycles': method_cycles,
+    }
+
+
+def condensed_call_graph_lines(condensed: dict, nodes: np.ndarray = None, edges: np.ndarray = None) -> list:
+    """縮約した呼び出しグラフの行を生成（深さごとのサブグラフ、循環は1ノードにまとめる）
+
+    nodes（成分IDの配列）と edges（集約エッジの番号の配列）を渡すと、そのページの分のみ。
+    """
+    class_names = condensed['class_names']
+    depth = condensed['depth']
+    if nodes is None:
+        nodes = np.flatnonzero(condensed['involved'])
+        edges = np.arange(len(condensed['src']))
+
     lines = ['graph LR']
+    for level in np.unique(depth[nodes]).tolist():
+        lines.append(f'    subgraph depth_{level}["Depth {level}"]')
+        for c in nodes[depth[nodes] == level].tolist():
+            members = class_names[condensed['members'][c]].tolist()
+            if len(members) == 1:
+                label = members[0]
+            else:
+                label = ', '.join(members[:SCC_LABEL_LIMIT])
+                if len(members) > SCC_LABEL_LIMIT:
+                    label += f" +{len(members) - SCC_LABEL_LIMIT}"
+                label += f"<br/>(cycle: {len(members)} classes)"
+            lines.append(f'        scc_{c}["{label}"]')
+        lines.append('    end')
+        lines.append('')
+
+    lines.extend(f'    scc_{s} -->|"{w}"| scc_{t}'
+                 for s, t, w in zip(condensed['src'][edges].tolist(), condensed['dst'][edges].tolist(),
+                                    condensed['weight'][edges].tolist()))
+
+    cyclic = [c for c in nodes.tolist() if len(condensed['members'][c]) > 1]
+    if cyclic:
+        lines.append('')
+        lines.append('    classDef cycle fill:#e74c3c,stroke:#c0392b,color:white')
+        lines.extend(f'    class scc_{c} cycle' for c in cyclic)
+    return lines
+
+
+def write_call_graph_cycles(output_path: Path, graph: dict, condensed: dict) -> None:
+    """縮約で見つかった循環（クラス間・メソッド間）と深さの分布をMarkdownに書き出す"""
+    def listing(names):
+        text = ', '.join(names[:CYCLE_REPORT_LIMIT])
+        return text + (f" 他{len(names) - CYCLE_REPORT_LIMIT}件" if len(names) > CYCLE_REPORT_LIMIT else "")
+
+    class_names = condensed['class_names']
+    method_names = graph['nodes']['Method']['names']
+    involved = np.flatnonzero(condensed['involved'])
+    cycles = sorted((c for c in involved.tolist() if len(condensed['members'][c]) > 1),
+                    key=lambda c: -len(condensed['members'][c]))
+
+    lines = [
+        "# 呼び出しの循環",
+        "",
+        f"- 呼び出しに関わるクラス: {sum(len(condensed['members'][c]) for c in involved.tolist())}",
+        f"- 縮約後のノード（SCC）: {len(involved)}",
+        f"- 循環するクラスのグループ: {len(cycles)}",
+        f"- 再帰・相互呼び出しのメソッドのグループ: {len(condensed['method_cycles'])}",
+        f"- 最大の深さ: {int(condensed['depth'][involved].max()) if len(involved) else 0}",
+        "",
+        "## クラス間の循環",
+        "",
+        "| # | クラス数 | 深さ | クラス |",
+        "|---|---------|------|--------|",
+    ]
+    for i, c in enumerate(cycles, 1):
+        members = class_names[condensed['members'][c]].tolist()
+        lines.append(f"| {i} | {len(members)} | {condensed['depth'][c]} | {listing(members)} |")
+
+    lines.extend([
+        "",
+        "## メソッドの再帰・相互呼び出し",
+        "",
+        "| # | メソッド数 | メソッド |",
+        "|---|-----------|---------|",
+    ])
+    for i, methods in enumerate(sorted(condensed['method_cycles'], key=lambda m: -len(m)), 1):
+        lines.append(f"| {i} | {len(methods)} | {listing([method_names[m] for m in methods.tolist()])} |")
+
+    lines.extend([
+        "",
+        "## 深さごとのノード数",
+        "",
+        "| 深さ | SCC数 | クラス数 |",
+        "|------|-------|---------|",
+    ])
+    depth = condensed['depth'][involved]
+    class_counts = np.array([len(condensed['members'][c]) for c in involved.tolist()], dtype=np.int64)
+    for level in np.unique(depth).tolist():
+        at = depth == level
+        lines.append(f"| {level} | {int(at.sum())} | {int(class_counts[at].sum())} |")
+
+    write_output(output_path, '\n'.join(lines) + '\n')
+    print(f"  Generated: {output_path}")
 
-    # クラスごとにグループ化
-    class_methods = defaultdict(set)
-    all_methods_in_calls = set()
 
-    for _, row in calls.iterrows():
-        caller = row['caller']
-        callee = row['callee']
-        all_methods_in_calls.add(caller)
-        all_methods_in_calls.add(callee)
-        caller_class = caller.split('.')[0] if '.' in caller else caller
-        callee_class = callee.split('.')[0] if '.' in callee else callee
-        class_methods[caller_class].add(caller)
-        class_methods[callee_class].add(callee)
+def call_graph_lines(graph: dict, methods: np.ndarray = None, edges: np.ndarray = None) -> list:
+    """呼び出しグラフの行を生成
+
+    methods（メソッドIDの配列）と edges（呼び出しのエッジIDの配列）を渡すと、そのページの分のみ。
+    """
+    calls = graph['rels']['calls']
+    method_names = graph['nodes']['Method']['names']
+    method_ids = safe_ids(graph, 'Method')
+    src, dst = (calls['src'], calls['dst']) if edges is None else (calls['src'][edges], calls['dst'][edges])
+
+    lines = ['graph LR']
+
+    # 呼び出しに現れるメソッド（caller, callee の順。ページでは他ページとの呼び出しのみのメソッドを後ろに）
+    # をクラスごとにグループ化
+    order = np.column_stack([src, dst]).ravel()
+    if methods is not None:
+        order = np.concatenate([order, methods])
+    class_methods = defaultdict(list)
+    for m in pd.unique(order).tolist():
+        class_methods[method_names[m].split('.')[0]].append(m)
 
     for cls, meths in class_methods.items():
-        cid = safe_id(cls)
-        lines.append(f'    subgraph {cid}["{cls}"]')
+        lines.append(f'    subgraph {safe_id(cls)}["{cls}"]')
         for m in meths:
-            mid = safe_id(m)
-            method_name = m.split('.')[-1] if '.' in m else m
-            lines.append(f'        {mid}["{method_name}"]')
+            lines.append(f'        {method_ids[m]}["{method_names[m].split(".")[-1]}"]')
         lines.append('    end')
         lines.append('')
 
-    for _, row in calls.iterrows():
-        caller_id = safe_id(row['caller'])
-        callee_id = safe_id(row['callee'])
-        lines.append(f'    {caller_id} --> {callee_id}')
-
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
-    print(f"  Generated: {output_path}")
+    lines.extend(f'    {caller} --> {callee}' for caller, callee in zip(*edge_safe_ids(graph, 'calls', edges)))
+    return lines
 
 
 # ==============================================================================
 # DOT形式
 # ==============================================================================
 
-def generate_dot(data: dict, output_path: str, domain_filter: str = None):
-    """DOT形式のグラフを生成"""
-    domains = data.get('domains', pd.DataFrame())
-    entities = data.get('entities', pd.DataFrame())
-    belongs_to = data.get('belongs_to', pd.DataFrame())
-    references = data.get('references', pd.DataFrame())
-    implements_df = data.get('implements', pd.DataFrame())
-    terms = data.get('terms', pd.DataFrame())
-    has_term = data.get('has_term', pd.DataFrame())
-
+# 配置済みDOTの座標の倍率（力学レイアウトのエッジ長 80px を、ラベル付きノードが重ならない間隔に広げる）
+DOT_LAYOUT_SCALE = 1.5
+
+# クラスターの枠とノードの間の余白、およびクラスター同士の間隔（pt）
+DOT_CLUSTER_MARGIN = 60.0
+
+# ドメインごとのレイアウトをプロセスプールで並列に計算する最小ノード数（これ未満は逐次）
+DOT_PARALLEL_MIN_NODES = 5000
+
+
+def layout_cluster(job: tuple) -> np.ndarray:
+    """クラスター1つの力学レイアウトを計算（プロセスプールから呼ぶためモジュール直下に置く）"""
+    count, sources, targets, seed = job
+    return compute_force_layout(range(count), sources, targets, seed=seed)
+
+
+def dot_point(values) -> str:
+    """座標の並びを DOT の "x,y" 形式にする（小数1桁、-0.0 は 0.0）"""
+    return ",".join(f"{round(value, 1) + 0.0:.1f}" for value in values)
+
+
+def pack_boxes(sizes: np.ndarray, gap: float) -> np.ndarray:
+    """矩形をシェルフ法で詰め、各矩形の左下の座標を返す
+
+    高い順に左から行へ並べ、行幅は全体がほぼ正方形になる幅にする。先頭の行を上に置く（y 軸は上向き）。
+    """
+    order = np.argsort(-sizes[:, 1], kind='stable')
+    width = max(sizes[:, 0].max(), np.sqrt(((sizes + gap).prod(axis=1)).sum()))
+    offsets = np.zeros_like(sizes)
+    x = top = row_height = 0.0
+    for i in order.tolist():
+        w, h = sizes[i]
+        if x > 0 and x + w > width:
+            x, top, row_height = 0.0, top + row_height + gap, 0.0
+        offsets[i] = (x, top)
+        x += w + gap
+        row_height = max(row_height, h)
+    height = top + row_height
+    offsets[:, 1] = height - offsets[:, 1] - sizes[:, 1]
+    return offsets
+
+
+def dot_positions(graph: dict, clusters: list, extra: np.ndarray, seed: int = 42) -> tuple:
+    """DOT用にエンティティの座標を事前計算する
+
+    クラスター（エンティティIDの配列のリスト）ごとに、内部の REFERENCES / IMPLEMENTS だけで力学レイアウトを
+    計算し（ノード数が多ければ並列）、得られた矩形をシェルフ法で詰める。extra（どのクラスターにも
+    属さないエンティティ）は最後の1グループとして同様に配置する。
+
+    Returns:
+        (エンティティIDごとの座標 (件数, 2)。配置しないノードは NaN,
+         クラスターごとの bb (x0, y0, x1, y1) のリスト, 全体の bb)
+    """
+    entity_count = len(graph['nodes']['Entity']['names'])
+    rels = [graph['rels'][key] for key in ('references', 'implements')]
+    sources = np.concatenate([rel['src'] for rel in rels])
+    targets = np.concatenate([rel['dst'] for rel in rels])
+
+    groups = list(clusters) + ([extra] if len(extra) else [])
+    local = np.full(entity_count, -1, dtype=np.int64)
+    group_of = np.full(entity_count, -1, dtype=np.int64)
+    for g, members in enumerate(groups):
+        local[members] = np.arange(len(members))
+        group_of[members] = g
+    inside = (group_of[sources] >= 0) & (group_of[sources] == group_of[targets])
+    edge_order, bounds = group_slices(group_of[sources[inside]], len(groups))
+    inner_src, inner_dst = local[sources[inside]][edge_order], local[targets[inside]][edge_order]
+    jobs = [(len(members), inner_src[bounds[g]:bounds[g + 1]], inner_dst[bounds[g]:bounds[g + 1]], seed)
+            for g, members in enumerate(groups)]
+
+    if (len(jobs) > 1 and sum(job[0] for job in jobs) >= DOT_PARALLEL_MIN_NODES and (os.cpu_count() or 1) > 1
+            and 'fork' in multiprocessing.get_all_start_methods()):
+        with ProcessPoolExecutor(mp_context=multiprocessing.get_context('fork')) as pool:
+            layouts = list(pool.map(layout_cluster, jobs))
+    else:
+        layouts = [layout_cluster(job) for job in jobs]
+
+    # 各レイアウトを左下が (余白, 余白) になるよう平行移動し、余白込みの矩形として詰める
+    sizes = np.zeros((len(groups), 2))
+    for g, layout in enumerate(layouts):
+        layout *= DOT_LAYOUT_SCALE
+        if len(layout):
+            layout -= layout.min(axis=0)
+            sizes[g] = layout.max(axis=0)
+        sizes[g] += 2 * DOT_CLUSTER_MARGIN
+    offsets = pack_boxes(sizes, DOT_CLUSTER_MARGIN) if len(groups) else sizes
+
+    positions = np.full((entity_count, 2), np.nan)
+    for g, (members, layout) in enumerate(zip(groups, layouts)):
+        positions[members] = layout + offsets[g] + DOT_CLUSTER_MARGIN
+    boxes = [(x, y, x + w, y + h) for (x, y), (w, h) in zip(offsets.tolist(), sizes.tolist())]
+    extent = (offsets + sizes).max(axis=0) if len(groups) else np.zeros(2)
+    return positions, boxes[:len(clusters)], (0.0, 0.0, float(extent[0]), float(extent[1]))
+
+
+def generate_dot(graph: dict, output_path: str, domain_filter: str = None, positions: bool = False,
+                 layout_seed: int = 42):
+    """DOT形式のグラフを生成
+
+    positions を指定すると、ドメインごとに計算して詰めた座標をノードの pos、クラスターの枠を bb として書き出す。
+    Graphviz 側で配置を計算しないので、neato -n2 で描画だけを行える。
+    """
+    domains = node_names(graph, 'Domain')
     if domain_filter:
-        domains = domains[domains['name'] == domain_filter]
-        if not belongs_to.empty:
-            belongs_to = belongs_to[belongs_to['domain'] == domain_filter]
-
-    domain_entities = defaultdict(list)
-    for _, row in belongs_to.iterrows():
-        domain_entities[row['domain']].append(row['entity'])
+        domains = [d for d in domains if d == domain_filter]
 
     colors = {
         'Core': 'lightcoral',
@@ -613,155 +1616,483 @@ def generate_dot(data: dict, output_path: str, domain_filter: str = None):
         'RepositoryImplementation': 'cylinder',
     }
 
+    entity_names = graph['nodes']['Entity']['names']
+    entity_ids = safe_ids(graph, 'Entity')
+    entity_types = attr_array(graph, 'Entity', 'type')
+    belongs_to = graph['rels']['belongs_to']
+    members = [belongs_to['src'][in_edges(graph, 'belongs_to', dname)] for dname in domains]
+
     lines = ["digraph G {", "    rankdir=LR;", "    node [fontname=\"Helvetica\"];", ""]
 
-    for _, domain in domains.iterrows():
-        dname = domain['name']
-        dtype = domain.get('type', 'Unknown')
+    if positions:
+        # 複数のドメインに属するエンティティは、Graphviz と同じく最初のクラスターにだけ置く
+        placed = np.zeros(len(entity_names), dtype=bool)
+        for d, ents in enumerate(members):
+            ents = pd.unique(ents)
+            members[d] = ents[~placed[ents]]
+            placed[members[d]] = True
+        rels = [graph['rels'][key] for key in ('references', 'implements')]
+        ends = np.unique(np.concatenate([rel[side] for rel in rels for side in ('src', 'dst')]))
+        extra = ends[~placed[ends]]
+        coords, boxes, bounds = dot_positions(graph, members, extra, seed=layout_seed)
+        pos = np.array([dot_point(xy) for xy in coords.tolist()], dtype=object)
+        lines[1:1] = [
+            "    // Positions are precomputed: render with `neato -n2 -Tsvg graph.dot -o graph.svg`",
+            f'    bb="{dot_point(bounds)}";',
+        ]
+
+    for d, (dname, ents) in enumerate(zip(domains, members)):
+        dtype = node_attr(graph, 'Domain', dname, 'type', 'Unknown')
         color = colors.get(dtype, 'lightyellow')
 
         lines.append(f"    subgraph cluster_{safe_id(dname)} {{")
         lines.append(f'        label="{dname} ({dtype})";')
         lines.append(f"        style=filled;")
         lines.append(f"        fillcolor={color};")
+        if positions:
+            lines.append(f'        bb="{dot_point(boxes[d])}";')
         lines.append("")
 
-        for ent in domain_entities.get(dname, []):
-            etype = ""
-            if not entities.empty:
-                match = entities[entities['name'] == ent]
-                if not match.empty:
-                    etype = match.iloc[0].get('type', '')
+        for ent, eid, etype in zip(ents.tolist(), entity_ids[ents], entity_types[ents]):
             shape = type_shapes.get(etype, 'box')
-            lines.append(f'        {safe_id(ent)} [label="{ent}\\n({etype})" shape={shape}];')
+            at = f' pos="{pos[ent]}!"' if positions else ''
+            lines.append(f'        {eid} [label="{entity_names[ent]}\\n({etype})" shape={shape}{at}];')
 
         lines.append("    }")
         lines.append("")
 
+    if positions and len(extra):
+        lines.append("    // Entities outside the clusters")
+        lines.extend(f'    {eid} [pos="{xy}!"];' for eid, xy in zip(entity_ids[extra], pos[extra]))
+        lines.append("")
+
     # References
-    if not references.empty:
+    if edge_count(graph, 'references'):
         lines.append("    // References")
-        for _, row in references.iterrows():
-            src = safe_id(row['source'])
-            tgt = safe_id(row['target'])
-            lines.append(f'    {src} -> {tgt} [label="references" style=solid];')
+        lines.extend(f'    {src} -> {tgt} [label="references" style=solid];'
+                     for src, tgt in zip(*edge_safe_ids(graph, 'references')))
 
     # Implements
-    if not implements_df.empty:
+    if edge_count(graph, 'implements'):
         lines.append("    // Implements")
-        for _, row in implements_df.iterrows():
-            child = safe_id(row['child'])
-            parent = safe_id(row['parent'])
-            lines.append(f'    {child} -> {parent} [label="implements" style=dashed];')
+        lines.extend(f'    {child} -> {parent} [label="implements" style=dashed];'
+                     for child, parent in zip(*edge_safe_ids(graph, 'implements')))
 
     lines.append("}")
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
+    write_output(output_path, '\n'.join(lines))
     print(f"  Generated: {output_path}")
 
 
 # ==============================================================================
-# インタラクティブHTML（D3.js）
+# 力学レイアウト（HTMLビューア・配置済みDOT用の事前計算）
 # ==============================================================================
 
-def generate_html(data: dict, output_path: str, domain_filter: str = None):
-    """インタラクティブHTML（D3.js）を生成"""
-    domains = data.get('domains', pd.DataFrame())
-    entities = data.get('entities', pd.DataFrame())
-    belongs_to = data.get('belongs_to', pd.DataFrame())
-    references = data.get('references', pd.DataFrame())
-    implements_df = data.get('implements', pd.DataFrame())
-    terms = data.get('terms', pd.DataFrame())
-    has_term = data.get('has_term', pd.DataFrame())
-    actors = data.get('actors', pd.DataFrame())
-    methods = data.get('methods', pd.DataFrame())
-    calls = data.get('calls', pd.DataFrame())
-    bp = data.get('business_processes', pd.DataFrame())
-    activities = data.get('activities', pd.DataFrame())
-    sp = data.get('system_processes', pd.DataFrame())
+# ビューアの d3.forceLink と同じ理想エッジ長（px）
+LAYOUT_LINK_DISTANCE = 80.0
+
+# 反発力の近似に使うグリッドの1辺の最大セル数
+LAYOUT_MAX_GRID = 16
+
+# 原点へ引き戻す力の強さ（反発力とのつり合いで全体の広がりが決まる）
+LAYOUT_GRAVITY = 1.0
+
+
+def load_layout(layout_path: Path) -> dict:
+    """前回のレイアウト（"タイプ:ノード名" -> [x, y]）を読み込む（なければ空）"""
+    if not layout_path.exists():
+        return {}
+    try:
+        return json.loads(layout_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable layout file {layout_path}: {e}")
+        return {}
+
+
+def compute_force_layout(names: list, sources: np.ndarray, targets: np.ndarray,
+                         previous: dict = None, seed: int = 42, iterations: int = None) -> np.ndarray:
+    """Fruchterman-Reingold 法による力学レイアウトをNumPyで計算
+
+    反発力はノードをグリッドに集約し、各セルの重心と質量で近似する（Barnes-Hut の1階層版）。
+    previous に前回の座標があるノードはそこから開始し（ウォームスタート）、新規ノードは
+    座標既知の隣接ノードの近くに置く。乱数は seed で固定するため、同じ入力なら同じ結果になる。
+
+    Returns:
+        (ノード数, 2) の座標配列（原点中心、単位はpx）
+    """
+    n = len(names)
+    k = LAYOUT_LINK_DISTANCE
+    rng = np.random.default_rng(seed)
+    pos = rng.normal(scale=k * np.sqrt(max(n, 1)) / 2, size=(n, 2))
+    if n < 2:
+        return np.zeros((n, 2))
+
+    known = np.zeros(n, dtype=bool)
+    if previous:
+        for i, name in enumerate(names):
+            xy = previous.get(name)
+            if xy is not None:
+                pos[i] = xy
+                known[i] = True
+        # 新規ノードは座標既知の隣接ノードの重心付近に配置
+        ends = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+        placed = known[ends[1]] & ~known[ends[0]]
+        counts = np.bincount(ends[0][placed], minlength=n)
+        near = counts > 0
+        for axis in range(2):
+            sums = np.bincount(ends[0][placed], weights=pos[ends[1][placed], axis], minlength=n)
+            pos[near, axis] = sums[near] / counts[near] + rng.normal(scale=k / 2, size=near.sum())
+
+    # 大半の座標が既知なら少ない反復・小さい移動量で微調整のみ行う
+    warm = known.mean() >= 0.9
+    if iterations is None:
+        iterations = 30 if warm else 100
+    temperature = np.full(n, k * 2 if warm else k * np.sqrt(n) / 2)
+    if warm:
+        # 既存ノードは前回の位置からほとんど動かさない
+        temperature[known] = k / 20
+
+    grid = int(np.clip(np.sqrt(n / 8), 1, LAYOUT_MAX_GRID))
+    block = max(1, 1_000_000 // (grid * grid))
+    for step in range(iterations):
+        disp = np.zeros_like(pos)
+
+        # 反発力: グリッドセルの重心からの k^2 / d
+        low = pos.min(axis=0)
+        span = np.maximum(pos.max(axis=0) - low, 1e-9)
+        cells = np.minimum((pos - low) / span * grid, grid - 1).astype(np.int64)
+        cell_ids = cells[:, 0] * grid + cells[:, 1]
+        mass = np.bincount(cell_ids, minlength=grid * grid)
+        occupied = np.flatnonzero(mass)
+        centroids = np.column_stack([
+            np.bincount(cell_ids, weights=pos[:, axis], minlength=grid * grid)[occupied] / mass[occupied]
+            for axis in range(2)
+        ])
+        weight = (mass[occupied] * k * k).astype(np.float32)
+        cx, cy = centroids.astype(np.float32).T
+        for start in range(0, n, block):
+            dx = pos[start:start + block, 0, None].astype(np.float32) - cx
+            dy = pos[start:start + block, 1, None].astype(np.float32) - cy
+            force = weight / (dx * dx + dy * dy + (k / 2) ** 2)
+            disp[start:start + block, 0] += (dx * force).sum(axis=1)
+            disp[start:start + block, 1] += (dy * force).sum(axis=1)
+
+        # 引力: エッジに沿って d^2 / k
+        if len(sources):
+            delta = pos[targets] - pos[sources]
+            pull = delta * (np.sqrt((delta ** 2).sum(axis=1)) / k)[:, None]
+            for axis in range(2):
+                disp[:, axis] += np.bincount(sources, weights=pull[:, axis], minlength=n)
+                disp[:, axis] -= np.bincount(targets, weights=pull[:, axis], minlength=n)
+
+        # 重力: 反発力とつり合い、全体が半径 k * sqrt(n) 程度に収まるよう原点へ引き戻す
+        disp -= pos * LAYOUT_GRAVITY
+
+        # 温度で移動量を制限し、反復ごとに冷却
+        length = np.maximum(np.sqrt((disp ** 2).sum(axis=1)), 1e-9)
+        limit = temperature * (1 - step / iterations)
+        pos += disp * (np.minimum(length, limit) / length)[:, None]
+
+    return pos - pos.mean(axis=0)
 
-    if domain_filter:
-        domains = domains[domains['name'] == domain_filter]
-        if not belongs_to.empty:
-            belongs_to = belongs_to[belongs_to['domain'] == domain_filter]
-
-    nodes = []
-    links = []
-    node_ids = {}
-    node_idx = 0
-
-    def add_node(name, ntype, group="", extra=None):
-        nonlocal node_idx
-        if name in node_ids:
-            return node_ids[name]
-        nid = node_idx
-        node_ids[name] = nid
-        node_idx += 1
-        node = {"id": nid, "name": name, "type": ntype, "group": group}
-        if extra:
-            node.update(extra)
-        nodes.append(node)
-        return nid
-
-    def add_link(source_name, target_name, rel_type):
-        src = node_ids.get(source_name)
-        tgt = node_ids.get(target_name)
-        if src is not None and tgt is not None:
-            links.append({"source": src, "target": tgt, "type": rel_type})
-
-    # ドメインノード
-    for _, row in domains.iterrows():
-        add_node(row['name'], "Domain", row.get('type', 'Unknown'))
-
-    # エンティティノード
-    domain_ents = set(belongs_to['entity'].tolist()) if not belongs_to.empty else set()
-    for _, row in entities.iterrows():
-        if domain_filter and row['name'] not in domain_ents:
-            continue
-        add_node(row['name'], "Entity", row.get('type', 'class'))
 
-    # 用語ノード（上位20件のみ）
-    for _, row in terms.head(20).iterrows():
-        name_ja = row.get('name_ja', '')
-        add_node(row['name'], "Term", row.get('domain', ''),
-                 {"name_ja": name_ja})
+# ==============================================================================
+# グラフデータセット（manifest + ドメイン別シャード）
+# ==============================================================================
+
+# データセットを書き出すディレクトリ（graph.html と同じ場所）
+GRAPH_DATASET_DIR = "graph-data"
+
+# manifest.json の形式名とバージョン（ビューア・compile_report.py・convert_to_nextra.py が参照）
+GRAPH_DATASET_FORMAT = "knowledge-graph-shards"
+GRAPH_DATASET_VERSION = 1
 
-    # アクターノード
-    for _, row in actors.iterrows():
-        add_node(row['name'], "Actor", row.get('type', 'Unknown'))
+# どのドメインにも属さないノードをまとめるグループ名
+UNGROUPED_NAME = "(未分類)"
 
-    # ビジネスプロセスノード
-    for _, row in bp.iterrows():
-        add_node(row['name'], "BusinessProcess", row.get('domain', ''),
-                 {"name_ja": row.get('name_ja', '')})
+# シャードに含めるノード: (ラベル, group列に使う属性, 既定値)
+DATASET_NODE_TYPES = [
+    ('Entity', 'type', 'class'),
+    ('Term', 'domain', ''),
+    ('Actor', 'type', 'Unknown'),
+    ('BusinessProcess', 'domain', ''),
+    ('SystemProcess', 'type', 'sync'),
+]
+
+# シャードに含めるリレーション: (REL_SPECS のキー, リンクタイプ)
+DATASET_RELATIONS = [
+    ('belongs_to', "BELONGS_TO"),
+    ('references', "REFERENCES"),
+    ('implements', "IMPLEMENTS"),
+    ('has_term', "HAS_TERM"),
+    ('participates_in', "PARTICIPATES_IN"),
+]
 
-    # システムプロセスノード
-    for _, row in sp.iterrows():
-        add_node(row['name'], "SystemProcess", row.get('type', 'sync'))
 
-    # BELONGS_TO
-    for _, row in belongs_to.iterrows():
-        add_link(row['entity'], row['domain'], "BELONGS_TO")
+def json_text(values) -> list:
+    """JSONに書き出す属性値のリスト（欠損値の NaN は空文字にする）"""
+    return ['' if isinstance(value, float) and value != value else value for value in values]
+
+
+def dataset_home_groups(graph: dict, domain_index: dict, ungrouped: int) -> dict:
+    """ノードごとの所属グループ（ドメインの番号）をラベルごとのID順配列で求める
+
+    エンティティは最初の BELONGS_TO 先、用語・ビジネスプロセスは domain 属性
+    （用語は該当がなければ最初に関連付いたエンティティのドメイン）。それ以外は未分類。
+    """
+    def from_domain_attr(label):
+        values = attr_array(graph, label, 'domain')
+        return np.array([domain_index.get(value, ungrouped) for value in values], dtype=np.int64)
+
+    homes = {'Domain': np.arange(len(graph['nodes']['Domain']['names']), dtype=np.int64)}
+
+    rel = graph['rels']['belongs_to']
+    entity_home = np.full(len(graph['nodes']['Entity']['names']), ungrouped, dtype=np.int64)
+    entities, first = np.unique(rel['src'], return_index=True)
+    entity_home[entities] = rel['dst'][first]
+    homes['Entity'] = entity_home
+
+    rel = graph['rels']['has_term']
+    term_home = from_domain_attr('Term')
+    candidates = np.flatnonzero((term_home[rel['dst']] == ungrouped) & (entity_home[rel['src']] != ungrouped))
+    terms, first = np.unique(rel['dst'][candidates], return_index=True)
+    term_home[terms] = entity_home[rel['src'][candidates[first]]]
+    homes['Term'] = term_home
+
+    homes['BusinessProcess'] = from_domain_attr('BusinessProcess')
+    for label in ('Actor', 'SystemProcess'):
+        homes[label] = np.full(len(graph['nodes'][label]['names']), ungrouped, dtype=np.int64)
+    return homes
+
+
+def group_slices(groups: np.ndarray, count: int) -> tuple:
+    """グループ番号の配列を安定ソートし、(並べ替え順, グループごとの開始位置) を返す"""
+    order = np.argsort(groups, kind='stable')
+    return order, np.searchsorted(groups[order], np.arange(count + 1))
+
+
+def build_graph_dataset(graph: dict, layout: dict = None, layout_seed: int = 42) -> tuple:
+    """ビューア用のグラフデータセット（manifest とドメイン別シャード）を構築（件数の切り詰めなし）
+
+    ドメインと未分類グループは manifest のスーパーノードになり、その他のノードは所属グループの
+    シャードに1回ずつ入る。グループをまたぐリンクは両側のシャードに入り、端点の所属グループを持つ。
+    manifest にはグループ間の集約エッジ（weight はまとめたエッジ本数）も持つ。
+    テーブルはすべて列指向（{列名: [値, ...]}）で、ノード・リンクのタイプはコード化する。
+    layout（"タイプ:ノード名" -> [x, y]）を渡すと、そこからウォームスタートした力学レイアウトを
+    x/y 列に入れ、layout 自体も更新する。
+
+    Returns:
+        (manifest, shards)。shards はグループ番号順で、空のグループは None
+    """
+    domains = graph['nodes']['Domain']['names']
+    ungrouped = len(domains)
+    group_count = ungrouped + 1
+    homes = dataset_home_groups(graph, {name: i for i, name in enumerate(domains)}, ungrouped)
+    node_types = ['Domain', 'Group'] + [label for label, _, _ in DATASET_NODE_TYPES]
+    link_types = [rel_type for _, rel_type in DATASET_RELATIONS]
+
+    # 全ノードに通し番号を振る（先頭がグループのスーパーノード）
+    keys = [f"Domain:{name}" for name in domains] + [f"Group:{UNGROUPED_NAME}"]
+    names = list(domains) + [UNGROUPED_NAME]
+    types = [0] * ungrouped + [1]
+    groups = json_text(attr_array(graph, 'Domain', 'type', 'Unknown')) + ['']
+    names_ja = [''] * group_count
+    node_home = [np.arange(group_count)]
+    offsets = {'Domain': 0}
+    for label, group_col, default in DATASET_NODE_TYPES:
+        label_names = graph['nodes'][label]['names']
+        offsets[label] = len(keys)
+        keys.extend(f"{label}:{name}" for name in label_names)
+        names.extend(label_names)
+        types.extend([node_types.index(label)] * len(label_names))
+        groups.extend(json_text(attr_array(graph, label, group_col, default)))
+        names_ja.extend(json_text(attr_array(graph, label, 'name_ja')))
+        node_home.append(homes[label])
+    node_home = np.concatenate(node_home)
+    keys, names, types, groups, names_ja = (np.array(column, dtype=object)
+                                            for column in (keys, names, types, groups, names_ja))
+
+    sources, targets, link_codes = [], [], []
+    for code, (rel_key, _) in enumerate(DATASET_RELATIONS):
+        rel = graph['rels'][rel_key]
+        sources.append(rel['src'] + offsets[rel['from']])
+        targets.append(rel['dst'] + offsets[rel['to']])
+        link_codes.append(np.full(len(rel['src']), code, dtype=np.int64))
+    sources, targets, link_codes = (np.concatenate(column) for column in (sources, targets, link_codes))
+    source_home, target_home = node_home[sources], node_home[targets]
+
+    positions = None
+    if layout is not None:
+        positions = np.round(compute_force_layout(keys.tolist(), sources, targets,
+                                                  previous=layout, seed=layout_seed), 1)
+        layout.update(zip(keys.tolist(), positions.tolist()))
+
+    # シャード: 所属ノードと、どちらかの端点が所属するリンク
+    member = np.arange(group_count, len(keys))
+    node_order, node_bounds = group_slices(node_home[member], group_count)
+    cross = source_home != target_home
+    link_ids = np.concatenate([np.arange(len(sources)), np.flatnonzero(cross)])
+    link_order, link_bounds = group_slices(np.concatenate([source_home, target_home[cross]]), group_count)
+    shards = []
+    for group in range(group_count):
+        nodes = member[node_order[node_bounds[group]:node_bounds[group + 1]]]
+        links = link_ids[link_order[link_bounds[group]:link_bounds[group + 1]]]
+        if not len(nodes) and not len(links):
+            shards.append(None)
+            continue
+        node_table = {
+            "type": types[nodes].tolist(),
+            "name": names[nodes].tolist(),
+            "group": groups[nodes].tolist(),
+            "name_ja": names_ja[nodes].tolist(),
+        }
+        if positions is not None:
+            node_table["x"] = positions[nodes, 0].tolist()
+            node_table["y"] = positions[nodes, 1].tolist()
+        shards.append({
+            "group": group,
+            "nodes": node_table,
+            "links": {
+                "source": keys[sources[links]].tolist(),
+                "target": keys[targets[links]].tolist(),
+                "type": link_codes[links].tolist(),
+                "sourceGroup": source_home[links].tolist(),
+                "targetGroup": target_home[links].tolist(),
+            },
+        })
+
+    # 未分類グループは空なら出さない（末尾なので他のグループ番号は変わらない）
+    shown = group_count if shards[ungrouped] else ungrouped
+    group_table = {
+        "id": keys[:shown].tolist(),
+        "name": names[:shown].tolist(),
+        "type": types[:shown].tolist(),
+        "group": groups[:shown].tolist(),
+        "count": np.diff(node_bounds)[:shown].tolist(),
+        "shard": [f"shard-{group:04d}.json" if shards[group] else None for group in range(shown)],
+    }
+    if positions is not None:
+        group_table["x"] = positions[:shown, 0].tolist()
+        group_table["y"] = positions[:shown, 1].tolist()
+
+    low = np.minimum(source_home[cross], target_home[cross])
+    high = np.maximum(source_home[cross], target_home[cross])
+    pairs, weights = np.unique(low * group_count + high, return_counts=True)
+
+    type_counts = {"Domain": len(domains)}
+    for label, _, _ in DATASET_NODE_TYPES:
+        if graph['nodes'][label]['names']:
+            type_counts[label] = len(graph['nodes'][label]['names'])
+
+    manifest = {
+        "format": GRAPH_DATASET_FORMAT,
+        "version": GRAPH_DATASET_VERSION,
+        "nodeTypes": node_types,
+        "linkTypes": link_types,
+        "typeCounts": type_counts,
+        "groups": group_table,
+        "links": {
+            "source": (pairs // group_count).tolist(),
+            "target": (pairs % group_count).tolist(),
+            "weight": weights.tolist(),
+        },
+    }
+    return manifest, shards
 
-    # REFERENCES
-    for _, row in references.iterrows():
-        add_link(row['source'], row['target'], "REFERENCES")
 
-    # IMPLEMENTS
-    for _, row in implements_df.iterrows():
-        add_link(row['child'], row['parent'], "IMPLEMENTS")
+def write_graph_dataset(dataset_dir: Path, manifest: dict, shards: list) -> list:
+    """データセットをディレクトリに書き出し、書き出したファイル名の一覧を返す
 
-    # HAS_TERM (subset)
-    for _, row in has_term.head(30).iterrows():
-        add_link(row['entity'], row['term'], "HAS_TERM")
+    今回書き出さないシャードは削除し、内容が変わらないシャードは書き換えない。
+    manifest.json は最後に書くので、読み手は常に揃ったシャードを参照する。
+    """
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    files = [f"shard-{group:04d}.json" for group, shard in enumerate(shards) if shard is not None]
+    for stale in dataset_dir.glob('shard-*.json'):
+        if stale.name not in files:
+            stale.unlink()
+    for name, shard in zip(files, (shard for shard in shards if shard is not None)):
+        write_output(dataset_dir / name, json.dumps(shard, ensure_ascii=False, separators=(',', ':')))
+    write_output(dataset_dir / 'manifest.json', json.dumps(manifest, ensure_ascii=False, separators=(',', ':')))
+    return ['manifest.json'] + files
 
-    # PARTICIPATES_IN
-    participates = data.get('participates_in', pd.DataFrame())
-    for _, row in participates.iterrows():
-        add_link(row['entity'], row['process'], "PARTICIPATES_IN")
 
-    html_content = f'''<!DOCTYPE html>
+# ==============================================================================
+# インタラクティブHTML（D3.js）
+# ==============================================================================
+
+# HTMLビューアの描画方式（svg: 要素ごとのSVG、canvas/webgl: 一括描画）
+RENDERERS = ['svg', 'canvas', 'webgl']
+
+# グラフデータセットのビューア（compile_report.py と共有する assets/graph-viewer.js）
+GRAPH_VIEWER_JS_PATH = Path(__file__).parent / 'assets' / 'graph-viewer.js'
+GRAPH_VIEWER_JS = GRAPH_VIEWER_JS_PATH.read_text(encoding='utf-8')
+
+
+def dataset_script_tags(files: dict) -> str:
+    """データセットのファイルを <script type="application/json"> として埋め込むタグを作る
+
+    files はファイル名 -> JSONに書き出すオブジェクト。"</" はスクリプトの終端と解釈されないようにエスケープする。
+    """
+    tags = []
+    for name, content in files.items():
+        text = json.dumps(content, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+        tags.append(f'    <script type="application/json" id="graph-data:{name}">{text}</script>')
+    return '\n'.join(tags)
+
+
+def generate_html(graph: dict, output_path: str, domain_filter: str = None,
+                  precompute_layout: bool = True, layout_seed: int = 42, renderer: str = 'svg',
+                  lod: bool = False, embed_data: bool = False):
+    """インタラクティブHTML（D3.js）を生成
+
+    グラフ本体は graph-data/ のデータセット（manifest.json + ドメイン別シャード）に書き出し、
+    ビューアはそこから必要なシャードだけを読み込む。通常は全ドメインを展開して表示し
+    （domain_filter があればそのドメインのみ）、lod が有効な場合はドメインのスーパーノードだけを
+    表示してクリックで展開する。
+    precompute_layout が有効な場合は力学レイアウトを事前計算して座標をデータセットに入れ、
+    ビューアはシミュレーションを実行せずに描画する。座標は graph-layout.json に保存し、
+    次回のウォームスタートに使う。
+    renderer が canvas/webgl の場合はSVG要素を作らずキャンバスに一括描画する（大規模グラフ向け）。
+    シャードは fetch で読むため、embed_data が無効な場合はHTMLをHTTPサーバー経由で開く必要がある。
+    """
+    output_path = Path(output_path)
+    layout_path = output_path.with_name('graph-layout.json')
+    layout = load_layout(layout_path) if precompute_layout else None
+
+    manifest, shards = build_graph_dataset(graph, layout, layout_seed)
+    dataset_dir = output_path.with_name(GRAPH_DATASET_DIR)
+    files = write_graph_dataset(dataset_dir, manifest, shards)
+    if layout is not None:
+        write_output(layout_path, json.dumps(layout, ensure_ascii=False))
+
+    # 初期表示: 全展開 / 指定ドメインのみ展開 / スーパーノードのみ（LOD）
+    if domain_filter:
+        initial_js = f'explorer.expand([{json.dumps(f"Domain:{domain_filter}", ensure_ascii=False)}])'
+    elif lod:
+        initial_js = 'null'
+    else:
+        initial_js = 'explorer.expandAll()'
+
+    data_scripts = ''
+    if embed_data:
+        data_scripts = dataset_script_tags(
+            {"manifest.json": manifest,
+             **{f"shard-{group:04d}.json": shard for group, shard in enumerate(shards) if shard}})
+
+    html_content = render_viewer_page(renderer, initial_js, data_scripts)
+    write_output(output_path, html_content)
+    print(f"  Generated: {output_path} (+ {len(files)} files in {dataset_dir})")
+
+
+def render_viewer_page(renderer: str, initial_js: str, data_scripts: str = '') -> str:
+    """グラフビューアのHTMLページを組み立てる
+
+    操作パネル・検索・タイプ別フィルタ・凡例は共通。initial_js はデータセットの manifest を
+    読み込んだ後に評価する式（explorer の展開操作。Promise を返してよい）。
+    data_scripts は埋め込むデータセットの <script> タグ（空なら graph-data/ から取得する）。
+    """
+    return f'''<!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="utf-8">
@@ -810,14 +2141,14 @@ def generate_html(data: dict, output_path: str, domain_filter: str = None):
     <div id="controls">
         <h3>Knowledge Graph Explorer</h3>
         <input type="text" id="search" placeholder="Search nodes...">
-        <div id="stats"></div>
+        <div id="stats">Loading...</div>
         <div id="filter-buttons"></div>
         <div class="legend" id="legend"></div>
     </div>
     <div id="graph"></div>
+{data_scripts}
     <script>
-        const rawData = {json.dumps({"nodes": nodes, "links": links}, ensure_ascii=False)};
-
+{GRAPH_VIEWER_JS}
         const typeColors = {{
             "Domain": "#e74c3c",
             "Entity": "#3498db",
@@ -825,7 +2156,8 @@ def generate_html(data: dict, output_path: str, domain_filter: str = None):
             "Actor": "#9b59b6",
             "BusinessProcess": "#f39c12",
             "SystemProcess": "#1abc9c",
-            "Method": "#e67e22"
+            "Method": "#e67e22",
+            "Group": "#7f8c8d"
         }};
 
         const typeSizes = {{
@@ -835,7 +2167,8 @@ def generate_html(data: dict, output_path: str, domain_filter: str = None):
             "Actor": 14,
             "BusinessProcess": 16,
             "SystemProcess": 12,
-            "Method": 6
+            "Method": 6,
+            "Group": 14
         }};
 
         const linkColors = {{
@@ -844,89 +2177,66 @@ def generate_html(data: dict, output_path: str, domain_filter: str = None):
             "IMPLEMENTS": "#9b59b6",
             "HAS_TERM": "#2ecc71",
             "PARTICIPATES_IN": "#f39c12",
-            "CALLS": "#e67e22"
+            "CALLS": "#e67e22",
+            "AGGREGATE": "#aaaaaa"
         }};
 
         const width = window.innerWidth;
         const height = window.innerHeight;
-
-        const svg = d3.select("#graph").append("svg")
-            .attr("width", width).attr("height", height);
-        const g = svg.append("g");
-
-        svg.call(d3.zoom().scaleExtent([0.05, 5])
-            .on("zoom", (e) => g.attr("transform", e.transform)));
-
-        const simulation = d3.forceSimulation(rawData.nodes)
-            .force("link", d3.forceLink(rawData.links).id(d => d.id).distance(80))
-            .force("charge", d3.forceManyBody().strength(-200))
-            .force("center", d3.forceCenter(width / 2, height / 2))
-            .force("collision", d3.forceCollide().radius(d => (typeSizes[d.type] || 10) + 5));
-
-        const link = g.append("g").selectAll("line").data(rawData.links).join("line")
-            .attr("class", "link")
-            .attr("stroke", d => linkColors[d.type] || "#555")
-            .attr("stroke-width", 1.2);
-
-        const node = g.append("g").selectAll("g").data(rawData.nodes).join("g")
-            .attr("class", "node")
-            .call(d3.drag()
-                .on("start", (e) => {{ if (!e.active) simulation.alphaTarget(0.3).restart(); e.subject.fx = e.subject.x; e.subject.fy = e.subject.y; }})
-                .on("drag", (e) => {{ e.subject.fx = e.x; e.subject.fy = e.y; }})
-                .on("end", (e) => {{ if (!e.active) simulation.alphaTarget(0); e.subject.fx = null; e.subject.fy = null; }}));
-
-        node.append("circle")
-            .attr("r", d => typeSizes[d.type] || 10)
-            .attr("fill", d => typeColors[d.type] || "#666")
-            .attr("stroke", "rgba(255,255,255,0.2)")
-            .attr("stroke-width", 1.5);
-
-        node.append("text").attr("dx", d => (typeSizes[d.type] || 10) + 4).attr("dy", 4)
-            .text(d => d.name.length > 25 ? d.name.substring(0, 25) + "..." : d.name);
-
         const tooltip = d3.select("body").append("div").attr("class", "tooltip").style("opacity", 0);
 
-        node.on("mouseover", (e, d) => {{
-            tooltip.transition().duration(150).style("opacity", 1);
-            let html = `<strong>${{d.name}}</strong><br/>Type: ${{d.type}}<br/>Group: ${{d.group}}`;
-            if (d.name_ja) html += `<br/>日本語: ${{d.name_ja}}`;
-            tooltip.html(html).style("left", (e.pageX + 12) + "px").style("top", (e.pageY - 12) + "px");
-        }}).on("mouseout", () => tooltip.transition().duration(300).style("opacity", 0));
-
-        simulation.on("tick", () => {{
-            link.attr("x1", d => d.source.x).attr("y1", d => d.source.y)
-                .attr("x2", d => d.target.x).attr("y2", d => d.target.y);
-            node.attr("transform", d => `translate(${{d.x}},${{d.y}})`);
+        // ドメインのスーパーノードは所属ノード数に応じて大きくする
+        const nodeRadius = d => (typeSizes[d.type] || 10) + (d.count !== undefined ? Math.min(Math.sqrt(d.count), 30) : 0);
+
+        const explorer = createGraphExplorer(document.getElementById("graph"), datasetSource("{GRAPH_DATASET_DIR}"), {{
+            renderer: "{renderer}", width, height,
+            radius: nodeRadius,
+            color: d => typeColors[d.type] || "#666",
+            linkColor: l => linkColors[l.type] || "#555",
+            linkWidth: l => l.weight ? Math.min(1 + Math.log2(l.weight), 8) : 1.2,
+            label: d => {{
+                const name = d.name.length > 25 ? d.name.substring(0, 25) + "..." : d.name;
+                return d.count !== undefined && !explorer.isExpanded(d.id) ? `${{name}} (${{d.count}})` : name;
+            }},
+            onHover: (e, d) => {{
+                if (!d) {{ tooltip.style("opacity", 0); return; }}
+                let html = `<strong>${{d.name}}</strong><br/>Type: ${{d.type}}<br/>Group: ${{d.group}}`;
+                if (d.name_ja) html += `<br/>日本語: ${{d.name_ja}}`;
+                if (d.shard) html += `<br/>Nodes: ${{d.count}} (click to ${{explorer.isExpanded(d.id) ? "collapse" : "expand"}})`;
+                tooltip.style("opacity", 1).html(html)
+                    .style("left", (e.pageX + 12) + "px").style("top", (e.pageY - 12) + "px");
+            }},
+            onChange: (nodes, links, expandedCount, total) => d3.select("#stats").html(
+                `Nodes: ${{nodes.length}} | Links: ${{links.length}} | Expanded: ${{expandedCount}}/${{total}}`),
+            onError: err => d3.select("#stats").html(
+                `Failed to load graph data: ${{err.message}}<br/>Open this page via an HTTP server (e.g. python -m http.server).`)
         }});
 
+        explorer.ready.then(manifest => {{
+            // Filter buttons
+            const types = Object.keys(manifest.typeCounts);
+            const activeFilters = new Set(types);
+            const btnContainer = d3.select("#filter-buttons");
+            types.forEach(t => {{
+                btnContainer.append("button").attr("class", "filter-btn active")
+                    .style("border-color", typeColors[t] || "#555")
+                    .text(t + " (" + manifest.typeCounts[t] + ")")
+                    .on("click", function() {{
+                        if (activeFilters.has(t)) activeFilters.delete(t); else activeFilters.add(t);
+                        d3.select(this).classed("active", activeFilters.has(t));
+                        explorer.filter(d => d.type === "Group" || activeFilters.has(d.type));
+                    }});
+            }});
+            return {initial_js};
+        }}).then(() => explorer.fit());
+
         // Search
         d3.select("#search").on("input", function() {{
             const q = this.value.toLowerCase();
-            if (!q) {{ node.style("opacity", 1); link.style("opacity", 0.4); return; }}
+            if (!q) {{ explorer.highlight(null); return; }}
             const matched = new Set();
-            rawData.nodes.forEach(n => {{ if (n.name.toLowerCase().includes(q) || (n.name_ja && n.name_ja.includes(q))) matched.add(n.id); }});
-            node.style("opacity", d => matched.has(d.id) ? 1 : 0.1);
-            link.style("opacity", d => (matched.has(d.source.id) || matched.has(d.target.id)) ? 0.6 : 0.05);
-        }});
-
-        // Filter buttons
-        const types = [...new Set(rawData.nodes.map(n => n.type))];
-        const activeFilters = new Set(types);
-        const btnContainer = d3.select("#filter-buttons");
-        types.forEach(t => {{
-            btnContainer.append("button").attr("class", "filter-btn active")
-                .style("border-color", typeColors[t] || "#555")
-                .text(t + " (" + rawData.nodes.filter(n => n.type === t).length + ")")
-                .on("click", function() {{
-                    if (activeFilters.has(t)) activeFilters.delete(t); else activeFilters.add(t);
-                    d3.select(this).classed("active", activeFilters.has(t));
-                    node.style("display", d => activeFilters.has(d.type) ? null : "none");
-                    link.style("display", d => {{
-                        const sn = rawData.nodes[typeof d.source === 'object' ? d.source.id : d.source];
-                        const tn = rawData.nodes[typeof d.target === 'object' ? d.target.id : d.target];
-                        return (sn && activeFilters.has(sn.type) && tn && activeFilters.has(tn.type)) ? null : "none";
-                    }});
-                }});
+            explorer.nodes().forEach(n => {{ if (n.name.toLowerCase().includes(q) || (n.name_ja && n.name_ja.includes(q))) matched.add(n.id); }});
+            explorer.highlight(matched);
         }});
 
         // Legend
@@ -936,29 +2246,27 @@ def generate_html(data: dict, output_path: str, domain_filter: str = None):
             item.append("div").attr("class", "legend-dot").style("background", c);
             item.append("span").text(t);
         }});
-
-        d3.select("#stats").html(`Nodes: ${{rawData.nodes.length}} | Links: ${{rawData.links.length}}`);
     </script>
 </body>
 </html>'''
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    print(f"  Generated: {output_path}")
-
 
 # ==============================================================================
 # サマリー
 # ==============================================================================
 
-def generate_summary(data: dict, output_path: str, output_dir: Path):
-    """可視化サマリーを生成"""
+def generate_summary(graph: dict, output_path: str, output_dir: Path, timings: dict = None,
+                     elapsed: float = None):
+    """可視化サマリーを生成（timings の値が None の成果物は最新のため再生成しなかったもの）"""
     now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-    # ファイル一覧を収集
+    # ファイル一覧を収集（状態ファイルなどのドットファイルは除く）
     files_generated = []
     for root, dirs, files in os.walk(output_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
         for f in sorted(files):
+            if f.startswith('.'):
+                continue
             rel = os.path.relpath(os.path.join(root, f), output_dir)
             files_generated.append(rel)
 
@@ -989,8 +2297,7 @@ def generate_summary(data: dict, output_path: str, output_dir: Path):
 
     total_nodes = 0
     for label, key in stats:
-        df = data.get(key, pd.DataFrame())
-        count = len(df)
+        count = len(graph['tables'].get(key, ()))
         total_nodes += count
         lines.append(f"| {label} | {count} |")
     lines.append(f"| **ノード合計** | **{total_nodes}** |")
@@ -1009,8 +2316,7 @@ def generate_summary(data: dict, output_path: str, output_dir: Path):
     lines.extend(["", "| リレーション | 件数 |", "|-------------|------|"])
     total_rels = 0
     for label, key in rel_stats:
-        df = data.get(key, pd.DataFrame())
-        count = len(df)
+        count = len(graph['tables'].get(key, ()))
         total_rels += count
         if count > 0:
             lines.append(f"| {label} | {count} |")
@@ -1029,6 +2335,7 @@ def generate_summary(data: dict, output_path: str, output_dir: Path):
         '.dot': ('DOT', 'Graphviz変換'),
         '.html': ('HTML', 'インタラクティブビュー'),
         '.md': ('Markdown', 'ドキュメント'),
+        '.json': ('JSON', 'データ'),
         '.png': ('PNG', '画像'),
         '.svg': ('SVG', 'ベクター画像'),
     }
@@ -1038,13 +2345,30 @@ def generate_summary(data: dict, output_path: str, output_dir: Path):
         fmt, purpose = format_map.get(ext, ('Other', '-'))
         lines.append(f"| {f} | {fmt} | {purpose} |")
 
+    if timings:
+        lines.extend([
+            "",
+            "## 生成時間",
+            "",
+            "| 成果物 | 所要時間 (s) |",
+            "|--------|-------------|",
+        ])
+        for artifact, seconds in timings.items():
+            lines.append(f"| {artifact} | {'-（変更なし）' if seconds is None else f'{seconds:.2f}'} |")
+        if elapsed is not None:
+            lines.append(f"| **合計（実時間）** | **{elapsed:.2f}** |")
+
     lines.extend([
         "",
         "## 使用方法",
         "",
         "### HTMLインタラクティブビュー",
+        "グラフデータは `graph-data/` から読み込むため、HTTPサーバー経由で開きます"
+        "（`--embed-data` を付けて生成した場合は `graph.html` を直接開けます）。",
+        "",
         "```bash",
-        "open reports/graph/visualizations/graph.html  # macOS",
+        "cd reports/graph/visualizations && python -m http.server 8000",
+        "open http://localhost:8000/graph.html  # macOS",
         "```",
         "",
         "### Mermaid → PNG変換",
@@ -1059,11 +2383,193 @@ def generate_summary(data: dict, output_path: str, output_dir: Path):
         "",
     ])
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
+    write_output(output_path, '\n'.join(lines))
     print(f"  Generated: {output_path}")
 
 
+# ==============================================================================
+# タスク実行
+# ==============================================================================
+
+# ワーカーと共有するグラフモデル（fork 時のコピーオンライトで引き継ぐ）
+_TASK_GRAPH = None
+
+# 前回の生成状態を記録するファイル（出力ディレクトリ直下）
+STATE_FILE = ".visualize-state.json"
+STATE_VERSION = 1
+
+# ジェネレーターごとに読むCSV（このいずれかが変わった成果物だけを再生成する）
+GENERATOR_TABLES = {
+    'generate_mermaid_full': ('domains', 'entities', 'belongs_to', 'references', 'implements'),
+    'generate_mermaid_domain': ('domains', 'entities', 'terms', 'belongs_to', 'references', 'has_term'),
+    'generate_call_graph': ('domains', 'entities', 'methods', 'belongs_to', 'calls'),
+    'generate_dot': ('domains', 'entities', 'belongs_to', 'references', 'implements'),
+    'generate_html': ('domains', 'entities', 'terms', 'actors', 'business_processes', 'system_processes',
+                      'belongs_to', 'references', 'implements', 'has_term', 'participates_in'),
+    'generate_process_flows': ('entities', 'actors', 'business_processes', 'activities', 'system_processes',
+                               'has_activity', 'next_activity', 'performs', 'triggers', 'participates_in'),
+    'generate_system_process_diagrams': ('methods', 'activities', 'system_processes', 'triggers', 'invokes'),
+    'generate_actor_maps': ('actors', 'roles', 'business_processes', 'activities',
+                            'has_role', 'performs', 'has_activity'),
+}
+
+
+def run_task(func, args: tuple, kwargs: dict) -> tuple:
+    """ジェネレーターを1つ実行する
+
+    Returns:
+        (所要時間（秒）, 書き出したファイルのパス -> 内容の SHA-256)
+    """
+    _WRITTEN_FILES.clear()
+    start = time.perf_counter()
+    func(_TASK_GRAPH, *args, **kwargs)
+    return time.perf_counter() - start, dict(_WRITTEN_FILES)
+
+
+def load_state(output_dir: Path) -> dict:
+    """前回の生成状態を読み込む（ないか形式が違えば空の状態）"""
+    try:
+        state = json.loads((output_dir / STATE_FILE).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {"version": STATE_VERSION, "artifacts": {}}
+    if state.get("version") != STATE_VERSION:
+        return {"version": STATE_VERSION, "artifacts": {}}
+    return state
+
+
+def save_state(output_dir: Path, state: dict) -> None:
+    """生成状態を書き出す"""
+    write_output(output_dir / STATE_FILE, json.dumps(state, ensure_ascii=False, indent=2))
+
+
+def task_signature(task: tuple, graph: dict, code_digest: str) -> str:
+    """タスクの入力（スクリプト本体・ジェネレーター・引数・読み込み時の絞り込み・読むCSVの内容）をまとめたハッシュ"""
+    func, func_args, kwargs = task
+    table_hashes = graph.get('table_hashes', {})
+    key = [
+        code_digest, func.__name__, graph.get('filters'),
+        [str(arg) for arg in func_args], {name: str(value) for name, value in sorted(kwargs.items())},
+        {table: table_hashes.get(table) for table in GENERATOR_TABLES.get(func.__name__, ())},
+    ]
+    return hashlib.sha256(json.dumps(key, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def outputs_intact(output_dir: Path, record: dict) -> bool:
+    """前回書き出したファイルがすべて残っていて、内容も変わっていないか"""
+    for rel, digest in record.get("files", {}).items():
+        path = output_dir / rel
+        if not path.is_file() or file_digest(path) != digest:
+            return False
+    return bool(record.get("files"))
+
+
+def plan_tasks(tasks: dict, graph: dict, state: dict, output_dir: Path, code_digest: str,
+               force: bool = False) -> dict:
+    """成果物ごとに再生成の要否を判定する
+
+    Returns:
+        成果物名 -> 再生成の理由（最新なら None）
+    """
+    table_hashes = graph.get('table_hashes', {})
+    reasons = {}
+    for name, task in tasks.items():
+        record = state["artifacts"].get(name)
+        if force:
+            reasons[name] = "forced"
+        elif record is None:
+            reasons[name] = "new"
+        elif record.get("signature") != task_signature(task, graph, code_digest):
+            changed = [f"{table}.csv" for table in GENERATOR_TABLES.get(task[0].__name__, ())
+                       if record.get("tables", {}).get(table) != table_hashes.get(table)]
+            reasons[name] = f"inputs changed ({', '.join(changed)})" if changed else "options or code changed"
+        elif not outputs_intact(output_dir, record):
+            reasons[name] = "outputs missing or modified"
+        else:
+            reasons[name] = None
+    return reasons
+
+
+def record_results(state: dict, tasks: dict, results: dict, graph: dict, output_dir: Path,
+                   code_digest: str) -> None:
+    """実行した成果物の状態を更新し、前回は書き出したが今回は書き出さなかったファイルを削除する
+
+    今回のビルドに含まれない成果物の記録は残す（出力形式を絞った実行で消さないため）。
+    """
+    table_hashes = graph.get('table_hashes', {})
+    for name, (_, written) in results.items():
+        files = {os.path.relpath(path, output_dir): digest for path, digest in written.items()}
+        previous = state["artifacts"].get(name, {}).get("files", {})
+        for rel in previous.keys() - files.keys():
+            (output_dir / rel).unlink(missing_ok=True)
+        task = tasks[name]
+        state["artifacts"][name] = {
+            "signature": task_signature(task, graph, code_digest),
+            "tables": {table: table_hashes.get(table) for table in GENERATOR_TABLES.get(task[0].__name__, ())},
+            "files": files,
+        }
+
+
+def build_tasks(args, output_path: Path) -> dict:
+    """出力形式に応じた生成タスクを構築
+
+    Returns:
+        成果物名 -> (関数, 位置引数, キーワード引数)。同じ成果物は1回だけ登録する。
+        ジェネレーターは互いの出力を読まないので、タスク間に順序の制約はない。
+    """
+    tasks = {}
+
+    def add(artifact, func, *func_args, **kwargs):
+        tasks.setdefault(artifact, (func, func_args, kwargs))
+
+    if args.format in ["mermaid", "all"]:
+        paging = dict(partition=args.mermaid_partition,
+                      max_nodes=args.mermaid_max_nodes, max_edges=args.mermaid_max_edges)
+        add("graph.mmd", generate_mermaid_full, output_path / "graph.mmd", layout=args.layout, **paging)
+        add("domain-*.mmd", generate_mermaid_domain, output_path)
+        add("call-graph.mmd", generate_call_graph, output_path / "call-graph.mmd",
+            condense=args.condense_call_graph, **paging)
+
+    if args.format in ["dot", "all"]:
+        add("graph.dot", generate_dot, output_path / "graph.dot", domain_filter=args.domain,
+            positions=args.dot_positions, layout_seed=args.layout_seed)
+
+    if args.format in ["html", "all"]:
+        add("graph.html", generate_html, output_path / "graph.html", domain_filter=args.domain,
+            precompute_layout=not args.no_precomputed_layout, layout_seed=args.layout_seed,
+            renderer=args.renderer, lod=args.lod, embed_data=args.embed_data)
+
+    if args.format in ["flowchart", "all"]:
+        add("processes/*-flow.mmd", generate_process_flows, output_path,
+            min_shared=args.min_shared_entities, max_links=args.max_process_links)
+        add("processes/system-processes.mmd", generate_system_process_diagrams, output_path)
+
+    if args.format in ["sequence", "all"]:
+        add("processes/system-processes.mmd", generate_system_process_diagrams, output_path)
+
+    # Actor maps (always when "all")
+    if args.format == "all":
+        add("actors/*", generate_actor_maps, output_path)
+
+    return tasks
+
+
+def run_tasks(graph: dict, tasks: dict, workers: int = None) -> dict:
+    """タスクを実行し、成果物ごとに run_task の結果を返す
+
+    fork が使える環境ではプロセスプールで並列に実行する。グラフモデルは pickle せず、
+    fork 時のコピーオンライトでワーカーと共有する。
+    """
+    global _TASK_GRAPH
+    _TASK_GRAPH = graph
+
+    if workers == 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return {name: run_task(*task) for name, task in tasks.items()}
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+        futures = {name: pool.submit(run_task, *task) for name, task in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
 # ==============================================================================
 # Main
 # ==============================================================================
@@ -1079,11 +2585,53 @@ def main():
     parser.add_argument("--format", choices=["mermaid", "dot", "html", "all", "flowchart", "sequence"],
                         default="all", help="Output format")
     parser.add_argument("--domain", help="Filter by domain")
-    parser.add_argument("--node-type", help="Filter by node type")
+    parser.add_argument("--node-type",
+                        help="Comma-separated node labels to load (e.g. Entity,Domain); CSVs of other labels are skipped")
+    parser.add_argument("--hops", type=int, default=FILTER_HOPS,
+                        help="With --domain, also load nodes up to this many relationships away from the domain")
     parser.add_argument("--layout", choices=["LR", "TB", "RL", "BT"],
                         default="LR", help="Graph layout direction")
+    parser.add_argument("--condense-call-graph", action="store_true",
+                        help="Collapse class-level call cycles (SCCs) in call-graph.mmd, show call counts and depth, "
+                             "and list the cycles in call-graph-cycles.md")
+    parser.add_argument("--mermaid-partition", choices=PARTITION_STRATEGIES, default="domain",
+                        help="How to split graph.mmd/call-graph.mmd into pages when they exceed the budgets")
+    parser.add_argument("--mermaid-max-nodes", type=int, default=MERMAID_MAX_NODES,
+                        help="Maximum nodes per Mermaid page")
+    parser.add_argument("--mermaid-max-edges", type=int, default=MERMAID_MAX_EDGES,
+                        help="Maximum edges per Mermaid page")
+    parser.add_argument("--dot-positions", action="store_true",
+                        help="Precompute node coordinates per domain (in parallel) and write them into graph.dot "
+                             "so Graphviz only draws it (render with neato -n2)")
+    parser.add_argument("--renderer", choices=RENDERERS, default="svg",
+                        help="Drawing backend for graph.html (canvas/webgl scale to ~100k nodes)")
+    parser.add_argument("--lod", action="store_true",
+                        help="Open graph.html with domain super-nodes only and load each domain's shard on click")
+    parser.add_argument("--embed-data", action="store_true",
+                        help="Also embed the graph-data/ dataset in graph.html so it opens without an HTTP server")
+    parser.add_argument("--no-precomputed-layout", action="store_true",
+                        help="Let graph.html run the force simulation in the browser instead of embedding positions")
+    parser.add_argument("--layout-seed", type=int, default=42,
+                        help="Random seed for the precomputed force layout")
+    parser.add_argument("--min-shared-entities", type=int, default=1,
+                        help="Link two business processes only if they share at least this many entities")
+    parser.add_argument("--max-process-links", type=int, default=None,
+                        help="Keep only the N process pairs sharing the most entities in business-processes.mmd")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes for rendering (default: CPU count, 1 = sequential)")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate every artifact even if its inputs and options are unchanged")
     args = parser.parse_args()
 
+    node_types = None
+    if args.node_type:
+        known = {label.lower(): label for _, label, _ in NODE_SPECS}
+        requested = [name.strip() for name in args.node_type.split(',') if name.strip()]
+        unknown = [name for name in requested if name.lower() not in known]
+        if unknown:
+            parser.error(f"unknown node type(s): {', '.join(unknown)} (choose from {', '.join(known.values())})")
+        node_types = [known[name.lower()] for name in requested]
+
     print("=== GraphDB Visualization ===")
     print(f"Data directory: {args.data_dir}")
     print(f"Output directory: {args.output_dir}")
@@ -1093,34 +2641,36 @@ def main():
     output_path.mkdir(parents=True, exist_ok=True)
 
     print("Loading data...")
-    data = load_csv_data(args.data_dir)
+    graph = load_csv_data(args.data_dir, domain=args.domain, node_types=node_types, hops=args.hops)
     print()
 
     print("Generating visualizations...")
-
-    if args.format in ["mermaid", "all"]:
-        generate_mermaid_full(data, output_path / "graph.mmd", layout=args.layout)
-        generate_mermaid_domain(data, output_path)
-        generate_call_graph(data, output_path / "call-graph.mmd")
-
-    if args.format in ["dot", "all"]:
-        generate_dot(data, output_path / "graph.dot", domain_filter=args.domain)
-
-    if args.format in ["html", "all"]:
-        generate_html(data, output_path / "graph.html", domain_filter=args.domain)
-
-    if args.format in ["flowchart", "all"]:
-        generate_process_flows(data, output_path)
-        generate_system_process_diagrams(data, output_path)
-
-    if args.format in ["sequence", "all"]:
-        generate_system_process_diagrams(data, output_path)
-
-    # Actor maps (always when "all")
-    if args.format == "all":
-        generate_actor_maps(data, output_path)
-
-    generate_summary(data, output_path / "summary.md", output_path)
+    start = time.perf_counter()
+    tasks = build_tasks(args, output_path)
+    state = load_state(output_path)
+    # ビューアのJSは別ファイルなので、スクリプト本体と合わせて変更を検出する
+    code_digest = file_digest(Path(__file__)) + file_digest(GRAPH_VIEWER_JS_PATH)
+    reasons = plan_tasks(tasks, graph, state, output_path, code_digest, force=args.force)
+    for name, reason in reasons.items():
+        if reason:
+            print(f"  Rebuilding {name}: {reason}")
+    stale = {name: task for name, task in tasks.items() if reasons[name]}
+    results = run_tasks(graph, stale, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    record_results(state, stale, results, graph, output_path, code_digest)
+
+    up_to_date = [name for name in tasks if name not in results]
+    if up_to_date:
+        print(f"  Up to date: {', '.join(up_to_date)}")
+
+    # サマリーは何か再生成したか、入力・成果物の構成が変わったときだけ書き直す
+    summary_key = {"tables": graph['table_hashes'], "filters": graph['filters'], "artifacts": list(tasks)}
+    summary_path = output_path / "summary.md"
+    if results or state.get("summary") != summary_key or not summary_path.exists():
+        timings = {name: results[name][0] if name in results else None for name in tasks}
+        generate_summary(graph, summary_path, output_path, timings=timings, elapsed=elapsed)
+        state["summary"] = summary_key
+    save_state(output_path, state)
 
     print()
     print("=== Visualization Complete ===")